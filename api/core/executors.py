@@ -0,0 +1,177 @@
+"""
+Named, bounded executors for blocking endpoint work.
+
+Instead of every sync route sharing Starlette's one default thread pool, each
+workload class gets its own threads and a bounded backlog:
+
+    interactive  single-ticker lookups (latency sensitive)
+    listing      cached lists and overviews
+    bulk         universe scans, moonshot hunts, news sweeps
+
+Admission control: work that would exceed an executor's workers + queue is
+refused at once with ExecutorOverloaded (HTTP 429 with Retry-After) rather
+than piling up. Bulk also yields to interactive: while interactive requests
+are waiting for a thread, new bulk work is refused, so scans can't starve
+single-ticker lookups.
+
+Routes that must not spend anything (a pro trial) on work that will be refused
+reserve a slot first and run on it:
+
+    async with executors.bulk.reserve() as slot:
+        await consume_pro_trial(user)
+        data = await slot.run(fn)
+
+A long-poll executor takes sleeping job polls and streamed job events off the
+shared default pool:
+
+    async for event in executors.longpoll.iterate(iter_job_events(job_id)):
+        ...
+"""
+
+import os
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+
+class ExecutorOverloaded(HTTPException):
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(
+            status_code=429,
+            detail=f"Server busy ({name} capacity reached). Retry in {retry_after}s.",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, workers: int, queue: int, retry_after: int, yields_to=()):
+        self.name = name
+        self.workers = workers
+        self.queue = queue
+        self.retry_after = retry_after
+        self.yields_to = list(yields_to)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"exec-{name}")
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.counters = {"admitted": 0, "rejected": 0}
+
+    def waiting(self) -> int:
+        """Admitted calls that haven't got a thread yet."""
+        return max(0, self.in_flight - self.workers)
+
+    def reserve(self) -> "Reservation":
+        """Admits one call now (or raises ExecutorOverloaded); run it later with the reservation."""
+        self._admit()
+        return Reservation(self)
+
+    def _admit(self):
+        with self.lock:
+            busy = self.in_flight >= self.workers + self.queue
+            if busy or any(other.waiting() for other in self.yields_to):
+                self.counters["rejected"] += 1
+                raise ExecutorOverloaded(self.name, self.retry_after)
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+
+    def _release(self, _future=None):
+        with self.lock:
+            self.in_flight -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) on this executor's threads, or raises ExecutorOverloaded."""
+        self._admit()
+        return await self._submit(fn, *args, **kwargs)
+
+    async def iterate(self, iterator):
+        """
+        Async iteration over a blocking iterator, each next() on this executor's
+        threads. While the executor is full the next step waits retry_after
+        seconds and tries again, so a long stream stalls rather than fails.
+        """
+        done = object()
+        while True:
+            try:
+                item = await self.run(next, iterator, done)
+            except ExecutorOverloaded:
+                await asyncio.sleep(self.retry_after)
+                continue
+            if item is done:
+                return
+            yield item
+
+    async def _submit(self, fn, *args, **kwargs):
+        # The caller has been admitted; its slot is released when the call finishes
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        try:
+            future = self.pool.submit(call)
+        except Exception:
+            self._release()
+            raise
+        # Released when the call finishes (or is cancelled before starting), not when the client goes away
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "queue": self.queue,
+                "inFlight": self.in_flight,
+                "waiting": self.waiting(),
+                **self.counters,
+            }
+
+
+class Reservation:
+    """An admitted slot, held until run() hands it a call or the async with block exits."""
+
+    def __init__(self, executor: BoundedExecutor):
+        self.executor = executor
+        self.held = True
+
+    async def __aenter__(self) -> "Reservation":
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+    def release(self):
+        if self.held:
+            self.held = False
+            self.executor._release()
+
+    async def run(self, fn, *args, **kwargs):
+        if not self.held:
+            raise RuntimeError(f"Reservation on {self.executor.name} already used")
+        self.held = False
+        return await self.executor._submit(fn, *args, **kwargs)
+
+
+def _executor(name: str, workers: int, queue: int, retry_after: int, yields_to=()) -> BoundedExecutor:
+    env = f"EXECUTOR_{name.upper()}"
+    return BoundedExecutor(
+        name,
+        workers=int(os.environ.get(f"{env}_WORKERS", workers)),
+        queue=int(os.environ.get(f"{env}_QUEUE", queue)),
+        retry_after=retry_after,
+        yields_to=yields_to,
+    )
+
+
+interactive = _executor("interactive", workers=8, queue=32, retry_after=2)
+listing = _executor("listing", workers=4, queue=16, retry_after=5)
+bulk = _executor("bulk", workers=2, queue=4, retry_after=30, yields_to=[interactive])
+# Long polls mostly sleep: many threads, kept apart from everything else
+longpoll = _executor("longpoll", workers=16, queue=16, retry_after=5)
+
+EXECUTORS = {e.name: e for e in (interactive, listing, bulk, longpoll)}
+
+
+def stats() -> dict:
+    return {name: e.stats() for name, e in EXECUTORS.items()}
@@ -0,0 +1,21 @@
+"""
+Filesystem anchors for local data.
+
+Relative data paths are resolved against the api/ directory rather than the
+working directory, so the API (started from api/), the Streamlit servers and
+scripts (started from the repo root) all share the same files.
+"""
+
+import os
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(API_ROOT, "data")
+
+
+def data_path(env_var: str, *default: str) -> str:
+    """
+    The path in env_var, or DATA_DIR/<default...> when unset. A relative
+    override is taken relative to API_ROOT.
+    """
+    path = os.environ.get(env_var) or os.path.join(DATA_DIR, *default)
+    return os.path.join(API_ROOT, path) if not os.path.isabs(path) else path
@@ -29,6 +29,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, timedelta
 from services.market_service import get_market_overview
+from services import analysis_pool
 
 # Add parent directory to path so we can import existing modules
 # Add parent directory to path so we can import existing modules
@@ -66,6 +67,7 @@ def start_scheduler():
 @app.on_event("shutdown")
 def shutdown_scheduler():
     scheduler.shutdown()
+    analysis_pool.shutdown()
 
 # CORS
 frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
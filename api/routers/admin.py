@@ -98,3 +98,20 @@ async def get_admin_activity(limit: int = 15, _user: dict = Depends(require_admi
             return {"status": "ok", "data": res.json()}
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache")
+async def get_cache_stats(_user: dict = Depends(require_admin)):
+    """
+    Returns in-process cache hit/miss counters and memory use.
+    """
+    from services.cache_service import CacheService
+    return {"status": "ok", "data": CacheService.stats()}
+
+
+@router.get("/executors")
+async def get_executor_stats(_user: dict = Depends(require_admin)):
+    """
+    Returns per-workload executor load: workers, queue bound, in-flight, admitted and rejected counts.
+    """
+    from core import executors
+    return {"status": "ok", "data": executors.stats()}
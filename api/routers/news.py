@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from middleware.auth import require_pro, consume_pro_trial
 from services.news_service import NewsService
+from core import executors
 
 router = APIRouter()
 
@@ -12,11 +13,14 @@ async def get_intelligence(user: dict = Depends(require_pro)):
     Consumes trial for non-pro users on first run.
     """
     try:
-        # Trigger trial consumption
-        await consume_pro_trial(user)
-        
-        data = NewsService.get_ai_intelligence()
+        async with executors.bulk.reserve() as slot:
+            # Trigger trial consumption
+            await consume_pro_trial(user)
+
+            data = await slot.run(NewsService.get_ai_intelligence)
         return {"status": "ok", "data": data}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"News Router Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -35,10 +39,11 @@ async def batch_analysis(payload: BatchAnalysisRequest, user: dict = Depends(req
         if len(payload.tickers) > 20:
              raise HTTPException(status_code=400, detail="Batch size limited to 20 tickers.")
         
-        # Trigger trial consumption
-        await consume_pro_trial(user)
-        
-        data = NewsService.analyze_tickers(payload.tickers)
+        async with executors.bulk.reserve() as slot:
+            # Trigger trial consumption
+            await consume_pro_trial(user)
+
+            data = await slot.run(NewsService.analyze_tickers, payload.tickers)
         return {"status": "ok", "data": data}
     except HTTPException as he:
         raise he
@@ -2,14 +2,20 @@
 Penny stock router — basic (login required) and pro (subscription required) endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.concurrency import run_in_threadpool
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from middleware.auth import get_current_user, require_pro, consume_pro_trial
+from core import executors
 from services.penny_service import (
-    get_basic_penny_list,
-    run_full_scan,
+    basic_penny_page,
+    full_scan_page,
+    batch_scan_page,
     analyze_single_penny,
 )
+from services.scan_jobs import get_job, iter_job_events, start_job
+from services.scan_snapshot import CursorExpired
 from services.moonshot_service import MoonshotService
 from services.gamification_service import GamificationService
 from fastapi import BackgroundTasks
@@ -17,6 +23,17 @@ from fastapi import BackgroundTasks
 router = APIRouter()
 
 
+def _page_response(page: dict) -> dict:
+    return {
+        "status": "ok",
+        "count": len(page["items"]),
+        "data": page["items"],
+        "total": page["total"],
+        "version": page["version"],
+        "nextCursor": page["nextCursor"],
+    }
+
+
 @router.get("/moonshots")
 async def get_moonshots(
     background_tasks: BackgroundTasks,
@@ -27,10 +44,14 @@ async def get_moonshots(
     Requires Pro subscription.
     """
     try:
-        await consume_pro_trial(user)
-        # MoonshotService.get_top_moonshots() is blocking
-        data = await run_in_threadpool(MoonshotService.get_top_moonshots)
+        # Admitted before the trial is spent, so a saturated executor refuses without charging it
+        async with executors.bulk.reserve() as slot:
+            await consume_pro_trial(user)
+            # MoonshotService.get_top_moonshots() is blocking
+            data = await slot.run(MoonshotService.get_top_moonshots)
         return {"status": "ok", "count": len(data), "data": data}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -38,16 +59,27 @@ async def get_moonshots(
 @router.get("/basic")
 async def basic_penny_list(
     limit: int = Query(50, ge=10, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     user: dict = Depends(get_current_user),
 ):
     """
     Basic penny stock list — price, volume, highs/lows.
+    Pages of one universe snapshot: pass nextCursor back to continue; sort is a field, '-field' for descending.
     Requires login.
     """
     try:
-        # get_basic_penny_list is blocking
-        data = await run_in_threadpool(get_basic_penny_list, limit=limit)
-        return {"status": "ok", "count": len(data), "data": data}
+        # basic_penny_page is blocking
+        page = await executors.listing.run(basic_penny_page, limit=limit, offset=offset, cursor=cursor, sort=sort)
+        return _page_response(page)
+    except HTTPException:
+        raise
+    except CursorExpired as e:
+        # The pinned snapshot is gone: the client restarts paging without a cursor
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -56,26 +88,119 @@ async def basic_penny_list(
 async def full_scan(
     background_tasks: BackgroundTasks,
     limit: int = Query(100, ge=20, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     user: dict = Depends(require_pro),
 ):
     """
     Full AI scan with predictions, signals, and scoring.
+    Pages of one scan snapshot, paginated like /basic.
     Requires Pro subscription.
     """
     try:
+        async with executors.bulk.reserve() as slot:
+            await consume_pro_trial(user)
+            # full_scan_page is blocking
+            page = await slot.run(full_scan_page, limit=limit, offset=offset, cursor=cursor, sort=sort)
+        return _page_response(page)
+    except HTTPException:
+        raise
+    except CursorExpired as e:
+        # The pinned snapshot is gone: the client restarts paging without a cursor
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/scan/stream")
+async def full_scan_stream(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$"),
+    top: int = Query(10, ge=1, le=50),
+    user: dict = Depends(require_pro),
+):
+    """
+    Streaming full scan: each ticker's result as soon as it is analyzed, with
+    progress and running top-N events, as NDJSON (default) or server-sent
+    events (format=sse or Accept: text/event-stream). Follows the shared scan job.
+    Requires Pro subscription.
+    """
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+
+    def encode(event: dict) -> str:
+        payload = json.dumps(event, default=str)
+        return f"event: {event['type']}\ndata: {payload}\n\n" if sse else payload + "\n"
+
+    # Streams follow the shared scan job, so concurrent streams cost one scan
+    async with executors.listing.reserve() as slot:
         await consume_pro_trial(user)
-        # run_full_scan is blocking
-        data = await run_in_threadpool(run_full_scan, limit=limit)
-        return {"status": "ok", "count": len(data), "data": data}
+        job = await slot.run(start_job, "full")
+
+    async def events():
+        # Each step may long-poll for new results: run it on the long-poll executor,
+        # not Starlette's shared threadpool
+        try:
+            async for event in executors.longpoll.iterate(iter_job_events(job["id"], top_n=top)):
+                yield encode(event)
+        except Exception as e:
+            yield encode({"type": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/scan/jobs")
+async def create_scan_job(user: dict = Depends(require_pro)):
+    """
+    Starts a full scan job, or attaches to the identical one already running.
+    Poll GET /scan/jobs/{id} with the returned cursor for results.
+    Requires Pro subscription.
+    """
+    try:
+        async with executors.listing.reserve() as slot:
+            await consume_pro_trial(user)
+            job = await slot.run(start_job, "full")
+        return {"status": "ok", "job": job}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/scan/jobs/{job_id}")
+async def scan_job_results(
+    job_id: str,
+    cursor: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    wait: float = Query(0, ge=0, le=25),
+    user: dict = Depends(require_pro),
+):
+    """
+    Job state plus the results found after cursor; pass nextCursor back on the
+    next poll. wait long-polls (seconds) until new results arrive or the job ends.
+    Requires Pro subscription.
+    """
+    # get_job may block (long poll); polls that don't wait are quick reads
+    pool = executors.longpoll if wait > 0 else executors.listing
+    job = await pool.run(get_job, job_id, cursor=cursor, limit=limit, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No scan job {job_id}")
+    data = job.pop("data")
+    return {"status": "ok", "count": len(data), "data": data, "job": job, "nextCursor": job.pop("nextCursor")}
+
+
 @router.get("/scan_batch")
 async def scan_batch(
     background_tasks: BackgroundTasks,
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     user: dict = Depends(require_pro),
 ):
     """
@@ -83,11 +208,18 @@ async def scan_batch(
     Requires Pro subscription.
     """
     try:
-        await consume_pro_trial(user)
-        from services.penny_service import run_batch_scan
-        # run_batch_scan is blocking
-        data = await run_in_threadpool(run_batch_scan, limit=limit, offset=offset)
-        return {"status": "ok", "count": len(data), "data": data}
+        async with executors.bulk.reserve() as slot:
+            await consume_pro_trial(user)
+            # batch_scan_page is blocking
+            page = await slot.run(batch_scan_page, limit=limit, offset=offset, cursor=cursor)
+        return _page_response(page)
+    except HTTPException:
+        raise
+    except CursorExpired as e:
+        # The pinned snapshot is gone: the client restarts paging without a cursor
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -111,7 +243,7 @@ async def analyze_penny(
     )
 
     # analyze_single_penny is blocking
-    result = await run_in_threadpool(analyze_single_penny, ticker.upper(), is_pro=is_pro)
+    result = await executors.interactive.run(analyze_single_penny, ticker.upper(), is_pro=is_pro)
     if result is None:
         raise HTTPException(status_code=404, detail=f"No data for {ticker}")
 
@@ -0,0 +1,103 @@
+"""
+Optional process pool for the CPU-bound deep-analysis stage.
+
+With ANALYSIS_PROCESSES=0 (the default) analysis runs in the calling thread.
+With N > 0, scan misses are analyzed in N worker processes, so a scan uses
+more than one core and stops holding the API process's GIL.
+
+Work crosses the process boundary as compact payloads rather than pickled
+DataFrames: one float64 matrix plus int64 timestamps per history, the few .info
+fields the analysis reads, and the model fit dict. Results come back as the
+plain result records.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_PROCESSES = int(os.environ.get("ANALYSIS_PROCESSES", 0))
+
+# The .info fields _deep_analyze reads (full .info dicts run to ~150 keys)
+INFO_FIELDS = (
+    "profitMargins", "marketCap", "trailingPE", "sector", "industry",
+    "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "floatShares",
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pack_history(df: pd.DataFrame) -> dict:
+    index = pd.DatetimeIndex(df.index)
+    return {
+        "index": index.asi8.copy(),
+        "tz": str(index.tz) if index.tz is not None else None,
+        "columns": [str(c) for c in df.columns],
+        "values": df.to_numpy(dtype=np.float64),
+    }
+
+
+def unpack_history(payload: dict) -> pd.DataFrame:
+    index = pd.to_datetime(payload["index"])
+    if payload["tz"]:
+        index = index.tz_localize("UTC").tz_convert(payload["tz"])
+    return pd.DataFrame(payload["values"], index=index, columns=payload["columns"])
+
+
+def make_payload(ticker: str, df: pd.DataFrame, info: Optional[dict], model: Optional[dict],
+                 market_progress: float) -> dict:
+    return {
+        "ticker": ticker,
+        "history": pack_history(df),
+        # None (not prefetched) stays None, so the worker knows to fetch it
+        "info": {k: info[k] for k in INFO_FIELDS if k in info} if info is not None else None,
+        "model": model,
+        "market_progress": market_progress,
+    }
+
+
+def analyze_payload(payload: dict) -> Optional[dict]:
+    """Worker entry point: the non-pro deep analysis of one packed ticker."""
+    from services.penny_service import _deep_analyze
+    return _deep_analyze(
+        payload["ticker"], payload["market_progress"], pre_df=unpack_history(payload["history"]),
+        pre_info=payload["info"], pre_model=payload["model"],
+    )
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared analysis pool, started on first use; None when ANALYSIS_PROCESSES is 0."""
+    global _pool
+    if ANALYSIS_PROCESSES <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the API process runs threads, which forking doesn't carry over safely
+            _pool = ProcessPoolExecutor(max_workers=ANALYSIS_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"Analysis process pool started with {ANALYSIS_PROCESSES} workers")
+        return _pool
+
+
+def reset_pool():
+    """Drops a broken pool so the next get_pool() starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
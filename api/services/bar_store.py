@@ -0,0 +1,224 @@
+"""
+Local OHLCV bar store — persistent per-ticker daily history on disk.
+
+Each ticker lives in its own columnar file under BAR_STORE_DIR (Parquet when
+pyarrow is available, pickle otherwise). Reads only go upstream for what is
+missing: new tickers are seeded with a full history download, known tickers
+only fetch the bars since their last stored date.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+import requests
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+
+from core.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+BAR_STORE_DIR = data_path("BAR_STORE_DIR", "bars")
+# How old a stored tail may get before we ask yfinance for the bars since it.
+# Intraday the last bar is still forming, so this also bounds its staleness.
+BAR_REFRESH_MINUTES = int(os.environ.get("BAR_REFRESH_MINUTES", 15))
+SEED_PERIOD = "6mo"
+MAX_STORED_BARS = 400
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+try:
+    import pyarrow  # noqa: F401
+    _EXT = ".parquet"
+except ImportError:
+    _EXT = ".pkl"
+
+_write_lock = threading.Lock()
+
+
+# ─── Files ────────────────────────────────────────────────────────────────────
+
+def _path(ticker: str) -> str:
+    return os.path.join(BAR_STORE_DIR, ticker.replace("/", "_") + _EXT)
+
+
+def load_bars(ticker: str) -> Optional[pd.DataFrame]:
+    """Returns every stored bar for a ticker, or None if it was never fetched."""
+    path = _path(ticker)
+    if not os.path.exists(path):
+        return None
+    try:
+        if _EXT == ".parquet":
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Corrupt bar file for {ticker}, discarding: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def save_bars(ticker: str, df: pd.DataFrame):
+    """Atomically replaces the stored bars for a ticker."""
+    os.makedirs(BAR_STORE_DIR, exist_ok=True)
+    path = _path(ticker)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if _EXT == ".parquet":
+            df.to_parquet(tmp)
+        else:
+            df.to_pickle(tmp)
+        with _write_lock:
+            os.replace(tmp, path)
+    except Exception as e:
+        logger.error(f"Failed to persist bars for {ticker}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _age_minutes(ticker: str) -> float:
+    try:
+        return (time.time() - os.path.getmtime(_path(ticker))) / 60
+    except OSError:
+        return float("inf")
+
+
+# ─── Upstream ─────────────────────────────────────────────────────────────────
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
+       retry=retry_if_exception_type((requests.exceptions.RequestException, ConnectionError)))
+def _download(tickers: List[str], timeout: int = 20, **kwargs) -> pd.DataFrame:
+    import yfinance as yf
+    return yf.download(tickers, group_by="ticker", threads=False, progress=False, timeout=timeout, **kwargs)
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """OHLCV only, float columns, tz-naive date index, no empty rows."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(-1)
+    cols = [c for c in FIELDS if c in df.columns]
+    df = df[cols].astype("float64")
+    df = df[df["Close"].notna()] if "Close" in df.columns else df.iloc[0:0]
+    idx = pd.DatetimeIndex(df.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    df.index = idx.normalize()
+    df.index.name = "Date"
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def split_download(data: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Splits a grouped yf.download frame into normalized per-ticker frames."""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    multi = isinstance(data.columns, pd.MultiIndex)
+    level0 = set(data.columns.get_level_values(0)) if multi else set()
+    for ticker in tickers:
+        try:
+            if multi and ticker in level0:
+                df = data[ticker]
+            elif len(tickers) == 1:
+                df = data
+            else:
+                continue
+            df = _normalize(df.copy())
+            if not df.empty:
+                frames[ticker] = df
+        except Exception:
+            continue
+    return frames
+
+
+def _fetch(tickers: List[str], chunk_size: int, **kwargs) -> Dict[str, pd.DataFrame]:
+    frames = {}
+    for i in range(0, len(tickers), chunk_size):
+        batch = tickers[i : i + chunk_size]
+        try:
+            frames.update(split_download(_download(batch, **kwargs), batch))
+        except Exception as e:
+            logger.error(f"Bar store download failed for {len(batch)} tickers: {e}")
+    return frames
+
+
+# ─── Public API ───────────────────────────────────────────────────────────────
+
+def _window(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Trims stored bars to a yfinance-style period ("5d" = 5 sessions, "6mo", "1y")."""
+    if period.endswith("d"):
+        return df.tail(int(period[:-1]))
+    if period.endswith("mo"):
+        cutoff = datetime.now() - timedelta(days=31 * int(period[:-2]))
+    elif period.endswith("y"):
+        cutoff = datetime.now() - timedelta(days=366 * int(period[:-1]))
+    else:
+        return df
+    return df[df.index >= pd.Timestamp(cutoff).normalize()]
+
+
+def _window_days(period: str) -> int:
+    if period.endswith("d"):
+        return int(period[:-1])
+    if period.endswith("mo"):
+        return 31 * int(period[:-2])
+    if period.endswith("y"):
+        return 366 * int(period[:-1])
+    return 0
+
+
+def get_history(tickers: List[str], period: str = "6mo", refresh_minutes: Optional[int] = None,
+                chunk_size: int = 100) -> Dict[str, pd.DataFrame]:
+    """
+    Daily OHLCV for many tickers, served from the local store.
+    Unknown tickers are seeded in batches; known tickers whose tail is older than
+    refresh_minutes (default BAR_REFRESH_MINUTES) fetch only the bars since their
+    last stored date. Tickers yfinance has nothing for are omitted.
+    """
+    if refresh_minutes is None:
+        refresh_minutes = BAR_REFRESH_MINUTES
+
+    stored, seed, stale = {}, [], {}
+    for ticker in dict.fromkeys(tickers):
+        df = load_bars(ticker)
+        if df is None or df.empty:
+            seed.append(ticker)
+            continue
+        stored[ticker] = df
+        if _age_minutes(ticker) >= refresh_minutes:
+            # Re-request the last stored bar too; it may have been a partial session.
+            stale.setdefault(df.index[-1].strftime("%Y-%m-%d"), []).append(ticker)
+
+    fetched = {}
+    if seed:
+        seed_period = period if _window_days(period) > _window_days(SEED_PERIOD) else SEED_PERIOD
+        fetched.update(_fetch(seed, chunk_size, period=seed_period))
+    for start, group in stale.items():
+        fetched.update(_fetch(group, chunk_size, start=start))
+        for ticker in group:
+            if ticker not in fetched:
+                # Nothing new upstream (or the fetch failed); don't retry on every read.
+                try:
+                    os.utime(_path(ticker))
+                except OSError:
+                    pass
+
+    for ticker, new in fetched.items():
+        old = stored.get(ticker)
+        merged = new if old is None else pd.concat([old, new])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index().tail(MAX_STORED_BARS)
+        save_bars(ticker, merged)
+        stored[ticker] = merged
+
+    return {t: _window(stored[t], period) for t in tickers if t in stored}
+
+
+def get_ticker_history(ticker: str, period: str = "6mo", refresh_minutes: Optional[int] = None) -> pd.DataFrame:
+    """Single-ticker get_history; returns an empty frame when nothing is available."""
+    return get_history([ticker], period=period, refresh_minutes=refresh_minutes).get(ticker, pd.DataFrame())
@@ -0,0 +1,209 @@
+"""
+Cache storage backends behind CacheService's in-process L1.
+
+Every backend stores rows of (key, blob, written_at): the blob comes from
+services.cache_codec (versioned, compressed) and written_at is epoch seconds.
+read() hands back the decoded value; read_many()/write_many() do the same
+for a batch of keys in one round trip. purge() deletes a key prefix's rows
+written before a cutoff. Freshness and stale windows are judged by
+CacheService, so they behave the same on every backend.
+
+    memory    process-local dict (tests, throwaway runs)
+    sqlite    node-local file at CACHE_SQLITE_PATH, shared by the workers on one box
+    supabase  the shared `cache` table (key, value JSONB, updated_at)
+
+CACHE_BACKENDS lists the tiers to use in read order, e.g. "sqlite,supabase":
+reads stop at the first tier that has the key (and back-fill the tiers
+before it), writes go to all of them.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from core.paths import data_path
+from services.cache_codec import decode, from_envelope, to_envelope
+
+# Keys per statement / request for the batch operations
+SQLITE_BATCH = 500
+SUPABASE_BATCH = 100
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self):
+        self.rows = {}
+        self.lock = threading.Lock()
+
+    def read(self, key: str) -> Optional[Tuple[object, float]]:
+        with self.lock:
+            row = self.rows.get(key)
+        if row is None:
+            return None
+        return decode(row[0]), row[1]
+
+    def write(self, key: str, blob: bytes, written_at: float):
+        with self.lock:
+            self.rows[key] = (blob, written_at)
+
+    def read_many(self, keys: List[str]) -> Dict[str, Tuple[object, float]]:
+        with self.lock:
+            rows = {k: self.rows[k] for k in keys if k in self.rows}
+        return {k: (decode(blob), written_at) for k, (blob, written_at) in rows.items()}
+
+    def write_many(self, rows: Dict[str, Tuple[bytes, float]]):
+        with self.lock:
+            self.rows.update(rows)
+
+    def purge(self, prefix: str, older_than: float):
+        with self.lock:
+            for key in [k for k, (_, written_at) in self.rows.items() if k.startswith(prefix) and written_at < older_than]:
+                del self.rows[key]
+
+
+class SQLiteBackend:
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside a writer
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def read(self, key: str) -> Optional[Tuple[object, float]]:
+        row = self._conn().execute("SELECT value, updated_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return self._decode(row[0]), row[1]
+
+    @staticmethod
+    def _decode(value):
+        # Rows from before the binary format hold JSON text
+        return decode(value) if isinstance(value, bytes) else json.loads(value)
+
+    def write(self, key: str, blob: bytes, written_at: float):
+        self.write_many({key: (blob, written_at)})
+
+    def read_many(self, keys: List[str]) -> Dict[str, Tuple[object, float]]:
+        out = {}
+        conn = self._conn()
+        for i in range(0, len(keys), SQLITE_BATCH):
+            chunk = keys[i:i + SQLITE_BATCH]
+            marks = ",".join("?" * len(chunk))
+            for key, value, updated_at in conn.execute(
+                f"SELECT key, value, updated_at FROM cache WHERE key IN ({marks})", chunk
+            ):
+                out[key] = (self._decode(value), updated_at)
+        return out
+
+    def write_many(self, rows: Dict[str, Tuple[bytes, float]]):
+        # One transaction for the whole batch
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, updated_at) VALUES (?, ?, ?)",
+                [(key, sqlite3.Binary(blob), written_at) for key, (blob, written_at) in rows.items()],
+            )
+
+    def purge(self, prefix: str, older_than: float):
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM cache WHERE substr(key, 1, ?) = ? AND updated_at < ?", (len(prefix), prefix, older_than)
+            )
+
+
+class SupabaseBackend:
+    name = "supabase"
+
+    def __init__(self, client):
+        self.client = client
+
+    def read(self, key: str) -> Optional[Tuple[object, float]]:
+        response = self.client.table("cache").select("*").eq("key", key).execute()
+        if not response.data:
+            return None
+        entry = response.data[0]
+        return from_envelope(entry.get("value")), _written_at(entry.get("updated_at"))
+
+    def write(self, key: str, blob: bytes, written_at: float):
+        # Upsert
+        self.client.table("cache").upsert(self._row(key, blob, written_at)).execute()
+
+    @staticmethod
+    def _row(key: str, blob: bytes, written_at: float) -> dict:
+        return {
+            "key": key,
+            "value": to_envelope(blob),
+            "updated_at": datetime.fromtimestamp(written_at).isoformat()
+        }
+
+    def read_many(self, keys: List[str]) -> Dict[str, Tuple[object, float]]:
+        out = {}
+        # Chunked so the `in` filter stays within URL limits
+        for i in range(0, len(keys), SUPABASE_BATCH):
+            response = self.client.table("cache").select("*").in_("key", keys[i:i + SUPABASE_BATCH]).execute()
+            for entry in response.data or []:
+                out[entry["key"]] = (from_envelope(entry.get("value")), _written_at(entry.get("updated_at")))
+        return out
+
+    def write_many(self, rows: Dict[str, Tuple[bytes, float]]):
+        data = [self._row(key, blob, written_at) for key, (blob, written_at) in rows.items()]
+        for i in range(0, len(data), SUPABASE_BATCH):
+            self.client.table("cache").upsert(data[i:i + SUPABASE_BATCH]).execute()
+
+    def purge(self, prefix: str, older_than: float):
+        # LIKE treats _ and % as wildcards, and cache keys are full of underscores
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        self.client.table("cache").delete().like("key", pattern).lt(
+            "updated_at", datetime.fromtimestamp(older_than).isoformat()
+        ).execute()
+
+
+def _written_at(updated_at_str: str) -> float:
+    """Epoch seconds of a Supabase row's updated_at."""
+    if not updated_at_str:
+        return time.time()
+    # Handle ISO format with potential Z or +00:00
+    updated_at = datetime.fromisoformat(updated_at_str.replace('Z', '+00:00'))
+    age = datetime.now(updated_at.tzinfo) - updated_at
+    return time.time() - age.total_seconds()
+
+
+def build_backends(names: str, supabase_client=None, sqlite_path: str = None) -> List[object]:
+    """Instantiates the comma-separated backend list; unknown or unavailable ones are skipped."""
+    backends = []
+    for name in [n.strip().lower() for n in names.split(",") if n.strip()]:
+        try:
+            if name == "memory":
+                backends.append(MemoryBackend())
+            elif name == "sqlite":
+                backends.append(SQLiteBackend(sqlite_path or data_path("CACHE_SQLITE_PATH", "cache.sqlite3")))
+            elif name == "supabase":
+                if supabase_client is None:
+                    print("[CacheService] Supabase backend requested but not configured, skipping.")
+                    continue
+                backends.append(SupabaseBackend(supabase_client))
+            else:
+                print(f"[CacheService] Unknown cache backend '{name}', skipping.")
+        except Exception as e:
+            print(f"[CacheService] Failed to start {name} cache backend: {e}")
+    return backends
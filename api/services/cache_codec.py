@@ -0,0 +1,98 @@
+"""
+Binary encoding for cache payloads.
+
+Every blob starts with a 4-byte header: b"MC", the format version and a codec
+id, so readers can decode any row regardless of which codec wrote it.
+
+    codec 1  JSON + zlib        (always available)
+    codec 2  msgpack + zstd     (when msgpack and zstandard are installed)
+
+Supabase stores values as JSONB, so there the blob travels as base64 inside
+an envelope: {"_enc": "mc1", "data": "<base64>"}. Rows written before this
+format (plain JSON values) still decode as themselves.
+"""
+
+import json
+import zlib
+import base64
+import threading
+
+try:
+    import msgpack
+    import zstandard
+    _HAS_MSGPACK_ZSTD = True
+except ImportError:
+    _HAS_MSGPACK_ZSTD = False
+
+MAGIC = b"MC"
+FORMAT_VERSION = 1
+CODEC_JSON_ZLIB = 1
+CODEC_MSGPACK_ZSTD = 2
+ENVELOPE_TAG = "mc1"
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# zstd (de)compressor objects are not safe to share across threads
+_local = threading.local()
+
+
+def _zstd():
+    if not hasattr(_local, "compressor"):
+        _local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        _local.decompressor = zstandard.ZstdDecompressor()
+    return _local.compressor, _local.decompressor
+
+
+def encode(value) -> bytes:
+    """Serializes and compresses a JSON-compatible value with the best available codec."""
+    if _HAS_MSGPACK_ZSTD:
+        body = _zstd()[0].compress(msgpack.packb(value, use_bin_type=True))
+        codec = CODEC_MSGPACK_ZSTD
+    else:
+        body = zlib.compress(json.dumps(value, separators=(",", ":")).encode(), ZLIB_LEVEL)
+        codec = CODEC_JSON_ZLIB
+    return MAGIC + bytes([FORMAT_VERSION, codec]) + body
+
+
+def decode(blob: bytes):
+    """Inverse of encode for any known codec."""
+    if blob[:2] != MAGIC:
+        raise ValueError("Not a cache blob")
+    version, codec = blob[2], blob[3]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache format version {version}")
+    body = blob[4:]
+    if codec == CODEC_JSON_ZLIB:
+        return json.loads(zlib.decompress(body))
+    if codec == CODEC_MSGPACK_ZSTD:
+        if not _HAS_MSGPACK_ZSTD:
+            raise ValueError("Cache blob needs msgpack and zstandard")
+        packed = _zstd()[1].decompress(body)
+        try:
+            return msgpack.unpackb(packed, raw=False)
+        except ValueError:
+            # Non-string map keys: come back as strings, the way JSON (and L1) returns them
+            return _json_keys(msgpack.unpackb(packed, raw=False, strict_map_key=False))
+    raise ValueError(f"Unknown cache codec {codec}")
+
+
+def _json_keys(value):
+    """Recursively converts dict keys the way json.dumps does (1 -> "1", True -> "true", None -> "null")."""
+    if isinstance(value, dict):
+        return {k if isinstance(k, str) else json.dumps(k): _json_keys(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_keys(v) for v in value]
+    return value
+
+
+def to_envelope(blob: bytes) -> dict:
+    """JSON-safe wrapper for stores that only take JSON (Supabase JSONB)."""
+    return {"_enc": ENVELOPE_TAG, "data": base64.b64encode(blob).decode("ascii")}
+
+
+def from_envelope(value):
+    """Decodes an envelope; anything else is a legacy plain-JSON value and is returned as is."""
+    if isinstance(value, dict) and value.get("_enc") == ENVELOPE_TAG:
+        return decode(base64.b64decode(value["data"]))
+    return value
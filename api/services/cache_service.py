@@ -1,9 +1,17 @@
 
 import os
 import json
-from datetime import datetime, timedelta
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
 from supabase import create_client, Client
 
+from core.paths import data_path
+from services.cache_backends import build_backends
+from services.cache_codec import encode
+
 # Initialize Supabase client
 url = os.environ.get("SUPABASE_URL")
 key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
@@ -16,38 +24,202 @@ if url and key:
     except Exception as e:
         print(f"Supabase init failed: {e}")
 else:
-    print("Warning: SUPABASE_URL or KEYS missing. Caching disabled.")
+    print("Warning: SUPABASE_URL or KEYS missing. Using the local cache backend only.")
+
+# Backing tiers in read order (see services/cache_backends.py). Default: the
+# shared Supabase table when configured, otherwise a node-local SQLite file.
+CACHE_BACKENDS = os.environ.get("CACHE_BACKENDS", "supabase" if supabase else "sqlite")
+CACHE_SQLITE_PATH = data_path("CACHE_SQLITE_PATH", "cache.sqlite3")
+# Opened on first use, so importing this module (e.g. in analysis pool workers) touches no storage
+_backends = None
+_backends_lock = threading.Lock()
+
+# In-process L1 in front of the backends: byte budget and how long an entry is
+# trusted before the backends are asked again (other workers may have written since)
+L1_MAX_BYTES = int(os.environ.get("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024))
+L1_TTL_SECONDS = int(os.environ.get("CACHE_L1_TTL_SECONDS", 60))
+
+
+class _LocalCache:
+    """
+    Thread-safe LRU of JSON-encoded values with a total byte bound.
+    Values are stored serialized, so callers never share (and mutate) cached objects.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # key -> (payload, written_at, loaded_at)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "l2_hits": 0, "l2_misses": 0, "evictions": 0}
+
+    def get(self, key: str, max_age_seconds: float = None):
+        """Returns (found, value). max_age_seconds bounds the age of the data itself."""
+        found, value, _ = self.peek(key, max_age_seconds)
+        return found, value
+
+    def peek(self, key: str, max_age_seconds: float = None):
+        """Like get, but also returns when the value was written: (found, value, written_at)."""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                payload, written_at, loaded_at = entry
+                if now - loaded_at > self.ttl_seconds:
+                    self._drop(key)
+                elif max_age_seconds is None or now - written_at <= max_age_seconds:
+                    self.entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return True, json.loads(payload), written_at
+            self.counters["misses"] += 1
+        return False, None, None
+
+    def put(self, key: str, value, written_at: float = None, payload: str = None):
+        if payload is None:
+            try:
+                payload = json.dumps(value)
+            except (TypeError, ValueError):
+                return
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (payload, written_at or time.time(), time.time())
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._drop(oldest)
+                self.counters["evictions"] += 1
+
+    def _drop(self, key: str):
+        payload = self.entries.pop(key)[0]
+        self.bytes -= len(payload)
+
+    def purge(self, prefix: str, older_than: float):
+        with self.lock:
+            for key in [k for k, e in self.entries.items() if k.startswith(prefix) and e[1] < older_than]:
+                self._drop(key)
+
+    def count(self, counter: str, n: int = 1):
+        with self.lock:
+            self.counters[counter] += n
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hitRate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "maxBytes": self.max_bytes,
+            }
+
+
+_l1 = _LocalCache(L1_MAX_BYTES, L1_TTL_SECONDS)
+
+# Raw vs encoded size of the largest payloads written by this process
+_payload_sizes = {}
+_payload_lock = threading.Lock()
+PAYLOAD_STATS_KEYS = 20
+
+
+def _record_payload(key: str, raw: int, encoded: int):
+    with _payload_lock:
+        _payload_sizes[key] = {"raw": raw, "encoded": encoded}
+        if len(_payload_sizes) > PAYLOAD_STATS_KEYS:
+            smallest = min(_payload_sizes, key=lambda k: _payload_sizes[k]["raw"])
+            del _payload_sizes[smallest]
+
+# Single-flight recomputes: key -> Future shared by every caller waiting on it
+_inflight = {}
+_inflight_lock = threading.Lock()
+_refresh_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("CACHE_REFRESH_WORKERS", 2)), thread_name_prefix="cache-refresh"
+)
+
+
+def _get_backends() -> List[object]:
+    global _backends
+    if _backends is None:
+        with _backends_lock:
+            if _backends is None:
+                _backends = build_backends(CACHE_BACKENDS, supabase, CACHE_SQLITE_PATH)
+    return _backends
+
 
 class CacheService:
     @staticmethod
-    def get(key: str, max_age_minutes: int = 15):
+    def _fetch(key: str, max_age_seconds: float = None):
+        """
+        Reads one row from the backends (L2) into L1. A tier whose row is older
+        than max_age_seconds falls through to the next one, since a slower shared
+        tier may hold a newer write; faster tiers are back-filled with the newest
+        row found. Returns (value, written_at), possibly expired, or None.
+        """
+        backends = _get_backends()
+        best, best_tier = None, len(backends)
+        for i, backend in enumerate(backends):
+            try:
+                row = backend.read(key)
+            except Exception as e:
+                print(f"[CacheService] Error fetching {key} from {backend.name}: {e}")
+                continue
+            if row is None:
+                continue
+            if best is None or row[1] > best[1]:
+                best, best_tier = row, i
+            if max_age_seconds is None or time.time() - row[1] <= max_age_seconds:
+                break
+
+        if best is None:
+            _l1.count("l2_misses")
+            return None
+        value, written_at = best
+        if best_tier:
+            try:
+                blob = encode(value)
+                for faster in backends[:best_tier]:
+                    faster.write(key, blob, written_at)
+            except Exception:
+                pass
+        _l1.count("l2_hits")
+        _l1.put(key, value, written_at)
+        return value, written_at
+
+    @staticmethod
+    def get(key: str, max_age_minutes: int = 15, bypass_l1: bool = False):
         """
         Retrieve a value from the cache if it's not expired.
+        Served from the in-process L1 when possible, otherwise from the backends.
+        bypass_l1 always asks the backends (for values other workers update often).
         """
-        if not supabase: return None
+        if not bypass_l1:
+            found, value = _l1.get(key, max_age_minutes * 60)
+            if found:
+                return value
         try:
-            # Fetch from Supabase
-            response = supabase.table("cache").select("*").eq("key", key).execute()
-            
-            if not response.data:
+            fetched = CacheService._fetch(key, max_age_minutes * 60)
+            if not fetched:
                 return None
-            
-            entry = response.data[0]
-            updated_at_str = entry.get("updated_at")
-            
+            value, written_at = fetched
+
             # Check expiry
-            if updated_at_str:
-                # Handle ISO format with potential Z or +00:00
-                updated_at = datetime.fromisoformat(updated_at_str.replace('Z', '+00:00'))
-                
-                # Check if expired
-                if datetime.now(updated_at.tzinfo) - updated_at > timedelta(minutes=max_age_minutes):
-                    # It's expired, but we might still return it if we want "stale-while-revalidate" logic elsewhere.
-                    # For now, let's treat it as a cache miss for the caller, 
-                    # OR we return it with a flag. Let's return None to force refresh.
-                    return None
-
-            return entry.get("value")
+            if time.time() - written_at > max_age_minutes * 60:
+                # It's expired, but we might still return it if we want "stale-while-revalidate" logic elsewhere.
+                # For now, let's treat it as a cache miss for the caller, 
+                # OR we return it with a flag. Let's return None to force refresh.
+                return None
+
+            return value
             
         except Exception as e:
             print(f"[CacheService] Error fetching {key}: {e}")
@@ -56,30 +228,190 @@ class CacheService:
     @staticmethod
     def set(key: str, value: dict):
         """
-        Save a value to the cache.
+        Save a value to the cache (write-through: L1, then every backend).
         """
-        if not supabase: return
-        try:
-            data = {
-                "key": key,
-                "value": value,
-                "updated_at": datetime.now().isoformat()
-            }
-            # Upsert
-            supabase.table("cache").upsert(data).execute()
-        except Exception as e:
-            print(f"[CacheService] Error setting {key}: {e}")
+        CacheService.set_many({key: value})
+
+    @staticmethod
+    def set_many(mapping: dict):
+        """
+        Save several values at once: one bulk write per backend.
+        """
+        backends = _get_backends()
+        written_at = time.time()
+        rows = {}
+        for key, value in mapping.items():
+            try:
+                payload = json.dumps(value)
+            except (TypeError, ValueError) as e:
+                print(f"[CacheService] Error setting {key}: {e}")
+                continue
+            _l1.put(key, value, written_at, payload)
+            if backends:
+                # One versioned, compressed blob shared by every backend
+                blob = encode(value)
+                _record_payload(key, len(payload), len(blob))
+                rows[key] = (blob, written_at)
+
+        if not rows: return
+        for backend in backends:
+            try:
+                backend.write_many(rows)
+            except Exception as e:
+                print(f"[CacheService] Error setting {len(rows)} keys in {backend.name}: {e}")
+
+    @staticmethod
+    def get_many(keys: List[str], max_age_minutes: int = 15) -> dict:
+        """
+        Batch get: {key: value} for every key with a fresh value; missing or
+        expired keys are left out. Whatever L1 lacks costs one batched read per
+        backend tier (expired rows fall through to the next tier, like get).
+        """
+        max_age = max_age_minutes * 60
+        out, pending = {}, []
+        for key in dict.fromkeys(keys):
+            found, value = _l1.get(key, max_age)
+            if found:
+                out[key] = value
+            else:
+                pending.append(key)
+
+        backends = _get_backends()
+        best = {}  # key -> (value, written_at, tier)
+        for i, backend in enumerate(backends):
+            if not pending:
+                break
+            try:
+                rows = backend.read_many(pending)
+            except Exception as e:
+                print(f"[CacheService] Error fetching {len(pending)} keys from {backend.name}: {e}")
+                continue
+            for key, (value, written_at) in rows.items():
+                if key not in best or written_at > best[key][1]:
+                    best[key] = (value, written_at, i)
+            now = time.time()
+            pending = [k for k in pending if k not in best or now - best[k][1] > max_age]
+
+        backfill = {}
+        now = time.time()
+        for key, (value, written_at, tier) in best.items():
+            _l1.put(key, value, written_at)
+            if tier:
+                blob = encode(value)
+                for faster in range(tier):
+                    backfill.setdefault(faster, {})[key] = (blob, written_at)
+            if now - written_at <= max_age:
+                out[key] = value
+        for faster, rows in backfill.items():
+            try:
+                backends[faster].write_many(rows)
+            except Exception:
+                pass
+
+        _l1.count("l2_hits", len(best))
+        _l1.count("l2_misses", len([k for k in pending if k not in best]))
+        return out
+
+    @staticmethod
+    def purge(prefix: str, max_age_minutes: float):
+        """
+        Deletes every key starting with prefix that was written more than
+        max_age_minutes ago, from L1 and every backend.
+        """
+        cutoff = time.time() - max_age_minutes * 60
+        _l1.purge(prefix, cutoff)
+        for backend in _get_backends():
+            try:
+                backend.purge(prefix, cutoff)
+            except Exception as e:
+                print(f"[CacheService] Error purging {prefix}* from {backend.name}: {e}")
 
     @staticmethod
     def get_stale(key: str):
         """
         Retrieve a value regardless of age (good for fallbacks).
         """
-        if not supabase: return None
+        found, value = _l1.get(key)
+        if found:
+            return value
         try:
-            response = supabase.table("cache").select("*").eq("key", key).execute()
-            if response.data:
-                return response.data[0].get("value")
+            fetched = CacheService._fetch(key)
+            if fetched:
+                return fetched[0]
         except Exception:
             pass
         return None
+
+    @staticmethod
+    def get_or_compute(key: str, fn, ttl_minutes: int = 15, stale_minutes: int = None):
+        """
+        Returns the cached value, computing it with fn() when needed.
+
+        - Fresh (younger than ttl_minutes): returned as is.
+        - Stale (younger than stale_minutes, or any age if None): returned
+          immediately while one background recompute refreshes the entry.
+        - Missing or too old: computed now.
+
+        Recomputes are single-flight per key, so concurrent callers share one
+        run of fn() instead of stampeding. Falsy results are not cached.
+        """
+        found, value, written_at = _l1.peek(key)
+        if not found:
+            try:
+                fetched = CacheService._fetch(key, ttl_minutes * 60)
+            except Exception as e:
+                print(f"[CacheService] Error fetching {key}: {e}")
+                fetched = None
+            if fetched:
+                found = True
+                value, written_at = fetched
+
+        if found:
+            age = time.time() - written_at
+            if age <= ttl_minutes * 60:
+                return value
+            if stale_minutes is None or age <= stale_minutes * 60:
+                CacheService._recompute(key, fn, background=True)
+                return value
+
+        return CacheService._recompute(key, fn)
+
+    @staticmethod
+    def _recompute(key: str, fn, background: bool = False):
+        """Runs fn() for key unless a run is already in flight; waits for the result unless background."""
+        with _inflight_lock:
+            future = _inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                _inflight[key] = future
+
+        if owner:
+            def run():
+                try:
+                    value = fn()
+                    if value:
+                        CacheService.set(key, value)
+                    future.set_result(value)
+                except Exception as e:
+                    print(f"[CacheService] Recompute failed for {key}: {e}")
+                    future.set_exception(e)
+                finally:
+                    with _inflight_lock:
+                        _inflight.pop(key, None)
+
+            if background:
+                _refresh_pool.submit(run)
+            else:
+                run()
+
+        if background:
+            return None
+        return future.result()
+
+    @staticmethod
+    def stats() -> dict:
+        """L1 hit/miss counters, memory use, active backends and the largest payload sizes (bytes)."""
+        with _payload_lock:
+            payloads = dict(sorted(_payload_sizes.items(), key=lambda kv: -kv[1]["raw"]))
+        return {**_l1.stats(), "backends": [b.name for b in _get_backends()], "payloads": payloads}
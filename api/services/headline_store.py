@@ -0,0 +1,185 @@
+"""
+Local headline store (SQLite, shared by the workers on one box).
+
+Every article seen in a ticker's news feed is stored once, keyed by its feed
+ID (or a hash of its URL or title), together with the tickers it was seen
+for, when it was first seen and its sentiment score. A refresh therefore only
+scores articles it has never seen, and a ticker's rolling sentiment is read
+back from the store, including when the feed itself can't be fetched.
+
+Each score records the lexicon version that produced it; rows read with a
+different lexicon are rescored (and rewritten) on the way out.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from core.paths import data_path
+
+# Relative paths resolve against api/, so every process started from anywhere shares one store
+NEWS_STORE_PATH = data_path("NEWS_STORE_PATH", "news.sqlite3")
+# Articles older than this (by first sight) are dropped
+NEWS_RETENTION_DAYS = int(os.environ.get("NEWS_RETENTION_DAYS", 30))
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS articles (id TEXT PRIMARY KEY, title TEXT NOT NULL, url TEXT, "
+    "published_at REAL, first_seen REAL NOT NULL, score REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS article_tickers (article_id TEXT NOT NULL, ticker TEXT NOT NULL, "
+    "first_seen REAL NOT NULL, PRIMARY KEY (article_id, ticker))",
+    "CREATE INDEX IF NOT EXISTS article_tickers_ticker ON article_tickers (ticker, first_seen)",
+    "CREATE INDEX IF NOT EXISTS articles_first_seen ON articles (first_seen)",
+)
+# Columns added after the first release, for stores created before them
+_MIGRATIONS = {"articles": {"lexicon": "TEXT"}}
+
+
+def parse_article(item: dict) -> Optional[dict]:
+    """{id, title, url, published_at} from a yfinance news item (old flat or newer nested layout)."""
+    content = item.get("content") if isinstance(item.get("content"), dict) else item
+    title = content.get("title") or ""
+    if not title:
+        return None
+
+    url = content.get("link")
+    for field in ("canonicalUrl", "clickThroughUrl"):
+        if not url and isinstance(content.get(field), dict):
+            url = content[field].get("url")
+
+    published_at = content.get("providerPublishTime")
+    if published_at is None and content.get("pubDate"):
+        try:
+            published_at = datetime.fromisoformat(content["pubDate"].replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            published_at = None
+
+    article_id = item.get("id") or item.get("uuid") or content.get("id")
+    if not article_id:
+        article_id = hashlib.sha1((url or title).encode()).hexdigest()
+    return {"id": str(article_id), "title": title, "url": url, "published_at": published_at}
+
+
+class HeadlineStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.last_prune = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            for table, columns in _MIGRATIONS.items():
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for column, kind in columns.items():
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside a writer
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def add(self, ticker: str, items: Iterable[dict], lexicon, now: float = None) -> int:
+        """
+        Records a feed's items for ticker. Only articles the store has never
+        seen are scored (in one lexicon.score_many call). Returns how many were new.
+        """
+        now = time.time() if now is None else now
+        articles = {}
+        for item in items:
+            article = parse_article(item) if isinstance(item, dict) else None
+            if article:
+                articles.setdefault(article["id"], article)
+        if not articles:
+            return 0
+
+        conn = self._conn()
+        ids = list(articles)
+        marks = ",".join("?" * len(ids))
+        known = {row[0] for row in conn.execute(f"SELECT id FROM articles WHERE id IN ({marks})", ids)}
+        new = [articles[i] for i in ids if i not in known]
+        scores = lexicon.score_many([a["title"] for a in new]) if new else []
+
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO articles (id, title, url, published_at, first_seen, score, lexicon) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(a["id"], a["title"], a["url"], a["published_at"], now, score, lexicon.version)
+                 for a, score in zip(new, scores)],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO article_tickers (article_id, ticker, first_seen) VALUES (?, ?, ?)",
+                [(i, ticker, now) for i in ids],
+            )
+        self._maybe_prune(now)
+        return len(new)
+
+    def recent(self, ticker: str, limit: int = 5, since: float = None, lexicon=None) -> List[Dict]:
+        """
+        The ticker's newest articles (by publish time, else first sight), newest
+        first. With a lexicon, scores from another lexicon version are recomputed.
+        """
+        rows = self._conn().execute(
+            "SELECT a.id, a.title, a.url, a.published_at, a.first_seen, a.score, a.lexicon "
+            "FROM article_tickers t JOIN articles a ON a.id = t.article_id "
+            "WHERE t.ticker = ? AND COALESCE(a.published_at, a.first_seen) >= ? "
+            "ORDER BY COALESCE(a.published_at, a.first_seen) DESC LIMIT ?",
+            (ticker, since or 0, limit),
+        ).fetchall()
+        articles = [
+            {"id": r[0], "title": r[1], "url": r[2], "publishedAt": r[3], "firstSeen": r[4], "score": r[5],
+             "lexicon": r[6]}
+            for r in rows
+        ]
+        if lexicon is not None:
+            self._rescore([a for a in articles if a["lexicon"] != lexicon.version], lexicon)
+        return articles
+
+    def _rescore(self, articles: List[Dict], lexicon):
+        if not articles:
+            return
+        for article, score in zip(articles, lexicon.score_many([a["title"] for a in articles])):
+            article["score"], article["lexicon"] = score, lexicon.version
+        with self._conn() as conn:
+            conn.executemany(
+                "UPDATE articles SET score = ?, lexicon = ? WHERE id = ?",
+                [(a["score"], lexicon.version, a["id"]) for a in articles],
+            )
+
+    def prune(self, before: float):
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM article_tickers WHERE article_id IN (SELECT id FROM articles WHERE first_seen < ?)",
+                (before,),
+            )
+            conn.execute("DELETE FROM articles WHERE first_seen < ?", (before,))
+
+    def _maybe_prune(self, now: float):
+        # At most hourly per process
+        if now - self.last_prune > 3600:
+            self.last_prune = now
+            self.prune(now - NEWS_RETENTION_DAYS * 86400)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> HeadlineStore:
+    """The shared store at NEWS_STORE_PATH, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HeadlineStore(NEWS_STORE_PATH)
+        return _store
@@ -0,0 +1,147 @@
+"""
+Batched technical indicators — NumPy kernels over (ticker × time) arrays.
+
+Every kernel takes a 2-D float array where each row is one ticker's series,
+right-aligned and NaN-padded on the left (rows may have different lengths).
+Results follow pandas_ta conventions: SMA needs a full window, EMA/RMA are
+seeded with the SMA of the first `length` values, Bollinger stdev uses ddof=0.
+"""
+
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# ─── Kernels ──────────────────────────────────────────────────────────────────
+
+def sma(x: np.ndarray, length: int) -> np.ndarray:
+    """Simple moving average; NaN until `length` valid values are in the window."""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < length:
+        return out
+    valid = ~np.isnan(x)
+    csum = np.cumsum(np.where(valid, x, 0.0), axis=1)
+    ccount = np.cumsum(valid, axis=1)
+    csum = np.pad(csum, ((0, 0), (1, 0)))
+    ccount = np.pad(ccount, ((0, 0), (1, 0)))
+    window_sum = csum[:, length:] - csum[:, :-length]
+    window_count = ccount[:, length:] - ccount[:, :-length]
+    out[:, length - 1:] = np.where(window_count == length, window_sum / length, np.nan)
+    return out
+
+
+def _smoothed(x: np.ndarray, length: int, alpha: float) -> np.ndarray:
+    # Exponential smoothing seeded with the SMA of each row's first `length` values.
+    seed = sma(x, length)
+    out = np.full(x.shape, np.nan)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        cur = np.where(np.isnan(prev), seed[:, t], alpha * x[:, t] + (1 - alpha) * prev)
+        out[:, t] = cur
+        prev = cur
+    return out
+
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """Exponential moving average (span=length, SMA seed)."""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    return _smoothed(x, length, 2.0 / (length + 1))
+
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """Wilder's moving average (alpha=1/length, SMA seed)."""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    return _smoothed(x, length, 1.0 / length)
+
+
+def rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    """Relative Strength Index on Wilder-smoothed gains and losses."""
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    diff = np.full(close.shape, np.nan)
+    diff[:, 1:] = close[:, 1:] - close[:, :-1]
+    with np.errstate(invalid="ignore"):
+        gains = rma(np.where(diff > 0, diff, np.where(np.isnan(diff), np.nan, 0.0)), length)
+        losses = rma(np.where(diff < 0, -diff, np.where(np.isnan(diff), np.nan, 0.0)), length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * gains / (gains + losses)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns (macd, histogram, signal)."""
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, line - signal_line, signal_line
+
+
+def bbands(close: np.ndarray, length: int = 20, std: float = 2.0) -> Tuple[np.ndarray, ...]:
+    """Returns (lower, mid, upper, bandwidth, percent)."""
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    mid = sma(close, length)
+    dev = np.full(close.shape, np.nan)
+    if close.shape[1] >= length:
+        dev[:, length - 1:] = sliding_window_view(close, length, axis=1).std(axis=-1)
+    lower = mid - std * dev
+    upper = mid + std * dev
+    width = upper - lower
+    # pandas_ta's non_zero_range: nudge flat bands off zero
+    width = np.where(width == 0, width + sys.float_info.epsilon, width)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bandwidth = 100 * width / mid
+        percent = (close - lower) / width
+    return lower, mid, upper, bandwidth, percent
+
+
+# ─── DataFrame batching ───────────────────────────────────────────────────────
+
+def stack(frames: List[pd.DataFrame], column: str) -> np.ndarray:
+    """Right-aligns one column of several frames into an (N, T) array."""
+    width = max((len(df) for df in frames), default=0)
+    out = np.full((len(frames), width), np.nan)
+    for i, df in enumerate(frames):
+        if len(df):
+            out[i, width - len(df):] = df[column].to_numpy(dtype=np.float64)
+    return out
+
+
+def add_indicators(frames: Dict[str, pd.DataFrame], sma_lengths: Iterable[int] = (20, 50), rsi_length: int = 14,
+                   bbands_length: int = 20, macd_cols: bool = False,
+                   vol_sma_col: str = "Vol_SMA_20") -> Dict[str, pd.DataFrame]:
+    """
+    Computes the analysis indicators for many tickers in one batched pass and
+    returns copies of the frames with pandas_ta-named columns appended
+    (RSI_14, SMA_n, BB*_20_2.0, MACD*_12_26_9 and a 20-bar volume SMA).
+    Pass bbands_length=0 to skip Bollinger Bands. Like pandas_ta, an indicator
+    is left out for a ticker whose history is shorter than its window.
+    """
+    tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+    if not tickers:
+        return {}
+    dfs = [frames[t] for t in tickers]
+    close = stack(dfs, "Close")
+
+    # name -> (values, minimum bars)
+    cols = {f"RSI_{rsi_length}": (rsi(close, rsi_length), rsi_length)}
+    for length in sma_lengths:
+        cols[f"SMA_{length}"] = (sma(close, length), length)
+    if bbands_length:
+        names = ("BBL", "BBM", "BBU", "BBB", "BBP")
+        for name, values in zip(names, bbands(close, bbands_length, 2.0)):
+            cols[f"{name}_{bbands_length}_2.0"] = (values, bbands_length)
+    if macd_cols:
+        line, hist, signal = macd(close)
+        cols.update({"MACD_12_26_9": (line, 26), "MACDh_12_26_9": (hist, 26), "MACDs_12_26_9": (signal, 26)})
+    if vol_sma_col:
+        cols[vol_sma_col] = (sma(stack(dfs, "Volume"), 20), 0)
+
+    out = {}
+    for i, (ticker, df) in enumerate(zip(tickers, dfs)):
+        n = len(df)
+        out[ticker] = df.assign(**{
+            name: values[i, values.shape[1] - n:] for name, (values, need) in cols.items() if n >= need
+        })
+    return out
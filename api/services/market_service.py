@@ -176,11 +176,13 @@ def _get_top_movers() -> list:
 def analyze_ticker(ticker: str) -> Optional[dict]:
     """Deep technical analysis on a single ticker (reuses market_server logic)."""
     try:
-        import pandas_ta_classic as ta
         import yfinance as yf
         import pandas as pd
 
-        df = yf.download(ticker, period="6mo", interval="1d", progress=False)
+        from services.bar_store import get_ticker_history
+        from services.indicators import add_indicators
+
+        df = get_ticker_history(ticker, period="6mo")
         if df.empty or len(df) < 30:
             return None
 
@@ -189,11 +191,8 @@ def analyze_ticker(ticker: str) -> Optional[dict]:
             df.columns = df.columns.get_level_values(0)
 
         # Indicators
-        df.ta.rsi(length=14, append=True)
-        df.ta.sma(length=50, append=True)
-        df.ta.sma(length=200, append=True)
-        df["VOL_SMA_20"] = df["Volume"].rolling(window=20).mean()
-        df.ta.macd(append=True)
+        df = add_indicators({ticker: df}, sma_lengths=(50, 200), bbands_length=0,
+                            macd_cols=True, vol_sma_col="VOL_SMA_20")[ticker]
 
         latest = df.iloc[-1]
         prev = df.iloc[-2]
@@ -306,24 +305,32 @@ def get_sector_accuracy(filter_val: str, filter_type: str = "letter", universe_t
     import random
     sample = random.sample(tickers, min(len(tickers), 15))
     
-    win_count = 0
-    try:
-        import yfinance as yf
-        data = yf.download(sample, period="7d", interval="1d", progress=False, group_by='ticker')
-        
-        for t in sample:
-            try:
-                df = data[t] if len(sample) > 1 else data
-                if df.empty or len(df) < 5: continue
-                
-                # Check 7 day return
-                start_price = float(df['Close'].iloc[0])
-                end_price = float(df['Close'].iloc[-1])
-                if end_price > start_price:
-                    win_count += 1
-            except: continue
-    except:
-        pass
+    # Per-ticker 7 day moves are shared across sectors/letters: one batched
+    # cache read, and only the misses are downloaded
+    moves = {k[len("move7d_"):]: v for k, v in CacheService.get_many(
+        [f"move7d_{t}" for t in sample], max_age_minutes=60).items()}
+    missing = [t for t in sample if t not in moves]
+    if missing:
+        fresh = {}
+        try:
+            import yfinance as yf
+            data = yf.download(missing, period="7d", interval="1d", progress=False, group_by='ticker')
+            
+            for t in missing:
+                try:
+                    df = data[t] if len(missing) > 1 else data
+                    if df.empty or len(df) < 5: continue
+                    
+                    # Check 7 day return
+                    fresh[t] = {"start": float(df['Close'].iloc[0]), "end": float(df['Close'].iloc[-1])}
+                except: continue
+        except:
+            pass
+        if fresh:
+            CacheService.set_many({f"move7d_{t}": move for t, move in fresh.items()})
+            moves.update(fresh)
+
+    win_count = sum(1 for move in moves.values() if move["end"] > move["start"])
 
     accuracy = (win_count / len(sample)) * 100 if sample else 0
     result = {
@@ -381,66 +388,65 @@ def get_smart_batch(letter: Optional[str] = None, sector: Optional[str] = None,
     # Take up to 30 tickers to ensure we finish within timeout on free tier
     target_tickers = tickers[:30]
     
-    # 2. Get Accuracy Data (Cached)
+    # 2. Get Accuracy Data (Cached). This is the batch's only cache traffic: one read
+    # of the accuracy result, then one batched read of the sampled per-ticker moves.
+    # The momentum scan below reads the local bar store, not the cache.
     accuracy_data = get_sector_accuracy(filter_val, filter_type, universe_type)
     
     # 3. Optimized Consolidated Scan
     if strategy == "momentum":
         try:
-            # Single large batch download with explicit period
-            # Period 15d is enough for 10-day SMA and 5-day move checks
-            batch_data = yf.download(target_tickers, period="15d", group_by='ticker', threads=True, progress=False, timeout=12)
-            
-            for ticker in target_tickers:
-                try:
-                    df = batch_data[ticker] if len(target_tickers) > 1 else batch_data
-                    if df.empty or len(df) < 5: continue
-                    
-                    latest = df.iloc[-1]
-                    prev = df.iloc[-2]
-                    price = float(latest['Close'])
-                    if price <= 0: continue
-                    
-                    change_pct = ((price - float(prev['Close'])) / float(prev['Close'])) * 100
-                    
-                    # consolidated check (from scan_volatility_setup)
-                    # 1. Volatility check
-                    max_gain_5d = df['Close'].pct_change().tail(5).max()
-                    if max_gain_5d < 0.04: continue # Slightly less strict
-                    
-                    # 2. Consolidation check
-                    high_5d = df['High'].tail(5).max()
-                    if price < (high_5d * 0.80): continue # 20% pullback allowed for pennies
-                    
-                    # 3. Scoring
-                    score = 2
-                    signals = []
-                    
-                    # Simple SMA-10 for momentum
-                    sma_10 = df['Close'].rolling(window=10).mean().iloc[-1]
-                    if price > sma_10:
-                        score += 1
-                        signals.append("Bullish Trend")
-                    
-                    if change_pct > 2:
-                        score += 1
-                        signals.append("Active Momentum")
-                    
-                    # Relative Volume Estimate
-                    avg_vol = df['Volume'].tail(10).mean()
-                    if avg_vol > 0 and latest['Volume'] > (avg_vol * 1.2):
-                        score += 1
-                        signals.append("Volume Spiking")
+            from services.price_panel import load_panel
+            import numpy as np
 
-                    candidates.append({
-                        "ticker": ticker,
-                        "price": check_nan(round(price, 3)),
-                        "changePct": check_nan(round(change_pct, 2)),
-                        "score": score,
-                        "signals": signals[:1],
-                        "verdict": "BULLISH" if score >= 4 else "NEUTRAL"
-                    })
-                except: continue
+            # Period 15d is enough for 10-day SMA and 5-day move checks
+            panel = load_panel(target_tickers, period="15d")
+            closes = panel.bars(15, "Close")
+            highs = panel.bars(5, "High")
+            volumes = panel.bars(10, "Volume")
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                price = closes[:, -1]
+                prev = closes[:, -2]
+                change_pct = (price - prev) / prev * 100
+
+                # consolidated check (from scan_volatility_setup)
+                # 1. Volatility check (slightly less strict)
+                pct = closes[:, 1:] / closes[:, :-1] - 1
+                max_gain_5d = np.nanmax(pct[:, -5:], axis=1)
+                # 2. Consolidation check (20% pullback allowed for pennies)
+                high_5d = np.nanmax(highs, axis=1)
+                # 3. Simple SMA-10 for momentum, relative volume estimate
+                sma_10 = closes[:, -10:].mean(axis=1)
+                avg_vol = np.nanmean(volumes, axis=1)
+
+                eligible = (
+                    (panel.bar_counts() >= 5) & (price > 0)
+                    & ~(max_gain_5d < 0.04)
+                    & ~(price < high_5d * 0.80)
+                )
+                bullish_trend = price > sma_10
+                active = change_pct > 2
+                spiking = (avg_vol > 0) & (volumes[:, -1] > avg_vol * 1.2)
+
+            for row in np.flatnonzero(eligible):
+                score = 2 + int(bullish_trend[row]) + int(active[row]) + int(spiking[row])
+                signals = []
+                if bullish_trend[row]:
+                    signals.append("Bullish Trend")
+                if active[row]:
+                    signals.append("Active Momentum")
+                if spiking[row]:
+                    signals.append("Volume Spiking")
+
+                candidates.append({
+                    "ticker": panel.tickers[row],
+                    "price": check_nan(round(float(price[row]), 3)),
+                    "changePct": check_nan(round(float(change_pct[row]), 2)),
+                    "score": score,
+                    "signals": signals[:1],
+                    "verdict": "BULLISH" if score >= 4 else "NEUTRAL"
+                })
         except Exception as e:
             print(f"Scan optimization error: {e}")
 
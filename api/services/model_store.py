@@ -0,0 +1,259 @@
+"""
+Incremental next-close models — sliding-window least squares kept as
+sufficient statistics (XᵀX, Xᵀy, yᵀy) and persisted next to the bar store.
+
+Same model as services.predictor (Close[t+1] ~ Open, High, Low, Volume,
+RSI_14 + bias), but instead of refitting ~125 rows on every scan each ticker
+keeps its statistics on disk and folds in only the (features, next close)
+pairs that completed since the last update: a rank-1 update, plus a rank-1
+downdate for the pair that slides out of the window. Pairs whose target is a
+still-forming intraday bar are held back until that session closes.
+"""
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: thread locks only
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from services import bar_store
+from services.predictor import FEATURES
+
+logger = logging.getLogger(__name__)
+
+# Training pairs kept per ticker (~6 months of sessions)
+MODEL_WINDOW = int(os.environ.get("MODEL_WINDOW", 120))
+# Re-accumulate from the stored rows every so often to flush downdate drift
+REBUILD_EVERY = 250
+
+_write_lock = threading.Lock()
+_ticker_locks: Dict[str, threading.Lock] = {}
+_ticker_locks_lock = threading.Lock()
+
+
+class RollingModel:
+    """Least squares over the last `window` pairs, updated in O(features²) per pair."""
+
+    def __init__(self, scale: np.ndarray, window: int):
+        k = len(scale) + 1  # features + bias
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.window = window
+        # Ring buffer of [scaled features..., 1, target] rows and their feature dates
+        self.rows = np.zeros((window, k + 1))
+        self.dates = np.zeros(window, dtype="datetime64[ns]")
+        self.start = 0
+        self.count = 0
+        self.updates = 0
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.yty = 0.0
+
+    @property
+    def last_date(self) -> Optional[np.datetime64]:
+        if not self.count:
+            return None
+        return self.dates[(self.start + self.count - 1) % self.window]
+
+    def _ordered(self) -> np.ndarray:
+        return (self.start + np.arange(self.count)) % self.window
+
+    def _accumulate(self, row: np.ndarray, sign: float):
+        x, y = row[:-1], row[-1]
+        self.xtx += sign * np.outer(x, x)
+        self.xty += sign * x * y
+        self.yty += sign * y * y
+
+    def _rebuild(self):
+        rows = self.rows[self._ordered()]
+        x, y = rows[:, :-1], rows[:, -1]
+        self.xtx = x.T @ x
+        self.xty = x.T @ y
+        self.yty = float(y @ y)
+
+    def push(self, date, features: np.ndarray, target: float):
+        """Adds one (features at `date`, next close) pair, evicting the oldest if full."""
+        row = np.r_[features / self.scale, 1.0, target]
+        if self.count < self.window:
+            slot = (self.start + self.count) % self.window
+            self.count += 1
+        else:
+            slot = self.start
+            self._accumulate(self.rows[slot], -1)
+            self.start = (self.start + 1) % self.window
+        self.rows[slot] = row
+        self.dates[slot] = date
+        self._accumulate(row, 1)
+
+        self.updates += 1
+        if self.updates % REBUILD_EVERY == 0:
+            self._rebuild()
+
+    def coef(self) -> np.ndarray:
+        # pinv gives lstsq's minimum-norm answer when columns are collinear
+        return np.linalg.pinv(self.xtx) @ self.xty
+
+    def predict(self, features: np.ndarray) -> dict:
+        """{"predicted", "r2", "n_obs"} for the given latest feature row."""
+        if not self.count:
+            return {"predicted": float("nan"), "r2": float("nan"), "n_obs": 0}
+        theta = self.coef()
+        predicted = float(np.r_[features / self.scale, 1.0] @ theta)
+
+        n = self.xtx[-1, -1]
+        sst = self.yty - self.xty[-1] ** 2 / n
+        sse = max(self.yty - 2 * theta @ self.xty + theta @ self.xtx @ theta, 0.0)
+        r2 = float(1 - sse / sst) if sst > 0 else float("nan")
+        return {"predicted": predicted, "r2": r2, "n_obs": int(self.count)}
+
+    # ─── Persistence ──────────────────────────────────────────────────────────
+
+    def to_arrays(self) -> dict:
+        order = self._ordered()
+        return {
+            "scale": self.scale, "rows": self.rows[order], "dates": self.dates[order],
+            "xtx": self.xtx, "xty": self.xty, "yty": np.float64(self.yty), "updates": np.int64(self.updates),
+        }
+
+    @classmethod
+    def from_arrays(cls, data, window: int) -> "RollingModel":
+        model = cls(data["scale"], window)
+        rows, dates = data["rows"][-window:], data["dates"][-window:]
+        model.rows[: len(rows)] = rows
+        model.dates[: len(dates)] = dates
+        model.count = len(rows)
+        model.updates = int(data["updates"])
+        if len(data["rows"]) > window:
+            model._rebuild()
+        else:
+            model.xtx, model.xty, model.yty = data["xtx"], data["xty"], float(data["yty"])
+        return model
+
+
+# ─── Files ────────────────────────────────────────────────────────────────────
+
+def _path(ticker: str) -> str:
+    return os.path.join(bar_store.BAR_STORE_DIR, "_models", ticker.replace("/", "_") + ".npz")
+
+
+@contextmanager
+def _locked(ticker: str):
+    """
+    Serializes load → fold → save for one ticker: across threads, and across
+    processes (analysis pool workers, a second server) through a lock file.
+    """
+    with _ticker_locks_lock:
+        lock = _ticker_locks.setdefault(ticker, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        path = _path(ticker) + ".lock"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_model(ticker: str) -> Optional[RollingModel]:
+    """Returns the stored model for a ticker, or None if there is none (or it is unreadable)."""
+    path = _path(ticker)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            return RollingModel.from_arrays(data, MODEL_WINDOW)
+    except Exception as e:
+        logger.warning(f"Corrupt model file for {ticker}, discarding: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def save_model(ticker: str, model: RollingModel):
+    """Atomically replaces the stored model for a ticker."""
+    path = _path(ticker)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            np.savez(f, **model.to_arrays())
+        with _write_lock:
+            os.replace(tmp, path)
+    except Exception as e:
+        logger.error(f"Failed to persist model for {ticker}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+# ─── Public API ───────────────────────────────────────────────────────────────
+
+def _pairs(df: pd.DataFrame, features: List[str], final_through=None):
+    """(feature dates, feature rows, targets) for every complete training pair in the frame."""
+    frame = df.to_numpy(dtype=np.float64)
+    values = frame[:, [df.columns.get_loc(f) for f in features]]
+    dates = df.index.values
+    targets = frame[1:, df.columns.get_loc("Close")]
+    # Same rows the batch fit keeps: nothing missing anywhere on the feature bar
+    usable = ~np.isnan(frame[:-1]).any(axis=1) & ~np.isnan(targets)
+    if final_through is not None:
+        usable &= dates[1:] <= np.datetime64(pd.Timestamp(final_through))
+    return dates[:-1][usable], values[:-1][usable], targets[usable]
+
+
+def update_model(ticker: str, df: pd.DataFrame, final_through=None, features: List[str] = FEATURES) -> dict:
+    """
+    Folds the frame's new training pairs into the ticker's stored model and
+    predicts the next close from its latest bar. `final_through` is the last
+    session whose close is final; later bars are never used as targets.
+    Returns {"predicted", "r2", "n_obs"} like predictor.predict_frames.
+    """
+    if df is None or df.empty or not set(features).issubset(df.columns):
+        return {"predicted": float("nan"), "r2": float("nan"), "n_obs": 0}
+
+    dates, values, targets = _pairs(df, features, final_through)
+    with _locked(ticker):
+        model = load_model(ticker)
+        if model is not None and model.last_date is not None and model.last_date not in df.index.values:
+            # Stored window no longer overlaps this history: start over
+            model = None
+
+        if model is None:
+            scale = np.nanmean(np.abs(values), axis=0) if len(values) else np.ones(len(features))
+            model = RollingModel(np.where(scale > 0, scale, 1.0), MODEL_WINDOW)
+            new = np.arange(len(dates))[-MODEL_WINDOW:]
+        else:
+            new = np.flatnonzero(dates > model.last_date)
+
+        for i in new:
+            model.push(dates[i], values[i], targets[i])
+        if len(new):
+            save_model(ticker, model)
+
+    latest = df[features].iloc[-1].to_numpy(dtype=np.float64)
+    return model.predict(latest)
+
+
+def update_models(frames: Dict[str, pd.DataFrame], final_through=None, features: List[str] = FEATURES) -> Dict[str, dict]:
+    """update_model for every frame: {ticker: {"predicted", "r2", "n_obs"}}."""
+    out = {}
+    for ticker, df in frames.items():
+        try:
+            out[ticker] = update_model(ticker, df, final_through, features)
+        except Exception as e:
+            logger.warning(f"Model update failed for {ticker}: {e}")
+    return out
@@ -1,12 +1,18 @@
 
-import yfinance as yf
-import pandas as pd
+import os
 import numpy as np
-from typing import List, Dict, Optional
-from services.penny_service import get_universe, _deep_analyze, _market_progress
+from typing import List, Dict
+from services.penny_service import get_universe, analyze_many, fetch_infos, _market_progress
+from services.price_panel import load_panel
+from services.indicators import add_indicators
 from services.news_service import NewsService
 from services.cache_service import CacheService
 
+# Tickers deep-analyzed per hunt (the best of the whole-universe pre-screen)
+MOONSHOT_CANDIDATES = int(os.environ.get("MOONSHOT_CANDIDATES", 150))
+MOONSHOT_INFO_WORKERS = int(os.environ.get("MOONSHOT_INFO_WORKERS", 10))
+
+
 class MoonshotService:
     @staticmethod
     def get_top_moonshots() -> List[Dict]:
@@ -16,118 +22,53 @@ class MoonshotService:
         - 40% Fundamentals (Growth, Mkt Cap)
         - 30% Technicals (Volume Surge, Momentum)
         - 30% Sentiment (AI News Analysis)
+
+        Cached for 4 hours as they are deeper scans; an expired result (up to a
+        day old) is served while one background rescan refreshes it.
         """
-        # Try cache first (4 hours for moonshots as they are deeper scans)
-        cached = CacheService.get("moonshot_hunter", max_age_minutes=240)
-        if cached:
-            return cached
+        return CacheService.get_or_compute(
+            "moonshot_hunter", MoonshotService._compute_moonshots, ttl_minutes=240, stale_minutes=1440
+        )
 
+    @staticmethod
+    def _compute_moonshots() -> List[Dict]:
         universe = get_universe()
         if not universe:
             return []
 
-        # 1. Broad Filter (Micro-cap + Price + Volume)
-        # We take a sample of the universe to avoid hitting yfinance too hard
-        # and prioritize based on recent volume from basic penny list
-        candidates = universe[:150] 
-        
-        scored_stocks = []
-        market_prog = _market_progress()
-
-        print(f"Moonshot Scan started for {len(candidates)} candidates...")
-
-        for ticker in candidates:
-            try:
-                # Get deep technical/fundamental data
-                data = _deep_analyze(ticker, market_prog)
-                if not data:
-                    continue
-
-                # Filter for "Moonshot" profile
-                # 10x potential usually means Market Cap < 500M
-                mkt_cap = data.get("marketCap", 0)
-                if not (10_000_000 < mkt_cap < 600_000_000):
-                    continue
-
-                # Start Moonshot Scoring (0-100)
-                moon_score = 0
-                reasoning = []
-
-                # A. Fundamental Alpha (Max 40)
-                # We love growth.
-                growth_score = 0
-                if data.get("isProfitable"):
-                    growth_score += 15
-                    reasoning.append("Profitable micro-cap foundation")
-                
-                # Check for revenue/earnings growth if info available
-                # (Using yfinance info directly for extra depth)
-                try:
-                    info = yf.Ticker(ticker).info
-                    rev_growth = info.get("revenueGrowth", 0) or 0
-                    if rev_growth > 0.5: # > 50% growth
-                        growth_score += 25
-                        reasoning.append(f"Explosive Revenue Growth ({rev_growth*100:.1f}%)")
-                    elif rev_growth > 0.2:
-                        growth_score += 15
-                        reasoning.append(f"Strong Revenue Growth ({rev_growth*100:.1f}%)")
-                except:
-                    pass
-                moon_score += min(growth_score, 40)
-
-                # B. Technical Thrust (Max 30)
-                tech_score = 0
-                vol_ratio = data.get("projVolume", 0) / (data.get("volume") if data.get("volume") > 0 else 1)
-                # Actually _deep_analyze already calculates a vol_ratio implicitly in signals
-                # but let's be more specific here.
-                if data.get("score", 0) >= 5: # high base score
-                    tech_score += 15
-                
-                if "Massive Volume" in str(data.get("signals")):
-                    tech_score += 15
-                    reasoning.append("Abnormal Institutional Accumulation")
-                
-                # Breaking 52-week highs or High Velocity Move is a moonshot signal
-                p = data.get("price", 0)
-                y_high = data.get("yearHigh", 0)
-                
-                # Check for new velocity signals
-                data_signals = str(data.get("signals", []))
-                if "Vertical Move" in data_signals:
-                    tech_score += 15
-                    reasoning.append("Explosive Vertical Momentum Detected")
-                elif "High Velocity" in data_signals:
-                    tech_score += 10
-                    reasoning.append("Strong Velocity Breakout")
-                
-                if p > 0 and y_high > 0 and p >= (y_high * 0.9):
-                    tech_score += 10
-                    reasoning.append("Breaking 52-Week High Resistance")
-                
-                moon_score += min(tech_score, 30)
+        # One panel for the whole universe; pass 2 reuses its histories
+        try:
+            panel = load_panel(universe, period="6mo")
+        except Exception as e:
+            print(f"Moonshot panel load failed: {e}")
+            return []
 
-                # C. Sentiment Alpha (Max 30) - Aggregated later for Top 5
-                # For now, we use a placeholder or quick check
-                # We will perform deep sentiment ONLY for the top 10 candidates to save API/Time
-                
-                data["moonScore"] = moon_score
-                data["moonReasoning"] = reasoning
-                scored_stocks.append(data)
+        # 1. Broad Filter: vectorized thrust pre-score over the whole universe,
+        # only the best MOONSHOT_CANDIDATES go on to deep analysis
+        candidates = MoonshotService._prescreen(panel, MOONSHOT_CANDIDATES)
+        print(f"Moonshot Scan: {len(candidates)} of {len(panel)} tickers pass the pre-screen...")
+        if not candidates:
+            return []
+
+        # 2. Deep analysis with one concurrent .info prefetch, shared with the growth scoring
+        infos = fetch_infos(candidates, workers=MOONSHOT_INFO_WORKERS)
+        histories = add_indicators({t: panel.frame(t) for t in candidates})
+        analyses = analyze_many(histories, _market_progress(), infos=infos)
+        records = [analyses[t] for t in candidates if analyses.get(t)]
 
-            except Exception as e:
-                print(f"Error scoring {ticker}: {e}")
-                continue
+        scored_stocks = MoonshotService._score(records, infos)
 
         # Sort and take top 10 for deep sentiment analysis
         scored_stocks.sort(key=lambda x: x["moonScore"], reverse=True)
         top_candidates = scored_stocks[:10]
 
-        # D. Add Deep Sentiment for the winners
+        # C/D. Sentiment Alpha (Max 30): deep sentiment only for the winners, fetched concurrently.
+        # Tickers that miss the deadline come back "Pending" and earn no sentiment bonus.
+        sentiments = NewsService.enrich_sentiment([c["ticker"] for c in top_candidates])
         final_top = []
         for stock in top_candidates:
-            sentiment_data = NewsService.analyze_tickers([stock["ticker"]])
-            if sentiment_data:
-                s = sentiment_data[0]
+            s = sentiments.get(stock["ticker"])
+            if s:
                 stock["sentiment"] = s["sentiment"]
                 stock["sentimentScore"] = s["sentimentScore"]
                 stock["outlook"] = s["outlook"]
@@ -142,9 +83,77 @@ class MoonshotService:
 
         # Final Sort and take Top 5
         final_top.sort(key=lambda x: x["moonScore"], reverse=True)
-        result = final_top[:5]
+        return final_top[:5]
 
-        # Cache the moonshots
-        CacheService.set("moonshot_hunter", result)
-        
-        return result
+    @staticmethod
+    def _prescreen(panel, limit: int) -> List[str]:
+        """
+        Ranks every ticker in the panel by recent thrust: relative volume, 3-day
+        rate of change and closeness to the period high. Tickers that can't be
+        deep-analyzed (under 30 bars) or aren't pennies are dropped.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price = panel.latest("Close")
+            close_3d = panel.latest("Close", lag=3)
+            volume = panel.latest("Volume")
+            avg_vol = np.nanmean(panel.bars(21, "Volume")[:, :-1], axis=1)
+            period_high = np.nanmax(panel.field("High"), axis=1)
+
+            vol_ratio = np.clip(np.nan_to_num(volume / avg_vol), 0, 10)
+            roc_3d = np.clip(np.nan_to_num(price / close_3d - 1), -1, 1)
+            near_high = np.nan_to_num(price / period_high) >= 0.9
+            prescore = vol_ratio + 10 * roc_3d + 5 * near_high
+
+            eligible = (panel.bar_counts() >= 30) & (price > 0) & (price < 5.0) & (volume > 0)
+        rows = np.flatnonzero(eligible)
+        rows = rows[np.argsort(-prescore[rows], kind="stable")][:limit]
+        return [panel.tickers[i] for i in rows]
+
+    @staticmethod
+    def _score(records: List[Dict], infos: Dict[str, dict]) -> List[Dict]:
+        """
+        Moonshot scoring (0-100 before sentiment), vectorized over all analyzed records:
+        - Fundamental Alpha (max 40): profitability and revenue growth
+        - Technical Thrust (max 30): base score, volume, velocity, 52-week high
+        10x potential usually means Market Cap < 500M, so only 10M-600M caps qualify.
+        """
+        if not records:
+            return []
+        signals = [str(r.get("signals", [])) for r in records]
+        mkt_cap = np.array([r.get("marketCap") or 0 for r in records], dtype=float)
+        profitable = np.array([bool(r.get("isProfitable")) for r in records])
+        rev_growth = np.array([(infos.get(r["ticker"]) or {}).get("revenueGrowth") or 0 for r in records], dtype=float)
+        base_score = np.array([r.get("score", 0) for r in records], dtype=float)
+        price = np.array([r.get("price") or 0 for r in records], dtype=float)
+        year_high = np.array([r.get("yearHigh") or 0 for r in records], dtype=float)
+        massive_volume = np.array(["Massive Volume" in s for s in signals])
+        vertical = np.array(["Vertical Move" in s for s in signals])
+        high_velocity = np.array(["High Velocity" in s for s in signals]) & ~vertical
+        breaking_high = (price > 0) & (year_high > 0) & (price >= year_high * 0.9)
+
+        # A. Fundamental Alpha (Max 40)
+        explosive, strong = rev_growth > 0.5, (rev_growth > 0.2) & (rev_growth <= 0.5)
+        growth_score = 15 * profitable + 25 * explosive + 15 * strong
+        # B. Technical Thrust (Max 30)
+        tech_score = 15 * (base_score >= 5) + 15 * massive_volume + 15 * vertical + 10 * high_velocity + 10 * breaking_high
+        moon_score = np.minimum(growth_score, 40) + np.minimum(tech_score, 30)
+
+        scored = []
+        for i in np.flatnonzero((mkt_cap > 10_000_000) & (mkt_cap < 600_000_000)):
+            reasoning = []
+            if profitable[i]:
+                reasoning.append("Profitable micro-cap foundation")
+            if explosive[i]:
+                reasoning.append(f"Explosive Revenue Growth ({rev_growth[i]*100:.1f}%)")
+            elif strong[i]:
+                reasoning.append(f"Strong Revenue Growth ({rev_growth[i]*100:.1f}%)")
+            if massive_volume[i]:
+                reasoning.append("Abnormal Institutional Accumulation")
+            if vertical[i]:
+                reasoning.append("Explosive Vertical Momentum Detected")
+            elif high_velocity[i]:
+                reasoning.append("Strong Velocity Breakout")
+            if breaking_high[i]:
+                reasoning.append("Breaking 52-Week High Resistance")
+            scored.append({**records[i], "moonScore": int(moon_score[i]), "moonReasoning": reasoning})
+        return scored
@@ -1,9 +1,17 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import yfinance as yf
 import pandas as pd
 from typing import List, Dict
 from services.market_service import get_market_overview
 from services.penny_service import get_basic_penny_list
 from services.cache_service import CacheService
+from services.sentiment_lexicon import Lexicon
+from services.headline_store import get_store, parse_article
 
 # Simple Financial Sentiment Lexicon
 BULLISH_WORDS = {
@@ -18,65 +26,189 @@ BEARISH_WORDS = {
     'pessimistic', 'fail', 'warning', 'concern', 'debt', 'cut'
 }
 
+# Phrases and terms that weigh more than one word (penny-stock red flags especially)
+WEIGHTED_TERMS = {
+    'beat estimates': 2, 'beat expectations': 2, 'all time high': 2, 'fda approval': 3,
+    'price target raised': 2, 'raise price target': 2,
+    'miss estimates': -2, 'miss expectations': -2, 'price target cut': -2, 'cut price target': -2,
+    'reverse split': -2, 'reverse stock split': -2, 'dilution': -2,
+    'delisting': -2, 'going concern': -3, 'bankruptcy': -3,
+}
+
+# Compiled once; scores every headline in a single pass whatever the lexicon size
+LEXICON = Lexicon.from_words(BULLISH_WORDS, BEARISH_WORDS, WEIGHTED_TERMS)
+
+# Sentiment enrichment: concurrent fetches, per-ticker timeout, overall deadline
+NEWS_CONCURRENCY = int(os.environ.get("NEWS_CONCURRENCY", 8))
+NEWS_TIMEOUT_SECONDS = float(os.environ.get("NEWS_TIMEOUT_SECONDS", 8))
+NEWS_DEADLINE_SECONDS = float(os.environ.get("NEWS_DEADLINE_SECONDS", 12))
+# Minutes a ticker's fetched sentiment is reused
+NEWS_CACHE_MINUTES = int(os.environ.get("NEWS_CACHE_MINUTES", 15))
+# Stored articles newer than this make up a ticker's rolling sentiment
+NEWS_WINDOW_HOURS = int(os.environ.get("NEWS_WINDOW_HOURS", 168))
+
+# Seconds /news/intelligence may take on a cold cache before answering with what it has
+NEWS_INTELLIGENCE_BUDGET_SECONDS = float(os.environ.get("NEWS_INTELLIGENCE_BUDGET_SECONDS", 20))
+
+# Our own threads rather than the event loop's default executor, so a deadline doesn't
+# wait on stragglers: they finish in the background and land in the cache for the next caller.
+_fetch_pool = ThreadPoolExecutor(max_workers=NEWS_CONCURRENCY * 2, thread_name_prefix="news-fetch")
+# Fetches still running, shared by every caller that asks for the same ticker meanwhile,
+# and the prices those callers already have (so a joined fetch needn't download one)
+_inflight = {}
+_inflight_prices = {}
+_inflight_lock = threading.Lock()
+
+# Intelligence sources (overview, penny list) and the backfill of partial results
+_intel_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="news-intel")
+_backfill_lock = threading.Lock()
+
+
+def _news_key(ticker: str) -> str:
+    return f"news_{ticker}"
+
+
 class NewsService:
     @staticmethod
     def analyze_tickers(tickers: List[str]) -> List[Dict]:
-        """Analyze a specific list of tickers for news sentiment."""
-        results = []
-        # Limit to 10 tickers per batch to prevent timeouts/rate limits if called directly
-        # For larger lists, the caller should handle batching or we loop here.
-        # We'll process all provided, assuming the controller limits the input size.
-        
-        for ticker in tickers:
+        """Analyze a specific list of tickers for news sentiment, sorted by sentiment magnitude."""
+        results = list(NewsService.enrich_sentiment(tickers).values())
+        results.sort(key=NewsService._rank, reverse=True)
+        return results
+
+    @staticmethod
+    def _rank(result: Dict):
+        # Finished results first, then by sentiment magnitude
+        return (not result.get('pending'), abs(result['sentimentScore']), result['sentimentScore'])
+
+    @staticmethod
+    def enrich_sentiment(tickers: List[str], deadline: float = None, timeout: float = None,
+                         concurrency: int = None, prices: Dict[str, tuple] = None) -> Dict[str, Dict]:
+        """
+        Blocking wrapper around enrich_sentiment_async for worker threads
+        (not for use on a thread that is already running an event loop).
+        """
+        return asyncio.run(NewsService.enrich_sentiment_async(tickers, deadline, timeout, concurrency, prices))
+
+    @staticmethod
+    async def enrich_sentiment_async(tickers: List[str], deadline: float = None, timeout: float = None,
+                                     concurrency: int = None, prices: Dict[str, tuple] = None) -> Dict[str, Dict]:
+        """
+        News sentiment for many tickers at once: {ticker: result}, in input order.
+        Cached tickers are served from one batched read; the rest are fetched
+        concurrently (at most `concurrency` at a time, each given `timeout`
+        seconds). Returns when every fetch has finished or `deadline` seconds
+        have passed; tickers still outstanding are marked pending. A ticker
+        already being fetched for another caller joins that fetch.
+        prices: {ticker: (price, changePct)} the caller already has, which
+        saves the per-ticker price download.
+        """
+        deadline = NEWS_DEADLINE_SECONDS if deadline is None else deadline
+        timeout = NEWS_TIMEOUT_SECONDS if timeout is None else timeout
+        semaphore = asyncio.Semaphore(concurrency or NEWS_CONCURRENCY)
+        prices = prices or {}
+
+        tickers = list(dict.fromkeys(tickers))
+        keys = {t: _news_key(t) for t in tickers}
+        cached = CacheService.get_many(list(keys.values()), max_age_minutes=NEWS_CACHE_MINUTES)
+        results = {t: cached[k] for t, k in keys.items() if k in cached}
+
+        async def fetch(ticker: str) -> Dict:
+            async with semaphore:
+                future = NewsService._start_fetch(ticker, prices.get(ticker))
+                try:
+                    # Shielded: giving up on a shared fetch mustn't cancel it for the others
+                    return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+                except asyncio.TimeoutError:
+                    print(f"Warning: news fetch for {ticker} timed out after {timeout}s")
+                    return NewsService._pending(ticker)
+
+        tasks = {asyncio.ensure_future(fetch(t)): t for t in tickers if t not in results}
+        if tasks:
+            done, late = await asyncio.wait(tasks, timeout=deadline)
+            for task in done:
+                results[tasks[task]] = task.result()
+            for task in late:
+                task.cancel()
+                results[tasks[task]] = NewsService._pending(tasks[task])
+        return {t: results[t] for t in tickers}
+
+    @staticmethod
+    def _start_fetch(ticker: str, price: tuple = None):
+        with _inflight_lock:
+            if price:
+                # Read by the fetch when it gets to the price, whoever started it
+                _inflight_prices.setdefault(ticker, price)
+            future = _inflight.get(ticker)
+            if future is not None:
+                return future
+            future = _fetch_pool.submit(NewsService._fetch_sentiment, ticker)
+            _inflight[ticker] = future
+        # Outside the lock: a fetch that already finished runs the callback right here
+        future.add_done_callback(lambda _: NewsService._end_fetch(ticker, future))
+        return future
+
+    @staticmethod
+    def _end_fetch(ticker: str, future):
+        with _inflight_lock:
+            if _inflight.get(ticker) is future:
+                del _inflight[ticker]
+                _inflight_prices.pop(ticker, None)
+
+    @staticmethod
+    def _known_price(ticker: str):
+        with _inflight_lock:
+            return _inflight_prices.get(ticker)
+
+    @staticmethod
+    def _score_feed(news: list, limit: int) -> List[Dict]:
+        """The feed's first articles, parsed and scored without the headline store."""
+        articles = [a for a in (parse_article(item) for item in news if isinstance(item, dict)) if a]
+        return [{**article, "score": LEXICON.score(article["title"])} for article in articles[:limit]]
+
+    @staticmethod
+    def _fetch_sentiment(ticker: str, price: tuple = None) -> Dict:
+        """
+        Headlines for one ticker, scored, plus its price: the given
+        (price, changePct), one a caller sharing this fetch has, or else a 1d
+        download. Successful results are cached.
+        """
+        try:
+            stock = yf.Ticker(ticker)
+            # yfinance news fetching can be flaky or network-dependent
+            try:
+                news = stock.news
+                if not news:
+                    news = []
+            except Exception as e:
+                print(f"Warning: yfinance news fetch failed for {ticker}: {e}")
+                news = []
+
+            # Only articles the store hasn't seen are scored; the rolling sentiment
+            # (top 5 within the window) is read back from the store
             try:
-                stock = yf.Ticker(ticker)
-                # yfinance news fetching can be flaky or network-dependent
+                store = get_store()
                 try:
-                    news = stock.news
-                    if not news:
-                        news = []
+                    store.add(ticker, news, LEXICON)
                 except Exception as e:
-                    print(f"Warning: yfinance news fetch failed for {ticker}: {e}")
-                    news = []
-                
-                # Limit to top 5
-                news = news[:5] if news else []
-                
-                sentiment_score = 0
-                summaries = []
-                
-                for item in news:
-                    # Robust extraction of title/content
-                    # yfinance structure varies between versions
-                    title = ""
-                    try:
-                        if 'content' in item and isinstance(item['content'], dict):
-                            title = item['content'].get('title', '')
-                        elif 'title' in item:
-                            title = item['title']
-                        
-                        if not title:
-                            continue
-                            
-                        title_lower = title.lower()
-                        
-                        # Basic sentiment count
-                        bull_hits = sum(1 for w in BULLISH_WORDS if w in title_lower)
-                        bear_hits = sum(1 for w in BEARISH_WORDS if w in title_lower)
-                        
-                        sentiment_score += (bull_hits - bear_hits)
-                        summaries.append(title)
-                    except Exception:
-                        continue
-
-                # Normalization and categorization
-                sentiment_label = "Neutral"
-                if sentiment_score >= 2: sentiment_label = "Bullish"
-                elif sentiment_score <= -2: sentiment_label = "Bearish"
-                
-                # Fetch basic price data for context
-                price = 0.0
-                change_pct = 0.0
+                    print(f"Warning: headline store update failed for {ticker}: {e}")
+                news = store.recent(ticker, limit=5, since=time.time() - NEWS_WINDOW_HOURS * 3600, lexicon=LEXICON)
+            except Exception as e:
+                # A locked or unwritable store shouldn't cost the live feed
+                print(f"Warning: headline store unavailable for {ticker}, scoring the feed directly: {e}")
+                news = NewsService._score_feed(news, limit=5)
+
+            summaries = [article['title'] for article in news]
+            sentiment_score = sum(article['score'] for article in news)
+
+            # Normalization and categorization
+            sentiment_label = "Neutral"
+            if sentiment_score >= 2: sentiment_label = "Bullish"
+            elif sentiment_score <= -2: sentiment_label = "Bearish"
+
+            # Fetch basic price data for context, unless the caller already has it
+            price, change_pct = price or NewsService._known_price(ticker) or (0.0, 0.0)
+            if not price:
                 try:
                     # optim: fetch minimal history
                     price_info = stock.history(period="1d")
@@ -89,71 +221,150 @@ class NewsService:
                 except Exception as e:
                     print(f"Warning: price fetch failed for {ticker} in news service: {e}")
 
-                results.append({
-                    "ticker": ticker,
-                    "price": price,
-                    "changePct": change_pct,
-                    "sentimentScore": sentiment_score,
-                    "sentiment": sentiment_label,
-                    "newsCount": len(news),
-                    "headline": summaries[0] if summaries else "No recent headlines detected",
-                    "outlook": NewsService._generate_outlook(sentiment_score, ticker)
-                })
+            result = {
+                "ticker": ticker,
+                "price": price,
+                "changePct": change_pct,
+                "sentimentScore": sentiment_score,
+                "sentiment": sentiment_label,
+                "newsCount": len(news),
+                "headline": summaries[0] if summaries else "No recent headlines detected",
+                "outlook": NewsService._generate_outlook(sentiment_score, ticker)
+            }
+            CacheService.set(_news_key(ticker), result)
+            return result
 
-            except Exception as e:
-                print(f"Critical News Analysis Error for {ticker}: {e}")
-                # Return a safe default object to prevent frontend crash
-                results.append({
-                    "ticker": ticker,
-                    "price": 0.0,
-                    "changePct": 0.0,
-                    "sentimentScore": 0,
-                    "sentiment": "Neutral",
-                    "newsCount": 0,
-                    "headline": "Analysis data unavailable",
-                    "outlook": "Unable to retrieve news data at this time."
-                })
-                continue
-        
-        # Sort by sentiment magnitude
-        results.sort(key=lambda x: (abs(x['sentimentScore']), x['sentimentScore']), reverse=True)
-        return results
+        except Exception as e:
+            print(f"Critical News Analysis Error for {ticker}: {e}")
+            # Return a safe default object to prevent frontend crash
+            return {
+                "ticker": ticker,
+                "price": 0.0,
+                "changePct": 0.0,
+                "sentimentScore": 0,
+                "sentiment": "Neutral",
+                "newsCount": 0,
+                "headline": "Analysis data unavailable",
+                "outlook": "Unable to retrieve news data at this time."
+            }
+
+    @staticmethod
+    def _pending(ticker: str) -> Dict:
+        """Placeholder for a ticker whose fetch missed the deadline; it lands in the cache when done."""
+        return {
+            "ticker": ticker,
+            "price": 0.0,
+            "changePct": 0.0,
+            "sentimentScore": 0,
+            "sentiment": "Pending",
+            "newsCount": 0,
+            "headline": "News analysis in progress",
+            "outlook": f"News for {ticker} is still being gathered. Check back shortly.",
+            "pending": True
+        }
 
     @staticmethod
-    def get_ai_intelligence() -> List[Dict]:
-        """Aggregate hot stocks, fetch news, and rate sentiment. Top 10 only."""
-        
+    def get_ai_intelligence(budget: float = None) -> List[Dict]:
+        """
+        Aggregate hot stocks, fetch news, and rate sentiment. Top 10 only.
+        The two ticker sources are gathered concurrently and their prices
+        reused; news is enriched concurrently. On a cold cache the answer comes
+        within `budget` seconds: a source that is late or failed is left out
+        and tickers still being fetched come back pending. Such a partial
+        answer isn't cached; a background backfill re-gathers what was missing
+        and caches the complete list.
+        """
+        budget = NEWS_INTELLIGENCE_BUDGET_SECONDS if budget is None else budget
+        started = time.time()
+
         # Try cache first (1 hour TTL)
         cached = CacheService.get("news_intelligence", max_age_minutes=60)
         if cached:
             return cached
 
-        # 1. Gather "Hot" tickers
-        hot_tickers = set()
-        
-        # From Market Overview (Movers)
-        overview = get_market_overview()
-        for mover in overview.get('topMovers', []):
-            hot_tickers.add(mover['ticker'])
-            
-        # From Penny Stocks (High Volume)
-        penny_movers = get_basic_penny_list(limit=20)
-        for pm in penny_movers:
-            hot_tickers.add(pm['ticker'])
-            
+        # 1. Gather "Hot" tickers from the overview movers and the high-volume pennies, concurrently
+        sources = NewsService._start_sources()
+        prices, complete = NewsService._hot_tickers(sources, budget)
+
         # Limited list for deep analysis (protecting rate limits)
-        candidates = list(hot_tickers)[:15]
-        
-        # Use simple batched analysis
-        results = NewsService.analyze_tickers(candidates)
-        
-        top_10 = results[:10]
-        
-        # Cache results
-        CacheService.set("news_intelligence", top_10)
-        
+        candidates = list(prices)[:15]
+        sentiments = {}
+        if candidates:
+            remaining = max(budget - (time.time() - started), 0.0)
+            sentiments = NewsService.enrich_sentiment(candidates, deadline=remaining, prices=prices)
+        top_10 = NewsService._intelligence_top(sentiments)
+
+        if complete and not any(s.get('pending') for s in sentiments.values()):
+            if top_10:
+                # Cache results
+                CacheService.set("news_intelligence", top_10)
+        elif _backfill_lock.acquire(blocking=False):
+            # Partial answer: don't cache it; finish the sources and stragglers in the background instead
+            _intel_pool.submit(NewsService._backfill_intelligence, sources)
+
         return top_10
 
+    @staticmethod
+    def _start_sources() -> Dict[str, tuple]:
+        """{name: (future, fn, args)} for the ticker sources, submitted to the intelligence pool."""
+        specs = {"market overview": (get_market_overview, ()), "penny list": (get_basic_penny_list, (20,))}
+        return {name: (_intel_pool.submit(fn, *args), fn, args) for name, (fn, args) in specs.items()}
+
+    @staticmethod
+    def _hot_tickers(sources: Dict[str, tuple], timeout: float):
+        """
+        ({ticker: (price, changePct)}, complete) from the sources answered
+        within timeout; complete is False when a source is missing.
+        """
+        wait([future for future, _, _ in sources.values()], timeout=timeout)
+        found = {name: NewsService._source_result(future, name) for name, (future, _, _) in sources.items()}
+        overview, penny_movers = found["market overview"] or {}, found["penny list"] or []
+
+        # Both sources carry the latest price; news fetches reuse it
+        prices = {}
+        for stock in overview.get('topMovers', []) + penny_movers:
+            prices.setdefault(stock['ticker'], (stock['price'], stock['changePct']))
+        return prices, all(result is not None for result in found.values())
+
+    @staticmethod
+    def _intelligence_top(sentiments: Dict[str, Dict]) -> List[Dict]:
+        return sorted(sentiments.values(), key=NewsService._rank, reverse=True)[:10]
+
+    @staticmethod
+    def _source_result(future, name: str):
+        if not future.done():
+            print(f"Warning: {name} missed the news intelligence budget")
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Warning: {name} failed for news intelligence: {e}")
+            return None
+
+    @staticmethod
+    def _backfill_intelligence(sources: Dict[str, tuple]):
+        """
+        Completes a partial answer and caches it: waits out the late sources,
+        re-runs the failed ones, then waits out the pending news fetches
+        (joining them, not repeating them).
+        """
+        try:
+            retried = {
+                name: (_intel_pool.submit(fn, *args) if future.done() and future.exception() else future, fn, args)
+                for name, (future, fn, args) in sources.items()
+            }
+            prices, complete = NewsService._hot_tickers(retried, NEWS_INTELLIGENCE_BUDGET_SECONDS)
+            candidates = list(prices)[:15]
+            if not complete or not candidates:
+                return
+            sentiments = NewsService.enrich_sentiment(candidates, deadline=NEWS_TIMEOUT_SECONDS + 1, prices=prices)
+            if not any(s.get('pending') for s in sentiments.values()):
+                CacheService.set("news_intelligence", NewsService._intelligence_top(sentiments))
+        except Exception as e:
+            print(f"Warning: news intelligence backfill failed: {e}")
+        finally:
+            _backfill_lock.release()
+
     @staticmethod
     def _generate_outlook(score: int, ticker: str) -> str:
         if score > 2:
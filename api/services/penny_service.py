@@ -2,6 +2,7 @@
 Penny stock analysis service — wraps existing penny_loader.py and penny_server.py logic.
 """
 
+import os
 import warnings
 import traceback
 import logging
@@ -9,13 +10,21 @@ import gc
 from typing import Optional, List
 import pytz
 from datetime import datetime
-from datetime import datetime
+from datetime import datetime, timedelta
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from concurrent.futures.process import BrokenProcessPool
 
 # New Signals Module
 from services.signals import check_structure_liquidity, check_wyckoff_spring, detect_momentum_velocity
+from services.bar_store import BAR_REFRESH_MINUTES, get_history, get_ticker_history
+from services.price_panel import load_panel
+from services.indicators import add_indicators
+from services.model_store import update_model, update_models
+from services.screen import run_screen, PENNY_LIST_SCREEN, PENNY_SCAN_SCREEN, PENNY_BATCH_SCREEN
+from services.scan_snapshot import paginate
+from services.pipeline import run_pipeline
+from services import analysis_pool
 
 warnings.filterwarnings("ignore")
 
@@ -23,28 +32,13 @@ logger = logging.getLogger(__name__)
 
 # Render Free Tier Safety Limits
 MAX_UNIVERSE_SIZE = int(os.environ.get("MAX_UNIVERSE_SIZE", 1000))
-
-# ─── Robust Helpers ──────────────────────────────────────────────────────────
-
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
-       retry=retry_if_exception_type((requests.exceptions.RequestException, ImportError, ConnectionError)))
-def _safe_download(tickers, period="5d", timeout=15):
-    """
-    Robust download wrapper with retries.
-    """
-    import yfinance as yf
-    try:
-        data = yf.download(tickers, period=period, group_by="ticker", threads=False, progress=False, timeout=timeout)
-        if data is None or data.empty:
-             # Force retry on empty data if it's expected to exist
-             # But yfinance might return empty if market is closed or weird error. 
-             # We raise to trigger retry only if it looks like a transient network issue 
-             # (hard to distinguish, but let's assume empty means bad fetch here)
-             raise requests.exceptions.RequestException("Empty data returned from yfinance")
-        return data
-    except Exception as e:
-        logger.warning(f"Download failed (attempting retry): {e}")
-        raise
+# Tickers (top by volume) deep-analyzed into each full scan snapshot
+FULL_SCAN_TARGETS = int(os.environ.get("FULL_SCAN_TARGETS", 300))
+# Full scan pipeline: tickers per chunk, workers per stage, chunks buffered between stages
+SCAN_CHUNK_SIZE = int(os.environ.get("SCAN_CHUNK_SIZE", 50))
+SCAN_FETCH_WORKERS = int(os.environ.get("SCAN_FETCH_WORKERS", 1))
+SCAN_ENRICH_WORKERS = int(os.environ.get("SCAN_ENRICH_WORKERS", 2))
+SCAN_QUEUE_SIZE = int(os.environ.get("SCAN_QUEUE_SIZE", 2))
 
 warnings.filterwarnings("ignore")
 
@@ -70,6 +64,14 @@ def _market_progress() -> float:
     return elapsed / total
 
 
+def _final_session():
+    """Latest session whose daily close is final (today only once the market has closed)."""
+    today = datetime.now(pytz.timezone("US/Eastern")).date()
+    if _market_progress() >= 1.0:
+        return today
+    return today - timedelta(days=1)
+
+
 from services.cache_service import CacheService
 
 
@@ -136,330 +138,329 @@ import requests
 
 def get_basic_penny_list(limit: int = 50) -> list:
     """Returns basic penny stock data using caching and optimized fetching."""
-    # 1. Try Cache
-    cache_key = f"penny_list_{limit}"
-    cached = CacheService.get(cache_key, max_age_minutes=10)
-    if cached:
-        return cached
+    return basic_penny_page(limit)["items"]
+
 
+def basic_penny_page(limit: int = 50, offset: int = 0, cursor: str = None, sort: str = None) -> dict:
+    """A page of the basic penny list snapshot (whole universe, by volume desc; cached 10 min)."""
+    return paginate("penny_list", _compute_basic_list, limit, offset, cursor, sort, ttl_minutes=10)
+
+
+def _compute_basic_list() -> list:
     universe = get_universe()
     if not universe:
         return []
 
-    # 2. Optimized Fetching
-    # Fetch a bit more than limit to account for filtering (price < 5, vol > 10k)
-    # But don't fetch fixed 200 if we only need 50.
-    fetch_limit = min(limit * 3, 300) 
-    tickers = universe[:fetch_limit]
-    
-    results = []
-    chunk_size = 50
-    
-    # Process in chunks
-    for i in range(0, len(tickers), chunk_size):
-        # Stop if we already have enough results
-        if len(results) >= limit:
-            break
+    try:
+        panel = load_panel(universe, period="5d")
+    except Exception as e:
+        logger.error(f"Failed to load penny list panel: {e}")
+        return []
 
-        batch = tickers[i : i + chunk_size]
-        try:
-            # Robust download with retries
-            try:
-                data = _safe_download(batch, period="5d", timeout=10)
-            except Exception as e:
-                logger.error(f"Failed to download batch after retries: {e}")
-                continue
-            
-            if data is None or data.empty:
-                continue
-
-            for ticker in batch:
-                try:
-                    if len(batch) == 1:
-                        df = data
-                    else:
-                        if ticker not in data.columns.levels[0]:
-                            continue
-                        df = data[ticker]
-                    
-                    if df.empty: continue
-                        
-                    latest = df.iloc[-1]
-                    import pandas as pd
-                    if pd.isna(latest["Close"]): continue
-                        
-                    price = float(latest["Close"])
-                    volume = float(latest["Volume"])
-                    
-                    # Basic Penny Filter
-                    if price < 5.0 and volume > 5000: # Lowered vol threshold slightly to ensure we get data
-                        
-                        # Calculate change
-                        change_pct = 0.0
-                        try:
-                            if len(df) > 1:
-                                prev = float(df.iloc[-2]["Close"])
-                                if prev > 0:
-                                    change_pct = ((price - prev) / prev) * 100
-                        except: pass
-
-                        results.append({
-                            "ticker": ticker,
-                            "price": round(price, 4),
-                            "volume": int(volume),
-                            "high": round(float(latest["High"]), 4),
-                            "low": round(float(latest["Low"]), 4),
-                            "changePct": round(change_pct, 2),
-                        })
-                except: continue
-        except: continue
-
-    # Sort by volume desc
-    results.sort(key=lambda x: x["volume"], reverse=True)
-    final_data = results[:limit]
-    
-    # 3. Save to Cache
-    if final_data:
-        CacheService.set(cache_key, final_data)
-        
-    return final_data
+    # Basic Penny Filter, sorted by volume desc
+    survivors = run_screen(panel, PENNY_LIST_SCREEN)
+    return [
+        {
+            "ticker": s["ticker"],
+            "price": round(s["Close"], 4),
+            "volume": int(s["Volume"]),
+            "high": round(s["High"], 4),
+            "low": round(s["Low"], 4),
+            "changePct": round(s["ChangePct"], 2),
+        }
+        for s in survivors
+    ]
 
 
 # ─── Full deep scan (pro only) ───────────────────────────────────────────────
 
+# Full scan snapshot: fresh for 1 hour, then served stale (and its cursors kept) up to 6 hours
+FULL_SCAN_TTL_MINUTES = 60
+FULL_SCAN_STALE_MINUTES = 360
+
+
 def run_full_scan(limit: int = 100) -> list:
-    """Full AI scan with predictions, signals, and scoring. Pro only. Cached for 1 hour."""
-    # 1. Try Cache
-    cache_key = f"full_scan_{limit}"
-    cached = CacheService.get(cache_key, max_age_minutes=60)
-    if cached:
-        return cached
+    """Full AI scan with predictions, signals, and scoring. Pro only."""
+    return full_scan_page(limit)["items"]
 
-    universe = get_universe()
-    if not universe:
-        return []
 
-    # Phase 1: Rapid screen
-    filtered = []
-    chunk_size = 200
-    for i in range(0, len(universe), chunk_size):
-        batch = universe[i : i + chunk_size]
-        try:
-            # Robust download logic for full scan
-            try:
-                data = _safe_download(batch, period="5d", timeout=15)
-            except Exception as e:
-                logger.error(f"Failed to download batch in full scan: {e}")
-                continue
+def full_scan_page(limit: int = 100, offset: int = 0, cursor: str = None, sort: str = None) -> dict:
+    """
+    A page of the full scan snapshot. The snapshot is cached for 1 hour; an
+    expired one (up to 6 hours old) is served while one background rescan runs.
+    """
+    return paginate("full_scan", _compute_full_scan, limit, offset, cursor, sort,
+                    ttl_minutes=FULL_SCAN_TTL_MINUTES, stale_minutes=FULL_SCAN_STALE_MINUTES)
 
-            if data is None or data.empty:
-                continue
-            
-            for ticker in batch:
-                try:
-                    if len(batch) == 1:
-                        df = data
-                    else:
-                        if ticker not in data.columns.levels[0]:
-                            continue
-                        df = data[ticker]
-                    if df.empty:
-                        continue
-                    latest = df.iloc[-1]
-                    import pandas as pd
-                    if pd.isna(latest["Close"]) or pd.isna(latest["Volume"]):
-                        continue
-                    p = float(latest["Close"])
-                    v = float(latest["Volume"])
-                    if p < 5.0 and v > 20000:
-                        filtered.append({"ticker": ticker, "vol": v})
-                except Exception:
-                    continue
-        except Exception:
-            continue
 
-    filtered.sort(key=lambda x: x["vol"], reverse=True)
-    # Limit deep analysis to top 300 to prevent timeout
-    targets = [x["ticker"] for x in filtered[:300]] 
+def _compute_full_scan() -> list:
+    results = [event["data"] for event in iter_full_scan() if event["type"] == "result"]
+    results.sort(key=_scan_rank, reverse=True)
+    return results
 
-    # Phase 2: Deep analysis (Optimized for Render Free Tier: Batch + Parallel Info)
-    market_prog = _market_progress()
-    results = []
 
-    # Process targets in chunks of 50
-    # We fetch history for 50 tickers at once, and info in parallel
-    analysis_chunk_size = 50 
-    
-    import pandas as pd
-    import yfinance as yf
+def _scan_rank(res: dict):
+    return (1 if res["isProfitable"] else 0, res["upside"])
 
-    for i in range(0, len(targets), analysis_chunk_size):
-        chunk_targets = targets[i : i + analysis_chunk_size]
-        
-        # 1. Batch History Download
+
+def iter_full_scan():
+    """
+    Runs the full scan, yielding events as work completes:
+    {"type": "start", "total"}, then {"type": "result", "data"} per analyzed
+    ticker and {"type": "progress", "done", "total"} after each chunk.
+    Results come in scan order, not ranked.
+    """
+    universe = get_universe()
+    if not universe:
+        return
+
+    # Phase 1: Rapid screen
+    try:
+        panel = load_panel(universe, period="5d")
+    except Exception as e:
+        logger.error(f"Failed to load universe panel in full scan: {e}")
+        return
+
+    # Limit deep analysis to the top FULL_SCAN_TARGETS by volume to prevent timeout
+    targets = [s["ticker"] for s in run_screen(panel, {**PENNY_SCAN_SCREEN, "limit": FULL_SCAN_TARGETS})]
+    yield {"type": "start", "total": len(targets)}
+
+    # Phase 2: Deep analysis, pipelined in chunks of SCAN_CHUNK_SIZE:
+    # fetch (history batch) -> enrich (memo lookup, .info, models) -> analyze.
+    # Chunk N+1 downloads while chunk N is analyzed; the analyze stage runs
+    # here (or in the analysis process pool), so each result is yielded the
+    # moment it is ready.
+    market_prog = _market_progress()
+    chunks = [targets[i:i + SCAN_CHUNK_SIZE] for i in range(0, len(targets), SCAN_CHUNK_SIZE)]
+
+    def fetch(tickers):
+        # Batch History (local bar store, only missing bars go upstream); period="6mo" for technicals
         try:
-            # period="6mo" for technicals
-            batch_data = yf.download(chunk_targets, period="6mo", group_by="ticker", threads=False, progress=False, timeout=20)
+            history = add_indicators(get_history(tickers, period="6mo"))
         except Exception as e:
-            logger.error(f"Batch history download failed: {e}")
-            batch_data = None
-
-        # 2. Parallel Info Fetching
-        # We use ThreadPoolExecutor to fetch .info concurrently
-        chunk_infos = {}
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_ticker = {executor.submit(lambda t: yf.Ticker(t).info, t): t for t in chunk_targets}
-            for future in as_completed(future_to_ticker):
-                t = future_to_ticker[future]
-                try:
-                    chunk_infos[t] = future.result()
-                except Exception:
-                    chunk_infos[t] = {}
-
-        # 3. Analyze
-        for ticker in chunk_targets:
-            # Extract specific DF
-            ticker_df = None
-            if batch_data is not None and not batch_data.empty:
-                try:
-                    if len(chunk_targets) == 1:
-                        ticker_df = batch_data
-                    elif ticker in batch_data.columns.levels[0]:
-                        ticker_df = batch_data[ticker]
-                except Exception:
-                    pass
-
-            res = _deep_analyze(ticker, market_prog, pre_df=ticker_df, pre_info=chunk_infos.get(ticker))
+            logger.error(f"Batch history load failed: {e}")
+            history = {}
+        return tickers, history
+
+    def enrich(chunk):
+        tickers, history = chunk
+        batch = _lookup_analyses(history, is_pro=False)
+        if batch["misses"]:
+            _enrich_misses(batch, info_workers=10)
+        return tickers, batch
+
+    # With several enrich workers chunks may arrive out of order; the final ranking doesn't depend on it
+    done = 0
+    stages = [(fetch, SCAN_FETCH_WORKERS), (enrich, SCAN_ENRICH_WORKERS)]
+    for tickers, batch in run_pipeline(chunks, stages, queue_size=SCAN_QUEUE_SIZE):
+        # Memo hits go out at once, misses as their analysis finishes
+        for ticker in tickers:
+            if ticker in batch["results"]:
+                yield {"type": "result", "data": batch["results"][ticker]}
+        for ticker, res in _iter_analyze_misses(batch, market_prog):
             if res:
-                results.append(res)
-                if len(results) >= limit:
-                    break
-        
+                yield {"type": "result", "data": res}
+        _save_fresh(batch)
+        done += len(tickers)
+        yield {"type": "progress", "done": done, "total": len(targets)}
         # Explicit GC
         gc.collect()
-        
-        if len(results) >= limit:
-            break
-
-    results.sort(key=lambda x: (1 if x["isProfitable"] else 0, x["upside"]), reverse=True)
-    
-    # Save to Cache
-    if results:
-         CacheService.set(cache_key, results)
-         
-    return results
 
 
 def run_batch_scan(limit: int = 10, offset: int = 0) -> list:
     """Runs deep analysis on a small batch of tickers. Used for progressive loading."""
-    # 1. Try Cache
-    cache_key = f"batch_scan_{limit}_{offset}"
-    cached = CacheService.get(cache_key, max_age_minutes=10)
-    if cached:
-        return cached
+    return batch_scan_page(limit, offset)["items"]
+
+
+def batch_scan_page(limit: int = 10, offset: int = 0, cursor: str = None) -> dict:
+    """
+    Progressive scan page: a slice of the screened universe snapshot (universe
+    order, cached 10 min), deep-analyzed through the shared per-ticker memo.
+    Offsets and cursors count screened tickers, so pages are rarely empty.
+    """
+    page = paginate("penny_batch", _compute_batch_targets, limit, offset, cursor, ttl_minutes=10)
+    if not page["items"]:
+        return page
+
+    try:
+        batch_history = add_indicators(get_history(page["items"], period="6mo"))
+    except Exception:
+        batch_history = {}
+    analyzed = analyze_many(batch_history, _market_progress(), info_workers=5)
+    return {**page, "items": [analyzed[t] for t in page["items"] if analyzed.get(t)]}
 
+
+def _compute_batch_targets() -> list:
     universe = get_universe()
     if not universe:
         return []
 
-    # Slice the universe
-    batch_tickers = universe[offset : offset + limit]
-    if not batch_tickers:
+    # Screen for basic criteria (Price < $5, Vol > 10k) to avoid deep analysis on garbage
+    try:
+        panel = load_panel(universe, period="5d")
+    except Exception:
         return []
+    return [s["ticker"] for s in run_screen(panel, PENNY_BATCH_SCREEN)]
+
+
+# ─── Analysis memo ────────────────────────────────────────────────────────────
+# Scans, the moonshot hunter and the single-ticker endpoint share one cached
+# _deep_analyze result per (ticker, last bar date, tier, analysis version).
+
+# Bump whenever _deep_analyze's output changes so older memo entries are ignored
+ANALYSIS_VERSION = 1
+# How long the analysis of a closed session's bar is reused
+ANALYSIS_MEMO_MINUTES = int(os.environ.get("ANALYSIS_MEMO_MINUTES", 1440))
+
+
+def _analysis_key(ticker: str, df, is_pro: bool) -> str:
+    return f"analysis_v{ANALYSIS_VERSION}_{ticker}_{df.index[-1]:%Y-%m-%d}_{'pro' if is_pro else 'std'}"
+
+
+def _analysis_ttl(df, is_pro: bool) -> int:
+    """A closed session's bar no longer changes; a forming bar (and pro news) is only reused until the next bar refresh."""
+    if is_pro or df.index[-1].date() > _final_session():
+        return BAR_REFRESH_MINUTES
+    return ANALYSIS_MEMO_MINUTES
+
+
+def analyze_many(histories: dict, market_prog: float, is_pro: bool = False, info_workers: int = 10,
+                 infos: dict = None) -> dict:
+    """
+    Deep analysis of {ticker: 6mo history} through the shared memo.
+    Cached results come from one batched cache read per TTL group; only the
+    misses fetch .info (unless given in infos), update their models and run
+    _deep_analyze, and their results are written back in one batch.
+    Returns {ticker: result}.
+    """
+    batch = _lookup_analyses(histories, is_pro)
+    if batch["misses"]:
+        _enrich_misses(batch, info_workers, infos)
+        _analyze_misses(batch, market_prog)
+    return batch["results"]
+
+
+def _lookup_analyses(histories: dict, is_pro: bool) -> dict:
+    """Memo lookup stage: {"results", "keys", "misses", "is_pro"} for the tickers with enough history."""
+    keys, by_ttl = {}, {}
+    for ticker, df in histories.items():
+        # Too little history for _deep_analyze; don't spend an .info call on it
+        if df is None or len(df) < 30:
+            continue
+        keys[ticker] = _analysis_key(ticker, df, is_pro)
+        by_ttl.setdefault(_analysis_ttl(df, is_pro), []).append(keys[ticker])
+
+    cached = {}
+    for ttl, group in by_ttl.items():
+        cached.update(CacheService.get_many(group, max_age_minutes=ttl))
+
+    results = {t: cached[k] for t, k in keys.items() if k in cached}
+    misses = {t: histories[t] for t in keys if t not in results}
+    return {"results": results, "keys": keys, "misses": misses, "is_pro": is_pro}
+
+
+def _enrich_misses(batch: dict, info_workers: int, infos: dict = None):
+    """Network stage: .info for every miss (in parallel, unless prefetched) plus their incremental model fits."""
+    # Incremental models: only bars completed since the last scan are folded in
+    batch["models"] = update_models(batch["misses"], final_through=_final_session())
+
+    known = infos or {}
+    fetched = fetch_infos([t for t in batch["misses"] if t not in known], info_workers)
+    batch["infos"] = {t: known.get(t, fetched.get(t)) for t in batch["misses"]}
+
+    # Pro analyses carry news sentiment: one concurrent enrichment for the whole batch
+    if batch["is_pro"]:
+        from services.news_service import NewsService
+        batch["news"] = NewsService.enrich_sentiment(list(batch["misses"]))
 
-    # Phase 1: Screen this batch for basic criteria (Price < $5, Vol > 20k)
-    # We do a quick check first to avoid deep analysis on garbage
-    filtered_batch = []
-    try:
-        # Quick check with yfinance on the batch
-        # We can reuse the logic from run_full_scan but scoped to this batch
-        try:
-             import yfinance as yf
-             data = yf.download(batch_tickers, period="5d", group_by="ticker", threads=False, progress=False, timeout=10)
-        except Exception:
-             return []
 
-        if data is None or data.empty:
-             return []
+def fetch_infos(tickers: List[str], workers: int = 10) -> dict:
+    """yfinance .info for many tickers concurrently; failures map to {}."""
+    import yfinance as yf
 
-        for ticker in batch_tickers:
+    infos = {}
+    if not tickers:
+        return infos
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        future_to_ticker = {executor.submit(lambda t: yf.Ticker(t).info, t): t for t in tickers}
+        for future in as_completed(future_to_ticker):
+            t = future_to_ticker[future]
             try:
-                if len(batch_tickers) == 1:
-                    df = data
-                else:
-                    if ticker not in data.columns.levels[0]:
-                        continue
-                    df = data[ticker]
-                
-                if df.empty: continue
-                
-                latest = df.iloc[-1]
-                import pandas as pd
-                if pd.isna(latest["Close"]) or pd.isna(latest["Volume"]): continue
-                
-                p = float(latest["Close"])
-                v = float(latest["Volume"])
-                
-                # Basic filter: Penny stock definition + some volume
-                if p < 5.0 and v > 10000:
-                    filtered_batch.append(ticker)
+                infos[t] = future.result()
             except Exception:
-                continue
-    except Exception:
+                infos[t] = {}
+    return infos
+
+
+def _analyze_misses(batch: dict, market_prog: float):
+    """CPU stage: _deep_analyze the misses into batch["results"] and write them to the memo."""
+    for _ in _iter_analyze_misses(batch, market_prog):
         pass
+    _save_fresh(batch)
 
-    # Phase 2: Deep Analyze the filtered list (Optimized)
-    market_prog = _market_progress()
-    results = []
-    
-    if filtered_batch:
-        import yfinance as yf
-        # 1. Batch History
+
+def _iter_analyze_misses(batch: dict, market_prog: float):
+    """
+    Analyzes the batch's misses, yielding (ticker, result) as each finishes.
+    Non-pro analysis goes to the process pool when ANALYSIS_PROCESSES is set;
+    a ticker whose worker fails is analyzed here instead.
+    """
+    pool = analysis_pool.get_pool() if not batch["is_pro"] else None
+    if pool is None:
+        for ticker in batch["misses"]:
+            yield ticker, _analyze_miss(batch, ticker, market_prog)
+        return
+
+    try:
+        futures = {
+            pool.submit(analysis_pool.analyze_payload, analysis_pool.make_payload(
+                ticker, df, batch["infos"].get(ticker), batch["models"].get(ticker), market_prog)): ticker
+            for ticker, df in batch["misses"].items()
+        }
+    except BrokenProcessPool:
+        analysis_pool.reset_pool()
+        futures = {}
+    for future in as_completed(futures):
+        ticker = futures[future]
         try:
-             batch_data = yf.download(filtered_batch, period="6mo", group_by="ticker", threads=False, progress=False, timeout=15)
-        except Exception:
-             batch_data = None
-        
-        # 2. Parallel Info
-        chunk_infos = {}
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_ticker = {executor.submit(lambda t: yf.Ticker(t).info, t): t for t in filtered_batch}
-            for future in as_completed(future_to_ticker):
-                t = future_to_ticker[future]
-                try:
-                    chunk_infos[t] = future.result()
-                except Exception:
-                    chunk_infos[t] = {}
-
-        # 3. Analyze
-        for ticker in filtered_batch:
-            # Extract specific DF
-            ticker_df = None
-            if batch_data is not None and not batch_data.empty:
-                try:
-                    if len(filtered_batch) == 1:
-                        ticker_df = batch_data
-                    elif ticker in batch_data.columns.levels[0]:
-                        ticker_df = batch_data[ticker]
-                except Exception:
-                    pass
-            
-            res = _deep_analyze(ticker, market_prog, pre_df=ticker_df, pre_info=chunk_infos.get(ticker))
-            if res:
-                results.append(res)
+            yield ticker, _record_analysis(batch, ticker, future.result())
+        except Exception as e:
+            logger.error(f"Analysis worker failed for {ticker}: {e}")
+            if isinstance(e, BrokenProcessPool):
+                analysis_pool.reset_pool()
+            yield ticker, _analyze_miss(batch, ticker, market_prog)
+    for ticker in batch["misses"]:
+        if ticker not in futures.values():
+            yield ticker, _analyze_miss(batch, ticker, market_prog)
 
-    # Save to Cache
-    if results:
-        CacheService.set(cache_key, results)
 
-    return results
+def _analyze_miss(batch: dict, ticker: str, market_prog: float) -> Optional[dict]:
+    res = _deep_analyze(ticker, market_prog, is_pro=batch["is_pro"], pre_df=batch["misses"][ticker],
+                        pre_info=batch["infos"].get(ticker), pre_model=batch["models"].get(ticker),
+                        pre_news=batch.get("news", {}).get(ticker))
+    return _record_analysis(batch, ticker, res)
+
 
+def _record_analysis(batch: dict, ticker: str, res: Optional[dict]) -> Optional[dict]:
+    if res:
+        batch["results"][ticker] = res
+        # Built on news that missed its deadline: not memoized, so the next call picks up the landed news
+        if not (res.get("newsSentiment") or {}).get("pending"):
+            batch.setdefault("fresh", {})[batch["keys"][ticker]] = res
+    return res
 
-def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = False, pre_df=None, pre_info=None) -> Optional[dict]:
-    """Deep analysis on a single penny stock. Supports pre-fetched data for performance."""
+
+def _save_fresh(batch: dict):
+    """Writes the batch's newly computed analyses to the memo in one go."""
+    if batch.get("fresh"):
+        CacheService.set_many(batch.pop("fresh"))
+
+
+def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = False, pre_df=None, pre_info=None,
+                  pre_model=None, pre_news=None) -> Optional[dict]:
+    """Deep analysis on a single penny stock. Supports pre-fetched data and model fits for performance."""
     from services.news_service import NewsService
     try:
-        import pandas_ta_classic as ta
         import yfinance as yf
         import pandas as pd
         import numpy as np
@@ -469,7 +470,7 @@ def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = Fals
         if pre_df is not None and not pre_df.empty:
             df = pre_df
         else:
-            df = stock.history(period="6mo")
+            df = get_ticker_history(ticker, period="6mo")
             
         if df.empty or len(df) < 30:
             return None
@@ -480,7 +481,8 @@ def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = Fals
 
         # Profit margin
         try:
-            if pre_info:
+            # {} is a prefetch that failed: analyze without fundamentals rather than fetch again
+            if pre_info is not None:
                 info = pre_info
             else:
                 info = stock.info
@@ -503,12 +505,9 @@ def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = Fals
             low_52 = 0.0
             float_shares = 0.0
 
-        # Technical indicators
-        df.ta.rsi(length=14, append=True)
-        df.ta.sma(length=20, append=True)
-        df.ta.sma(length=50, append=True)
-        df.ta.bbands(length=20, std=2, append=True)
-        df["Vol_SMA_20"] = df["Volume"].rolling(20).mean()
+        # Technical indicators (batch scans pass them precomputed)
+        if "Vol_SMA_20" not in df.columns:
+            df = add_indicators({ticker: df})[ticker]
 
         latest = df.iloc[-1]
 
@@ -520,32 +519,12 @@ def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = Fals
             projected_vol = current_vol
         avg_vol = float(latest["Vol_SMA_20"]) if not pd.isna(latest["Vol_SMA_20"]) else 1
 
-        # Predictive model (Optimized: swapped sklearn for numpy)
-        try:
-            data_copy = df.copy()
-            data_copy["Target"] = data_copy["Close"].shift(-1)
-            data_copy = data_copy.dropna()
-            
-            # Simple linear regression features (using only Close price for lighter calc if needed, 
-            # but sticking to existing logic with numpy linalg)
-            feature_cols = ["Open", "High", "Low", "Volume"]
-            if "RSI_14" in data_copy.columns:
-                feature_cols.append("RSI_14")
-                
-            X = data_copy[feature_cols].values
-            y = data_copy["Target"].values
-            
-            # Fit linear model using numpy (Least Squares)
-            # y = Xw + b -> y = [X 1] [w; b]
-            X_b = np.c_[X, np.ones((X.shape[0], 1))]  # add bias term
-            theta, residuals, rank, s = np.linalg.lstsq(X_b, y, rcond=None)
-            
-            latest_features = latest[feature_cols].values.reshape(1, -1)
-            latest_features_b = np.c_[latest_features, np.ones((1, 1))]
-            
-            predicted_price = float(latest_features_b.dot(theta)[0])
-        except Exception:
+        # Predictive model (incremental least squares; scans pass the fit precomputed)
+        model = pre_model if pre_model is not None else update_model(ticker, df, final_through=_final_session())
+        predicted_price = model.get("predicted", float("nan"))
+        if not np.isfinite(predicted_price):
             predicted_price = float(latest["Close"])
+        model_r2 = model.get("r2", float("nan"))
 
         # Signals
         signals = []
@@ -666,10 +645,11 @@ def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = Fals
         news_data = None
         if is_pro:
             try:
-                # Add News Sentiment
-                news_results = NewsService.analyze_tickers([ticker])
-                if news_results:
-                    news_data = news_results[0]
+                # Add News Sentiment (normally enriched for the whole batch by analyze_many)
+                news_data = pre_news or NewsService.enrich_sentiment([ticker]).get(ticker)
+                if news_data and news_data.get('pending'):
+                    reasoning.append(news_data.get('outlook', ''))
+                elif news_data:
                     sentiment_desc = news_data.get('sentiment', 'Neutral')
                     reasoning.append(f"News sentiment is currently {sentiment_desc}. {news_data.get('outlook', '')}")
             except Exception as e:
@@ -686,6 +666,7 @@ def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = Fals
             "ticker": ticker,
             "price": _check_nan(round(price, 4)),
             "predicted": _check_nan(round(predicted_price, 4)),
+            "modelR2": _check_nan(round(model_r2, 3)),
             "changePct": _check_nan(round(change_pct, 2)),
             "upside": _check_nan(round(upside, 1)),
             "margin": _check_nan(round(profit_margin * 100, 1)),
@@ -718,4 +699,9 @@ def _deep_analyze(ticker: str, market_progress: float = 1.0, is_pro: bool = Fals
 
 def analyze_single_penny(ticker: str, is_pro: bool = False) -> Optional[dict]:
     """Analyze a single penny stock in depth."""
-    return _deep_analyze(ticker, _market_progress(), is_pro=is_pro)
+    try:
+        df = get_ticker_history(ticker, period="6mo")
+    except Exception as e:
+        logger.error(f"History load failed for {ticker}: {e}")
+        return None
+    return analyze_many({ticker: df}, _market_progress(), is_pro=is_pro, info_workers=1).get(ticker)
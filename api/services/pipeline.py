@@ -0,0 +1,98 @@
+"""
+Minimal staged pipeline: worker threads per stage, bounded queues in between.
+
+    for out in run_pipeline(chunks, [(fetch, 1), (enrich, 2), (analyze, 1)], queue_size=2):
+        ...
+
+Stage i+1 works on item N while stage i is already on item N+1, so network
+bound and CPU bound stages overlap. The bounded queues keep a fast upstream
+stage from running far ahead (and holding many chunks in memory). Outputs are
+yielded as they finish, not in input order.
+"""
+
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+_DONE = object()
+
+
+def run_pipeline(items: Iterable, stages: List[Tuple[Callable, int]], queue_size: int = 2) -> Iterator:
+    """
+    Streams items through stages [(fn, workers), ...]. The first exception
+    raised by any stage stops the pipeline and is re-raised to the consumer;
+    abandoning the generator early stops the workers too.
+    """
+    stop = threading.Event()
+    errors = []
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in range(len(stages) + 1)]
+
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(q):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def feed():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                put(queues[0], item)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        put(queues[0], _DONE)
+
+    def stage_worker(fn, inbox, outbox, remaining, lock):
+        while True:
+            item = get(inbox)
+            if item is _DONE:
+                # Let sibling workers see the end too; the last one out passes it on
+                put(inbox, _DONE)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    put(outbox, _DONE)
+                return
+            try:
+                result = fn(item)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+                return
+            put(outbox, result)
+
+    threads = [threading.Thread(target=feed, daemon=True, name="pipeline-feed")]
+    for i, (fn, workers) in enumerate(stages):
+        workers = max(1, workers)
+        remaining, lock = [workers], threading.Lock()
+        for w in range(workers):
+            threads.append(threading.Thread(
+                target=stage_worker, args=(fn, queues[i], queues[i + 1], remaining, lock),
+                daemon=True, name=f"pipeline-{getattr(fn, '__name__', i)}-{w}",
+            ))
+    for t in threads:
+        t.start()
+
+    try:
+        while True:
+            item = get(queues[-1])
+            if item is _DONE:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
@@ -0,0 +1,101 @@
+"""
+Batched next-close predictor — one least-squares fit per ticker, all at once.
+
+Model (per ticker): Close[t+1] ~ Open, High, Low, Volume, RSI_14 + bias, fit
+on every bar where the frame has no NaN (same rows a dropna() would keep).
+Features are centred and scaled per ticker, so the stacked (N, F, F) normal
+equations stay well conditioned even with Volume in the millions; the bias
+drops out of the centred system. Near-singular systems (constant or
+collinear columns) fall back to a pseudo-inverse, which gives the same
+minimum-norm answer as np.linalg.lstsq.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+FEATURES = ["Open", "High", "Low", "Volume", "RSI_14"]
+MAX_CONDITION = 1e10
+
+
+def build_design(frames: Dict[str, pd.DataFrame], features: List[str] = FEATURES) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stacks frames into right-aligned arrays.
+    Returns (tickers, X (N, T, F), y (N, T), latest (N, F)); rows not usable
+    for training have y = NaN. A ticker missing a feature column gets no rows.
+    """
+    tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+    width = max((len(frames[t]) for t in tickers), default=0)
+    X = np.full((len(tickers), width, len(features)), np.nan)
+    y = np.full((len(tickers), width), np.nan)
+    latest = np.full((len(tickers), len(features)), np.nan)
+
+    for i, ticker in enumerate(tickers):
+        df = frames[ticker]
+        if not set(features).issubset(df.columns):
+            continue
+        n = len(df)
+        frame = df.to_numpy(dtype=np.float64)
+        values = frame[:, [df.columns.get_loc(f) for f in features]]
+        target = np.append(frame[1:, df.columns.get_loc("Close")], np.nan)
+        # Train only where the whole frame is complete, like the old dropna()
+        usable = ~np.isnan(frame).any(axis=1) & ~np.isnan(target)
+        X[i, width - n:] = values
+        y[i, width - n:] = np.where(usable, target, np.nan)
+        latest[i] = values[-1]
+    return tickers, X, y, latest
+
+
+def fit_predict(X: np.ndarray, y: np.ndarray, latest: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Fits every ticker's regression in one batched solve.
+    Returns {"predicted", "r2", "n_obs"} arrays of shape (N,); predicted is NaN
+    where a ticker had no usable rows or a NaN latest feature.
+    """
+    mask = ~np.isnan(y)
+    n_obs = mask.sum(axis=1)
+    count = np.maximum(n_obs, 1)[:, None]
+    Xm = np.where(mask[:, :, None], X, 0.0)
+    ym = np.where(mask, y, 0.0)
+
+    mean = Xm.sum(axis=1) / count
+    y_mean = ym.sum(axis=1) / count[:, 0]
+    Xc = np.where(mask[:, :, None], Xm - mean[:, None, :], 0.0)
+    scale = np.sqrt((Xc ** 2).sum(axis=1) / count)
+    scale = np.where(scale > 0, scale, 1.0)
+    Xc /= scale[:, None, :]
+    yc = np.where(mask, ym - y_mean[:, None], 0.0)
+
+    A = np.einsum("ntf,ntg->nfg", Xc, Xc)
+    b = np.einsum("ntf,nt->nf", Xc, yc)
+
+    coef = np.zeros_like(b)
+    well = np.linalg.cond(A) < MAX_CONDITION
+    if well.any():
+        coef[well] = np.linalg.solve(A[well], b[well][:, :, None])[:, :, 0]
+    if (~well).any():
+        coef[~well] = np.einsum("nfg,ng->nf", np.linalg.pinv(A[~well]), b[~well])
+
+    fitted = np.einsum("ntf,nf->nt", Xc, coef)
+    sse = ((yc - fitted) ** 2 * mask).sum(axis=1)
+    sst = (yc ** 2).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(sst > 0, 1 - sse / sst, np.nan)
+
+    predicted = y_mean + (((latest - mean) / scale) * coef).sum(axis=1)
+    predicted = np.where(n_obs > 0, predicted, np.nan)
+    r2 = np.where(n_obs > 0, r2, np.nan)
+    return {"predicted": predicted, "r2": r2, "n_obs": n_obs}
+
+
+def predict_frames(frames: Dict[str, pd.DataFrame], features: List[str] = FEATURES) -> Dict[str, dict]:
+    """Next-close prediction for every frame: {ticker: {"predicted", "r2", "n_obs"}}."""
+    tickers, X, y, latest = build_design(frames, features)
+    if not tickers:
+        return {}
+    fit = fit_predict(X, y, latest)
+    return {
+        t: {"predicted": float(fit["predicted"][i]), "r2": float(fit["r2"][i]), "n_obs": int(fit["n_obs"][i])}
+        for i, t in enumerate(tickers)
+    }
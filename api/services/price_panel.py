@@ -0,0 +1,131 @@
+"""
+Universe-wide price panel — one contiguous float32 array for many tickers.
+
+values[i, t, f] holds field f of ticker i on dates[t]. Dates are the union of
+every ticker's sessions, so a ticker with no bar on a date has NaN there; the
+bar-oriented helpers (latest, bars) skip those holes and walk each ticker's own
+bars instead.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.bar_store import FIELDS, get_history, split_download
+
+
+class PricePanel:
+    """tickers × dates × fields OHLCV cube with a ticker→row index."""
+
+    def __init__(self, tickers: List[str], dates: pd.DatetimeIndex, values: np.ndarray):
+        self.tickers = list(tickers)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.dates = pd.DatetimeIndex(dates)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self._last_valid = None
+
+    # ─── Construction ─────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "PricePanel":
+        """Aligns per-ticker OHLCV frames on the union of their dates."""
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return cls([], pd.DatetimeIndex([]), np.empty((0, 0, len(FIELDS)), dtype=np.float32))
+
+        dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values()))))
+        values = np.full((len(frames), len(dates), len(FIELDS)), np.nan, dtype=np.float32)
+        for i, df in enumerate(frames.values()):
+            rows = dates.get_indexer(df.index)
+            for f, name in enumerate(FIELDS):
+                if name in df.columns:
+                    values[i, rows, f] = df[name].to_numpy(dtype=np.float32)
+        return cls(list(frames), dates, values)
+
+    @classmethod
+    def from_download(cls, data: pd.DataFrame, tickers: List[str]) -> "PricePanel":
+        """Builds a panel straight from a grouped yf.download frame."""
+        return cls.from_frames(split_download(data, tickers))
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    # ─── Access ───────────────────────────────────────────────────────────────
+
+    def field(self, name: str) -> np.ndarray:
+        """(N, T) view of one field on the calendar grid."""
+        return self.values[:, :, FIELDS.index(name)]
+
+    def _valid_upto(self) -> np.ndarray:
+        # For every (ticker, t): position of the ticker's latest bar at or before t, -1 if none.
+        if self._last_valid is None:
+            T = self.values.shape[1]
+            pos = np.where(~np.isnan(self.field("Close")), np.arange(T), -1)
+            self._last_valid = np.maximum.accumulate(pos, axis=1) if T else pos
+        return self._last_valid
+
+    def _positions(self, lag: int) -> np.ndarray:
+        """Calendar position of each ticker's bar `lag` bars before its latest, -1 if none."""
+        upto = self._valid_upto()
+        rows = np.arange(len(self.tickers))
+        pos = upto[:, -1] if upto.shape[1] else np.full(len(rows), -1)
+        for _ in range(lag):
+            prev = np.where(pos > 0, pos - 1, 0)
+            pos = np.where(pos > 0, upto[rows, prev], -1)
+        return pos
+
+    def latest(self, name: str, lag: int = 0) -> np.ndarray:
+        """(N,) value of a field on each ticker's latest bar (or `lag` bars earlier); NaN if missing."""
+        pos = self._positions(lag)
+        out = self.values[np.arange(len(self.tickers)), np.maximum(pos, 0), FIELDS.index(name)]
+        return np.where(pos >= 0, out, np.nan).astype(np.float32)
+
+    def bars(self, n: int, name: Optional[str] = None) -> np.ndarray:
+        """
+        Each ticker's last n bars, right-aligned and NaN-padded on the left.
+        Returns (N, n, F), or (N, n) when a field name is given.
+        """
+        out = np.full((len(self.tickers), n, len(FIELDS)), np.nan, dtype=np.float32)
+        rows = np.arange(len(self.tickers))
+        for k in range(n):
+            pos = self._positions(k)
+            ok = pos >= 0
+            out[rows[ok], n - 1 - k] = self.values[rows[ok], pos[ok]]
+        return out if name is None else out[:, :, FIELDS.index(name)]
+
+    def bar_counts(self) -> np.ndarray:
+        """(N,) number of bars each ticker has."""
+        return (~np.isnan(self.field("Close"))).sum(axis=1)
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """One ticker back as a regular OHLCV DataFrame (holes dropped)."""
+        df = pd.DataFrame(self.values[self.index[ticker]].astype(np.float64), index=self.dates, columns=FIELDS)
+        return df[df["Close"].notna()]
+
+    def until(self, date) -> "PricePanel":
+        """Panel as it looked at the close of `date` (for backtests)."""
+        keep = self.dates <= pd.Timestamp(date)
+        return PricePanel(self.tickers, self.dates[keep], self.values[:, keep])
+
+
+def load_panel(tickers: List[str], period: str = "5d", refresh_minutes: Optional[int] = None) -> PricePanel:
+    """Panel for a ticker list, served from the local bar store."""
+    return PricePanel.from_frames(get_history(tickers, period=period, refresh_minutes=refresh_minutes))
+
+
+def load_panel_until(tickers: List[str], end_date, lookback_days: int = 15) -> PricePanel:
+    """
+    Panel as it looked at the close of end_date with at least lookback_days of
+    calendar history. Served from the bar store's 6mo window when that covers
+    it; older backtests download their start/end range directly.
+    """
+    end_ts = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    start_ts = end_ts - pd.Timedelta(days=lookback_days)
+    if start_ts >= pd.Timestamp.now().normalize() - pd.DateOffset(months=6):
+        return load_panel(tickers, period="6mo").until(end_date)
+
+    import yfinance as yf
+    data = yf.download(tickers, start=start_ts.strftime('%Y-%m-%d'), end=end_ts.strftime('%Y-%m-%d'),
+                       group_by='ticker', threads=True, progress=False)
+    return PricePanel.from_download(data, tickers).until(end_date)
@@ -0,0 +1,339 @@
+"""
+Server-side scan jobs.
+
+A job runs one scan in the background and records its progress in the cache,
+so clients on any worker can follow it:
+
+    queued -> screening -> analyzing -> done   (or failed from any running state)
+
+Clients start (or attach to) a job and then read its results with a cursor:
+each read returns the results found since that cursor, so progressive loading
+never repeats the screen or the history downloads. Starting a scan while an
+identical one is queued or running returns the running job.
+
+The published record is small (state and counters). Results are published
+once each, appended as numbered parts, so a scan writes O(n) bytes however
+often it ticks, and other workers only fetch parts when the count moves.
+Records and parts older than SCAN_JOB_TTL_MINUTES are purged whenever a job ends.
+"""
+
+import os
+import time
+import uuid
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from services.cache_service import CacheService
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("full",)
+TERMINAL_STATES = ("done", "failed")
+
+SCAN_JOB_WORKERS = int(os.environ.get("SCAN_JOB_WORKERS", 1))
+# How long job records stay readable; older ones are purged from the cache
+SCAN_JOB_TTL_MINUTES = int(os.environ.get("SCAN_JOB_TTL_MINUTES", 360))
+# A running job whose record hasn't been touched for this long is presumed dead (its worker restarted)
+SCAN_JOB_STALE_SECONDS = int(os.environ.get("SCAN_JOB_STALE_SECONDS", 300))
+
+_job_pool = ThreadPoolExecutor(max_workers=SCAN_JOB_WORKERS, thread_name_prefix="scan-job")
+_jobs = {}  # job id -> ScanJob run by this process
+_jobs_active = {}  # kind -> id of the job this process is running for it
+_lock = threading.Lock()
+
+
+class ScanJob:
+    """A scan run by this process; every change is published to the cache for other workers."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.state = "queued"
+        self.total = None
+        self.done = 0
+        self.results = []
+        self.parts = 0  # result parts published so far
+        self.published = 0  # results covered by those parts
+        self.version = None
+        self.error = None
+        self.created_at = self.updated_at = time.time()
+        self.cond = threading.Condition()
+
+    def to_dict(self, with_results: bool = True) -> dict:
+        with self.cond:
+            record = {
+                "id": self.id,
+                "kind": self.kind,
+                "state": self.state,
+                "total": self.total,
+                "done": self.done,
+                "count": len(self.results),
+                "version": self.version,
+                "error": self.error,
+                "createdAt": self.created_at,
+                "updatedAt": self.updated_at,
+            }
+            if with_results:
+                record["results"] = list(self.results)
+            return record
+
+    def update(self, persist: bool = True, **fields):
+        with self.cond:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.updated_at = time.time()
+            self.cond.notify_all()
+        if persist:
+            self.persist()
+
+    def add_result(self, result: dict):
+        with self.cond:
+            self.results.append(result)
+            self.cond.notify_all()
+
+    def results_page(self, cursor: int, limit: int) -> list:
+        with self.cond:
+            return self.results[cursor:cursor + limit]
+
+    def persist(self):
+        """Publishes the record plus the results added since the last publish, as one new part."""
+        with self.cond:
+            writes = {}
+            new = self.results[self.published:]
+            if new:
+                writes[_part_key(self.id, self.parts)] = new
+                self.parts += 1
+                self.published = len(self.results)
+            record = self.to_dict(with_results=False)
+            record["count"] = self.published
+            record["parts"] = self.parts
+        writes[_job_key(self.id)] = record
+        CacheService.set_many(writes)
+
+    def wait(self, cursor: int, timeout: float):
+        """Blocks until there are results past cursor, the job finishes, or timeout."""
+        deadline = time.time() + timeout
+        with self.cond:
+            while len(self.results) <= cursor and self.state not in TERMINAL_STATES:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                self.cond.wait(remaining)
+
+
+def _job_key(job_id: str) -> str:
+    return f"scan_job_{job_id}"
+
+
+def _part_key(job_id: str, part: int) -> str:
+    return f"scan_job_{job_id}_part_{part}"
+
+
+def _active_key(kind: str) -> str:
+    return f"scan_job_active_{kind}"
+
+
+def _kind_spec(kind: str) -> dict:
+    """
+    What a job kind runs and publishes: its event generator (see
+    penny_service.iter_full_scan for the event shapes), ranking, and the
+    snapshot it fills with its lifetimes.
+    """
+    if kind == "full":
+        from services import penny_service
+        return {
+            "run": penny_service.iter_full_scan,
+            "rank": penny_service._scan_rank,
+            "snapshot": "full_scan",
+            "ttl_minutes": penny_service.FULL_SCAN_TTL_MINUTES,
+            "retain_minutes": penny_service.FULL_SCAN_STALE_MINUTES,
+        }
+    raise ValueError(f"Unknown scan kind '{kind}'")
+
+
+def _finish(kind: str, results: list) -> Optional[str]:
+    """Publishes a finished scan as the snapshot the paged endpoints serve; returns its version."""
+    if results:
+        from services.scan_snapshot import save_snapshot
+        spec = _kind_spec(kind)
+        ranked = sorted(results, key=spec["rank"], reverse=True)
+        return save_snapshot(spec["snapshot"], ranked, retain_minutes=spec["retain_minutes"])["version"]
+    return None
+
+
+def _fresh_snapshot(kind: str) -> Optional[dict]:
+    from services.scan_snapshot import peek_snapshot
+    spec = _kind_spec(kind)
+    return peek_snapshot(spec["snapshot"], max_age_minutes=spec["ttl_minutes"])
+
+
+def _run(job: ScanJob):
+    try:
+        job.update(state="screening")
+        for event in _kind_spec(job.kind)["run"]():
+            if event["type"] == "start":
+                job.update(state="analyzing", total=event["total"])
+            elif event["type"] == "result":
+                job.add_result(event["data"])
+            elif event["type"] == "progress":
+                # Results are published in chunk-sized steps
+                job.update(done=event["done"])
+        version = _finish(job.kind, job.results)
+        job.update(state="done", version=version)
+    except Exception as e:
+        logger.error(f"Scan job {job.id} failed: {e}")
+        job.update(state="failed", error=str(e))
+    finally:
+        with _lock:
+            if _jobs_active.get(job.kind) == job.id:
+                del _jobs_active[job.kind]
+            _prune()
+        # Records and result parts of jobs past the TTL (from any worker) are unreadable anyway
+        CacheService.purge("scan_job_", SCAN_JOB_TTL_MINUTES)
+
+
+def _prune():
+    cutoff = time.time() - SCAN_JOB_TTL_MINUTES * 60
+    for job_id in [j for j, job in _jobs.items() if job.state in TERMINAL_STATES and job.updated_at < cutoff]:
+        del _jobs[job_id]
+
+
+def start_job(kind: str = "full") -> dict:
+    """
+    Starts a scan job, or attaches to the identical one already queued or
+    running (in this process or, via the cache, in another worker). A fresh
+    snapshot makes a job that is done immediately. Returns the job summary.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown scan kind '{kind}'")
+    local = _local_active_job(kind)
+    if local:
+        return local
+
+    # Cache and backend I/O happens outside _lock, so a slow backend doesn't stall other job calls
+    remote = _live_remote_job(kind)
+    if remote:
+        return remote
+
+    job = ScanJob(kind)
+    snapshot = _fresh_snapshot(kind)
+    if snapshot:
+        items = snapshot["items"]
+        job.update(persist=False, state="done", total=len(items), done=len(items),
+                   results=list(items), version=snapshot["version"])
+        with _lock:
+            _jobs[job.id] = job
+        job.persist()
+        return job.to_dict(with_results=False)
+
+    with _lock:
+        # Another request may have started one while we were reading the cache
+        job_id = _jobs_active.get(kind)
+        if job_id:
+            return _jobs[job_id].to_dict(with_results=False)
+        _jobs[job.id] = job
+        _jobs_active[kind] = job.id
+    job.persist()
+    CacheService.set(_active_key(kind), {"id": job.id})
+    _job_pool.submit(_run, job)
+    return job.to_dict(with_results=False)
+
+
+def _local_active_job(kind: str) -> Optional[dict]:
+    with _lock:
+        job_id = _jobs_active.get(kind)
+        job = _jobs.get(job_id) if job_id else None
+    return job.to_dict(with_results=False) if job else None
+
+
+def _live_remote_job(kind: str) -> Optional[dict]:
+    active = CacheService.get(_active_key(kind), max_age_minutes=SCAN_JOB_TTL_MINUTES, bypass_l1=True)
+    if not active:
+        return None
+    record = _read_record(active["id"])
+    if not record or record["state"] in TERMINAL_STATES:
+        return None
+    if time.time() - record["updatedAt"] > SCAN_JOB_STALE_SECONDS:
+        return None
+    record.pop("parts", None)
+    return record
+
+
+def _read_record(job_id: str) -> Optional[dict]:
+    """The published summary (no results); always read past L1 since it changes."""
+    return CacheService.get(_job_key(job_id), max_age_minutes=SCAN_JOB_TTL_MINUTES, bypass_l1=True)
+
+
+def _read_results(job_id: str, parts: int) -> list:
+    """A published job's results; parts never change once written, so L1 serves repeats."""
+    keys = [_part_key(job_id, part) for part in range(parts)]
+    found = CacheService.get_many(keys, max_age_minutes=SCAN_JOB_TTL_MINUTES)
+    results = []
+    for key in keys:
+        if key not in found:
+            break
+        results.extend(found[key])
+    return results
+
+
+def get_job(job_id: str, cursor: int = 0, limit: int = 50, wait: float = 0) -> Optional[dict]:
+    """
+    Job summary plus up to limit results after cursor ("data", "nextCursor").
+    wait > 0 long-polls until new results arrive or the job finishes.
+    Jobs run by other workers are read from their published record.
+    """
+    job = _jobs.get(job_id)
+    if job is not None:
+        if wait > 0:
+            job.wait(cursor, wait)
+        record = job.to_dict(with_results=False)
+        page = job.results_page(cursor, limit)
+    else:
+        # Poll the small summary; results are only fetched once the count moves past cursor
+        record = _read_record(job_id)
+        deadline = time.time() + wait
+        while record and record["state"] not in TERMINAL_STATES and record["count"] <= cursor \
+                and time.time() < deadline:
+            time.sleep(1)
+            record = _read_record(job_id)
+        if not record:
+            return None
+        parts = record.pop("parts", 0)
+        page = _read_results(job_id, parts)[cursor:cursor + limit] if record["count"] > cursor else []
+
+    record["data"] = page
+    record["nextCursor"] = cursor + len(page)
+    return record
+
+
+def iter_job_events(job_id: str, top_n: int = 10, poll_seconds: float = 15):
+    """
+    Follows a job as a stream of scan events: "start", "result" per ticker,
+    "progress" and a running "top" as results arrive, then "done" (or "error").
+    """
+    cursor, started, found, rank = 0, False, [], None
+    while True:
+        record = get_job(job_id, cursor=cursor, limit=1000, wait=poll_seconds)
+        if record is None:
+            yield {"type": "error", "detail": "Scan job not found"}
+            return
+        rank = rank or _kind_spec(record["kind"])["rank"]
+        if not started and record["total"] is not None:
+            started = True
+            yield {"type": "start", "total": record["total"], "job": job_id}
+        for result in record["data"]:
+            yield {"type": "result", "data": result}
+        if record["data"]:
+            found.extend(record["data"])
+            cursor = record["nextCursor"]
+            yield {"type": "progress", "done": record["done"], "total": record["total"]}
+            yield {"type": "top", "data": heapq.nlargest(top_n, found, key=rank)}
+        if record["state"] == "failed":
+            yield {"type": "error", "detail": record["error"]}
+            return
+        if record["state"] == "done" and cursor >= record["count"]:
+            yield {"type": "done", "count": record["count"], "version": record["version"], "job": job_id}
+            return
@@ -0,0 +1,154 @@
+"""
+Versioned whole-universe scan snapshots.
+
+A scan produces one ranked list covering everything it looked at and stores it
+once: {"version", "createdAt", "items"}. Any limit / offset / sort is served by
+slicing that snapshot, so scan work no longer multiplies with the query
+parameters clients send.
+
+Pages carry an opaque cursor pinned to the snapshot version, so a client
+paging through keeps seeing the same ranking even after a rescan replaces the
+current snapshot. The version is a hash of the items, so a rescan that finds
+the same results keeps existing cursors valid. Pinned copies live as long as
+the snapshot's stale window; each publish purges older ones, and a cursor
+whose version is gone raises CursorExpired rather than paging another ranking.
+"""
+
+import json
+import math
+import time
+import base64
+import hashlib
+from typing import Callable, List, Optional
+
+from services.cache_service import CacheService
+
+
+class CursorExpired(ValueError):
+    """The snapshot version a cursor was pinned to is no longer kept."""
+
+
+def build_snapshot(items: List) -> dict:
+    digest = hashlib.sha1(json.dumps(items, sort_keys=True, default=str).encode()).hexdigest()
+    return {"version": digest[:12], "createdAt": time.time(), "items": items}
+
+
+def get_snapshot(name: str, compute: Callable[[], List], ttl_minutes: int, stale_minutes: int = None,
+                 version: str = None) -> Optional[dict]:
+    """
+    Current snapshot for name (stale-while-revalidate via CacheService), or the
+    pinned one when version is given; CursorExpired once that version is gone.
+    """
+    key = f"snapshot_{name}"
+    pin_minutes = stale_minutes or ttl_minutes
+    if version:
+        pinned = CacheService.get(f"{key}@{version}", max_age_minutes=pin_minutes)
+        if pinned:
+            return pinned
+        current = CacheService.get(key, max_age_minutes=pin_minutes)
+        if current and current["version"] == version:
+            return current
+        raise CursorExpired("Cursor expired: the scan it was paging has been replaced, start again without a cursor")
+
+    def run():
+        items = compute()
+        if not items:
+            return None
+        snapshot = build_snapshot(items)
+        _pin(name, snapshot, pin_minutes)
+        return snapshot
+
+    return CacheService.get_or_compute(key, run, ttl_minutes=ttl_minutes, stale_minutes=stale_minutes)
+
+
+def _pin(name: str, snapshot: dict, retain_minutes: int, current: bool = False):
+    """Stores the pinned copy cursors read (and the current snapshot too if asked), then drops expired pins."""
+    rows = {f"snapshot_{name}@{snapshot['version']}": snapshot}
+    if current:
+        rows[f"snapshot_{name}"] = snapshot
+    CacheService.set_many(rows)
+    CacheService.purge(f"snapshot_{name}@", retain_minutes)
+
+
+def peek_snapshot(name: str, max_age_minutes: int) -> Optional[dict]:
+    """The current snapshot if one younger than max_age_minutes exists; never computes."""
+    return CacheService.get(f"snapshot_{name}", max_age_minutes=max_age_minutes)
+
+
+def save_snapshot(name: str, items: List, retain_minutes: int) -> dict:
+    """
+    Publishes items computed outside get_snapshot (e.g. by a streamed scan) as
+    the current snapshot. retain_minutes is how long its cursors stay valid.
+    """
+    snapshot = build_snapshot(items)
+    _pin(name, snapshot, retain_minutes, current=True)
+    return snapshot
+
+
+def encode_cursor(version: str, offset: int, sort: Optional[str]) -> str:
+    raw = json.dumps({"v": version, "o": offset, "s": sort}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+        return {"version": str(state["v"]), "offset": int(state["o"]), "sort": state.get("s")}
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def sort_items(items: List[dict], sort: Optional[str]) -> List[dict]:
+    """
+    sort is a field name, '-field' for descending; items missing the field go last.
+    A numeric field sorts numerically, with placeholder strings ("Unknown") and
+    NaN treated as missing; a text field sorts as text. Anything else is a ValueError.
+    """
+    if not sort:
+        return items
+    field = sort.lstrip("-")
+    if items and not any(field in item for item in items):
+        raise ValueError(f"Unknown sort field '{field}'")
+
+    values = [item.get(field) for item in items]
+    if any(_is_number(v) for v in values) and all(v is None or isinstance(v, (int, float, str)) for v in values):
+        sortable = _is_number
+    elif all(v is None or isinstance(v, str) for v in values):
+        sortable = lambda v: isinstance(v, str)
+    else:
+        raise ValueError(f"Field '{field}' can't be sorted")
+
+    present = [item for item, v in zip(items, values) if sortable(v)]
+    missing = [item for item, v in zip(items, values) if not sortable(v)]
+    return sorted(present, key=lambda item: item[field], reverse=sort.startswith("-")) + missing
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value))
+
+
+def paginate(name: str, compute: Callable[[], List], limit: int, offset: int = 0, cursor: str = None,
+             sort: str = None, ttl_minutes: int = 15, stale_minutes: int = None) -> dict:
+    """
+    One page of the named snapshot: {"items", "total", "version", "nextCursor"}.
+    A cursor overrides offset and sort and pins the version it was issued for.
+    """
+    version = None
+    if cursor:
+        state = decode_cursor(cursor)
+        version, offset, sort = state["version"], state["offset"], state["sort"]
+
+    snapshot = get_snapshot(name, compute, ttl_minutes, stale_minutes, version=version)
+    if not snapshot:
+        return {"items": [], "total": 0, "version": None, "nextCursor": None}
+
+    items = sort_items(snapshot["items"], sort)
+    page = items[offset:offset + limit]
+    end = offset + len(page)
+    return {
+        "items": page,
+        "total": len(items),
+        "version": snapshot["version"],
+        "nextCursor": encode_cursor(snapshot["version"], end, sort) if end < len(items) else None,
+    }
@@ -0,0 +1,92 @@
+"""
+Cross-sectional screen engine — declarative filters over a PricePanel.
+
+A screen is a plain dict:
+
+    {
+        "filters": [("Close", "<", 5.0), ("Volume", ">", 20000)],
+        "rank_by": "Volume",      # optional, any column below
+        "descending": True,
+        "limit": 300,             # optional
+    }
+
+Every filter is evaluated as one NumPy mask over the latest bar of every
+ticker in the panel. Columns are the OHLCV fields plus PrevClose and
+ChangePct (latest close vs the previous bar).
+"""
+
+import operator
+from typing import Dict, List
+
+import numpy as np
+
+from services.bar_store import FIELDS
+from services.price_panel import PricePanel
+
+_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# ─── Shared screens ───────────────────────────────────────────────────────────
+
+# Free penny list (lowered vol threshold slightly to ensure we get data)
+PENNY_LIST_SCREEN = {"filters": [("Close", "<", 5.0), ("Volume", ">", 5000)], "rank_by": "Volume"}
+# Pro full scan / Streamlit smart scan Phase 1
+PENNY_SCAN_SCREEN = {"filters": [("Close", "<", 5.0), ("Volume", ">", 20000)], "rank_by": "Volume"}
+# Progressive batch scan keeps universe order
+PENNY_BATCH_SCREEN = {"filters": [("Close", "<", 5.0), ("Volume", ">", 10000)]}
+
+
+def price_band_screen(min_price: float, max_price: float = None, min_volume: float = 500000) -> dict:
+    """Liquid names inside a price band (market engine quick screen)."""
+    filters = [("Close", ">=", min_price), ("Volume", ">", min_volume)]
+    if max_price:
+        filters.append(("Close", "<=", max_price))
+    return {"filters": filters}
+
+
+# ─── Engine ───────────────────────────────────────────────────────────────────
+
+def _columns(panel: PricePanel) -> Dict[str, np.ndarray]:
+    cols = {name: panel.latest(name) for name in FIELDS}
+    cols["PrevClose"] = panel.latest("Close", lag=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev = cols["PrevClose"]
+        cols["ChangePct"] = np.where(prev > 0, (cols["Close"] - prev) / prev * 100, 0.0).astype(np.float32)
+    return cols
+
+
+def run_screen(panel: PricePanel, spec: dict) -> List[dict]:
+    """
+    Evaluates a screen spec over the panel in one pass.
+    Returns survivors as {"ticker", <columns>} dicts, ranked if the spec asks for it.
+    Tickers with NaN in a filtered column never pass.
+    """
+    if not len(panel):
+        return []
+
+    cols = _columns(panel)
+    mask = ~np.isnan(cols["Close"])
+    for column, op, value in spec.get("filters", []):
+        with np.errstate(invalid="ignore"):
+            mask &= _OPS[op](cols[column], value)
+
+    rows = np.flatnonzero(mask)
+    rank_by = spec.get("rank_by")
+    if rank_by:
+        keys = cols[rank_by][rows]
+        # Stable sort keeps universe order among ties
+        order = np.argsort(-keys if spec.get("descending", True) else keys, kind="stable")
+        rows = rows[order]
+    if spec.get("limit"):
+        rows = rows[: spec["limit"]]
+
+    return [
+        {"ticker": panel.tickers[r], **{name: float(values[r]) for name, values in cols.items()}}
+        for r in rows
+    ]
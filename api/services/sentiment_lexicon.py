@@ -0,0 +1,149 @@
+"""
+Compiled sentiment lexicon for headline scoring.
+
+Terms (single words or phrases, each with a weight) are compiled once into a
+trie keyed by word. A headline is tokenized once and walked through the trie
+from each token, taking the longest term that starts there, so scoring costs
+about one pass over the headline however large the lexicon grows. Matching is
+on whole words: "low" no longer hits inside "follow".
+
+Each term is stored once, as written. Headline tokens are mapped back to the
+lexicon words they inflect ("surges", "surged", "surging" -> "surge"; "dropped"
+-> "drop"), so every word of a phrase matches its inflections ("beats
+estimates" hits "beat estimates") while the trie stays as small as the term
+list. Only regular English forms are generated, so "wines", "cuter" and
+"Lowes" are not read as "win", "cut" and "low". A negator shortly before a
+term ("not", "no", "never", "didn't", ...) flips the sign of the first term
+after it, within the same clause: punctuation ends a negator's reach.
+"""
+
+import re
+import json
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bump when the matching rules change, so stored scores get recomputed
+RULES_VERSION = 4
+
+NEGATORS = frozenset({"no", "not", "never", "without", "nor", "cannot", "neither"})
+# Tokens after a negator that it still applies to
+NEGATION_WINDOW = 3
+
+# Words, plus clause punctuation (a dash only when spaced, so "all-time" stays one phrase)
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[.,;:!?()|\u2013\u2014]|(?<=\s)-(?=\s)")
+BOUNDARY = "|"  # token standing for any clause punctuation
+_END = object()  # trie key holding a complete term's weight
+_VOWELS = set("aeiou")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words, with clause punctuation as BOUNDARY tokens."""
+    return [t if t[0].isalnum() else BOUNDARY for t in _TOKEN.findall(text.lower().replace("’", "'"))]
+
+
+def inflections(word: str) -> set:
+    """The word plus its regular plural/third-person, past, -ing and comparative forms."""
+    forms = {word}
+    consonant_y = word.endswith("y") and len(word) > 2 and word[-2] not in _VOWELS
+    if consonant_y:
+        stem = word[:-1]
+        forms |= {stem + "ies", stem + "ied", word + "ing", stem + "ier", stem + "iest"}
+        return forms
+    forms.add(word + "es" if word.endswith(("s", "x", "z", "ch", "sh")) else word + "s")
+    if word.endswith("e"):
+        forms |= {word + "d", word[:-1] + "ing", word + "r", word + "st"}
+        return forms
+    plain = {word + suffix for suffix in ("ed", "ing", "er", "est")}
+    # Consonant-vowel-consonant endings double the last letter: drop -> dropped, cut -> cutting.
+    # One-syllable words only double ("cuter" isn't "cut"); longer ones go either way (benefited).
+    if len(word) >= 3 and word[-1] not in _VOWELS | set("wxy") and word[-2] in _VOWELS \
+            and word[-3] not in _VOWELS:
+        doubled = {word + word[-1] + suffix for suffix in ("ed", "ing", "er", "est")}
+        forms |= doubled if len(re.findall(r"[aeiouy]+", word)) == 1 else doubled | plain
+    else:
+        forms |= plain
+    return forms
+
+
+class Lexicon:
+    def __init__(self, terms: Dict[str, float], negators: Iterable[str] = NEGATORS,
+                 negation_window: int = NEGATION_WINDOW):
+        """terms: {word or phrase: weight}; every word of a term also matches its inflections."""
+        self.root = {}
+        # Headline token -> the lexicon words it is a form of (a word is a form of itself)
+        self.bases: Dict[str, set] = {}
+        self.negators = frozenset(negators)
+        self.negation_window = negation_window
+        # Identifies what scores mean: the rules, the terms and weights, the negation settings
+        spec = [RULES_VERSION, sorted(terms.items()), sorted(self.negators), negation_window]
+        self.version = hashlib.sha1(json.dumps(spec).encode()).hexdigest()[:12]
+        for term, weight in terms.items():
+            words = [w for w in tokenize(term) if w != BOUNDARY]
+            if words:
+                self._insert(words, weight)
+                for word in words:
+                    for form in inflections(word):
+                        self.bases.setdefault(form, set()).add(word)
+
+    @classmethod
+    def from_words(cls, bullish: Iterable[str], bearish: Iterable[str], weighted: Dict[str, float] = None,
+                   **kwargs) -> "Lexicon":
+        """Bullish words weigh +1 and bearish -1; weighted terms override either."""
+        terms = {w: 1 for w in bullish}
+        terms.update({w: -1 for w in bearish})
+        terms.update(weighted or {})
+        return cls(terms, **kwargs)
+
+    def _insert(self, words: List[str], weight: float):
+        node = self.root
+        for word in words:
+            node = node.setdefault(word, {})
+        node[_END] = weight
+
+    def _longest(self, tokens: List[str], i: int) -> Tuple[Optional[int], float]:
+        """(last token, weight) of the longest term starting at tokens[i], or (None, 0)."""
+        end, weight, end_exact = None, 0, False
+        # A token can be a form of several lexicon words ("lower": "low" or "lower"), so walk them all
+        frontier = [(self.root, True)]
+        for j in range(i, len(tokens)):
+            bases = self.bases.get(tokens[j])
+            if not bases:
+                break
+            frontier = [(node[base], exact and base == tokens[j])
+                        for node, exact in frontier for base in bases if base in node]
+            for node, exact in frontier:
+                # Longer wins; at the same length a term as written beats another term's inflection
+                if _END in node and (end != j or (exact and not end_exact)):
+                    end, weight, end_exact = j, node[_END], exact
+            if not frontier:
+                break
+        return end, weight
+
+    def matches(self, text: str) -> List[Tuple[str, float]]:
+        """(matched text, signed weight) for each term in the text, longest match first, no overlaps."""
+        tokens = tokenize(text)
+        found = []
+        last_negator = -self.negation_window - 1
+        i = 0
+        while i < len(tokens):
+            end, weight = self._longest(tokens, i)
+            if end is None:
+                if tokens[i] == BOUNDARY:
+                    last_negator = -self.negation_window - 1
+                elif tokens[i] in self.negators or tokens[i].endswith("n't"):
+                    last_negator = i
+                i += 1
+                continue
+            if i - last_negator <= self.negation_window:
+                weight = -weight
+                # A negator flips only the first term after it
+                last_negator = -self.negation_window - 1
+            found.append((" ".join(tokens[i:end + 1]), weight))
+            i = end + 1
+        return found
+
+    def score(self, text: str) -> float:
+        return sum(weight for _, weight in self.matches(text))
+
+    def score_many(self, texts: Iterable[str]) -> List[float]:
+        return [self.score(text) for text in texts]
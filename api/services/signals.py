@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import logging
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -45,31 +46,35 @@ def check_structure_liquidity(df: pd.DataFrame, lookback: int = 3) -> dict:
         
         # Support/Resistance levels (simplified last major swing)
         # A true swing analysis requires more code, using recent min/max is a proxy for "Liquidity Zone"
-        
-        signals = []
-        score = 0
-        
-        # Long: Sweep Low & Reclaim
-        # Price went below recent low but closed above it
-        if current_low < recent_low and current_close > recent_low:
-             signals.append("Liquidity Sweep (Bullish)")
-             score += 5
-             
-        # Short: Sweep High & Reclaim
-        # Price went above recent high but closed below it
-        elif current_high > recent_high and current_close < recent_high:
-             signals.append("Liquidity Sweep (Bearish)")
-             score += 5 # Magnitude, direction handled by caller context if needed
-
-        if signals:
-            return {"signals": signals, "score": score}
-            
+        return _liquidity_result(current_high, current_low, current_close, recent_high, recent_low)
+
     except Exception as e:
         logger.error(f"Error in check_structure_liquidity: {e}")
     
     return None
 
 
+def _liquidity_result(high, low, close, recent_high, recent_low) -> dict:
+    signals = []
+    score = 0
+
+    # Long: Sweep Low & Reclaim
+    # Price went below recent low but closed above it
+    if low < recent_low and close > recent_low:
+        signals.append("Liquidity Sweep (Bullish)")
+        score += 5
+
+    # Short: Sweep High & Reclaim
+    # Price went above recent high but closed below it
+    elif high > recent_high and close < recent_high:
+        signals.append("Liquidity Sweep (Bearish)")
+        score += 5 # Magnitude, direction handled by caller context if needed
+
+    if signals:
+        return {"signals": signals, "score": score}
+    return None
+
+
 def check_wyckoff_spring(df: pd.DataFrame) -> dict:
     """
     Detects Wyckoff Spring patterns.
@@ -97,21 +102,27 @@ def check_wyckoff_spring(df: pd.DataFrame) -> dict:
         # 2. Close recovers above support
         # 3. Low Volume (relative to avg)
         
-        is_spring = (current['Low'] < support_level) and (current['Close'] > support_level)
-        
-        if is_spring:
-            # Check Volume
-            avg_vol = df['Volume'].iloc[-20:-1].mean()
-            if avg_vol > 0:
-                vol_ratio = current['Volume'] / avg_vol
-                if vol_ratio < 1.2: # Low volume test
-                    return {"signals": ["Wyckoff Spring"], "score": 5}
-                    
+        avg_vol = df['Volume'].iloc[-20:-1].mean()
+        return _wyckoff_result(current['Low'], current['Close'], current['Volume'], support_level, avg_vol)
+
     except Exception as e:
         logger.error(f"Error in check_wyckoff_spring: {e}")
 
     return None
 
+
+def _wyckoff_result(low, close, volume, support_level, avg_vol) -> dict:
+    is_spring = (low < support_level) and (close > support_level)
+
+    if is_spring:
+        # Check Volume
+        if avg_vol > 0:
+            vol_ratio = volume / avg_vol
+            if vol_ratio < 1.2: # Low volume test
+                return {"signals": ["Wyckoff Spring"], "score": 5}
+    return None
+
+
 def detect_momentum_velocity(df: pd.DataFrame) -> dict:
     """
     Detects high-velocity price moves (Rocket signals).
@@ -130,35 +141,260 @@ def detect_momentum_velocity(df: pd.DataFrame) -> dict:
         roc_3d = (current['Close'] - prev_3d['Close']) / prev_3d['Close'] * 100
         roc_5d = (current['Close'] - prev_5d['Close']) / prev_5d['Close'] * 100
 
-        signals = []
-        score = 0
-
-        # 1. Vertical Move (Extremely High 3-Day ROC)
-        if roc_3d > 100:
-            signals.append(f"Vertical Move ({roc_3d:.0f}%)")
-            score += 10
-        elif roc_3d > 40:
-            signals.append(f"High Velocity ({roc_3d:.0f}%)")
-            score += 7
-
-        # 2. Acceleration (Today's move is faster than past days)
-        if roc_1d > 15 and roc_1d > roc_3d / 2:
-            signals.append("Parabolic Acceleration")
-            score += 5
-
-        # 3. Multi-day Ramp
-        if roc_5d > 20 and roc_3d > 10 and roc_1d > 0:
-            signals.append("Sustained Momentum")
-            score += 3
-
-        if signals:
-            return {"signals": signals, "score": score, "velocity_metrics": {
-                "roc_1d": roc_1d,
-                "roc_3d": roc_3d,
-                "roc_5d": roc_5d
-            }}
-            
+        return _velocity_result(roc_1d, roc_3d, roc_5d)
+
     except Exception as e:
         logger.error(f"Error in detect_momentum_velocity: {e}")
 
     return None
+
+
+def _velocity_result(roc_1d, roc_3d, roc_5d) -> dict:
+    signals = []
+    score = 0
+
+    # 1. Vertical Move (Extremely High 3-Day ROC)
+    if roc_3d > 100:
+        signals.append(f"Vertical Move ({roc_3d:.0f}%)")
+        score += 10
+    elif roc_3d > 40:
+        signals.append(f"High Velocity ({roc_3d:.0f}%)")
+        score += 7
+
+    # 2. Acceleration (Today's move is faster than past days)
+    if roc_1d > 15 and roc_1d > roc_3d / 2:
+        signals.append("Parabolic Acceleration")
+        score += 5
+
+    # 3. Multi-day Ramp
+    if roc_5d > 20 and roc_3d > 10 and roc_1d > 0:
+        signals.append("Sustained Momentum")
+        score += 3
+
+    if signals:
+        return {"signals": signals, "score": score, "velocity_metrics": {
+            "roc_1d": roc_1d,
+            "roc_3d": roc_3d,
+            "roc_5d": roc_5d
+        }}
+    return None
+
+
+# ─── Vectorized series ────────────────────────────────────────────────────────
+#
+# Companions to the last-row checks above: each evaluates every bar at once,
+# exactly as the matching check would on df.iloc[:t+1]. Inputs are 1-D series
+# or (tickers × time) arrays, right-aligned with NaN padding on the left;
+# outputs have the same shape.
+
+def _as_2d(x) -> np.ndarray:
+    return np.atleast_2d(np.asarray(x, dtype=np.float64))
+
+
+def _restore(x: np.ndarray, like) -> np.ndarray:
+    return x[0] if np.ndim(like) == 1 else x
+
+
+def _bar_age(close: np.ndarray) -> np.ndarray:
+    """Index of each bar within its own ticker's history (negative in the padding)."""
+    first = np.argmax(~np.isnan(close), axis=1)
+    return np.arange(close.shape[1])[None, :] - first[:, None]
+
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[:, n:] = x[:, :-n]
+    return out
+
+
+def _rolling(x: np.ndarray, window: int, how: str) -> np.ndarray:
+    # NaN-skipping rolling reduction along time, partial windows allowed (like tail(n).min())
+    return getattr(pd.DataFrame(x.T).rolling(window, min_periods=1), how)().to_numpy().T
+
+
+def structure_liquidity_series(high, low, close, lookback: int = 3) -> dict:
+    """Per-bar check_structure_liquidity: {'bullish', 'bearish', 'score'}."""
+    h, l, c = _as_2d(high), _as_2d(low), _as_2d(close)
+    ready = _bar_age(c) >= (lookback * 2) + 9
+    recent_low = _shift(_rolling(l, 20, "min"), 1)
+    recent_high = _shift(_rolling(h, 20, "max"), 1)
+    with np.errstate(invalid="ignore"):
+        bullish = ready & (l < recent_low) & (c > recent_low)
+        bearish = ready & ~bullish & (h > recent_high) & (c < recent_high)
+    score = np.where(bullish | bearish, 5, 0)
+    return {k: _restore(v, close) for k, v in {"bullish": bullish, "bearish": bearish, "score": score}.items()}
+
+
+def wyckoff_spring_series(low, close, volume) -> dict:
+    """Per-bar check_wyckoff_spring: {'spring', 'score'}."""
+    l, c, v = _as_2d(low), _as_2d(close), _as_2d(volume)
+    ready = _bar_age(c) >= 59
+    support = _shift(_rolling(l, 58, "min"), 2)
+    avg_vol = _shift(_rolling(v, 19, "mean"), 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spring = ready & (l < support) & (c > support) & (avg_vol > 0) & (v / avg_vol < 1.2)
+    return {"spring": _restore(spring, close), "score": _restore(np.where(spring, 5, 0), close)}
+
+
+def momentum_velocity_series(close) -> dict:
+    """Per-bar detect_momentum_velocity: ROC metrics, each rule's mask and the score."""
+    c = _as_2d(close)
+    ready = _bar_age(c) >= 9
+    with np.errstate(invalid="ignore", divide="ignore"):
+        roc = {n: (c - _shift(c, n)) / _shift(c, n) * 100 for n in (1, 3, 5)}
+        vertical = ready & (roc[3] > 100)
+        high_velocity = ready & ~vertical & (roc[3] > 40)
+        parabolic = ready & (roc[1] > 15) & (roc[1] > roc[3] / 2)
+        sustained = ready & (roc[5] > 20) & (roc[3] > 10) & (roc[1] > 0)
+    score = vertical * 10 + high_velocity * 7 + parabolic * 5 + sustained * 3
+    out = {
+        "roc_1d": roc[1], "roc_3d": roc[3], "roc_5d": roc[5],
+        "vertical": vertical, "high_velocity": high_velocity,
+        "parabolic": parabolic, "sustained": sustained, "score": score,
+    }
+    return {k: _restore(v, close) for k, v in out.items()}
+
+
+def signal_timeline(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    All three setups for every bar of one ticker.
+    Returns a frame on df's index with the signal lists each check would
+    return on that day ('liquidity', 'wyckoff', 'velocity') and the total 'score'.
+    """
+    high, low = df['High'].to_numpy(), df['Low'].to_numpy()
+    close, volume = df['Close'].to_numpy(), df['Volume'].to_numpy()
+    liq = structure_liquidity_series(high, low, close)
+    wyc = wyckoff_spring_series(low, close, volume)
+    vel = momentum_velocity_series(close)
+
+    liquidity = [[] for _ in range(len(df))]
+    wyckoff = [[] for _ in range(len(df))]
+    velocity = [[] for _ in range(len(df))]
+    for i in np.flatnonzero(liq['bullish']):
+        liquidity[i].append("Liquidity Sweep (Bullish)")
+    for i in np.flatnonzero(liq['bearish']):
+        liquidity[i].append("Liquidity Sweep (Bearish)")
+    for i in np.flatnonzero(wyc['spring']):
+        wyckoff[i].append("Wyckoff Spring")
+    for i in np.flatnonzero(vel['score']):
+        roc_3d = vel['roc_3d'][i]
+        if vel['vertical'][i]:
+            velocity[i].append(f"Vertical Move ({roc_3d:.0f}%)")
+        elif vel['high_velocity'][i]:
+            velocity[i].append(f"High Velocity ({roc_3d:.0f}%)")
+        if vel['parabolic'][i]:
+            velocity[i].append("Parabolic Acceleration")
+        if vel['sustained'][i]:
+            velocity[i].append("Sustained Momentum")
+
+    return pd.DataFrame({
+        "liquidity": liquidity,
+        "wyckoff": wyckoff,
+        "velocity": velocity,
+        "score": liq['score'] + wyc['score'] + vel['score'],
+    }, index=df.index)
+
+
+# ─── Streaming state ──────────────────────────────────────────────────────────
+
+class _WindowExtreme:
+    """Min (or max) over the last `size` pushed values via a monotonic deque; amortized O(1)."""
+
+    def __init__(self, size: int, is_max: bool = False):
+        self.size = size
+        self.sign = -1.0 if is_max else 1.0
+        self.items = deque()  # (index, signed value), increasing values
+
+    def push(self, index: int, value: float):
+        if not np.isnan(value):
+            v = self.sign * value
+            while self.items and self.items[-1][1] >= v:
+                self.items.pop()
+            self.items.append((index, v))
+        while self.items and self.items[0][0] <= index - self.size:
+            self.items.popleft()
+
+    def value(self) -> float:
+        return self.sign * self.items[0][1] if self.items else np.nan
+
+
+class SignalState:
+    """
+    Per-ticker streaming evaluator for the three setups above.
+
+    Completed bars go in with push(); evaluate() scores a candidate latest bar
+    (e.g. the still-forming intraday bar on each quote) against them without
+    changing state. Both are O(1): the liquidity range and Wyckoff support live
+    in monotonic deques, volume and ROC lags in fixed-size ring buffers.
+    evaluate() returns what the last-row checks would for history + that bar.
+    """
+
+    def __init__(self, lookback: int = 3):
+        self.min_liquidity_bars = (lookback * 2) + 10
+        self.count = 0
+        self.range_low = _WindowExtreme(20)
+        self.range_high = _WindowExtreme(20, is_max=True)
+        # Wyckoff support skips the newest completed bar: lows enter one push late
+        self.support = _WindowExtreme(58)
+        self.pending_low = np.nan
+        self.volumes = deque(maxlen=19)
+        self.vol_sum = 0.0
+        self.closes = deque(maxlen=5)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SignalState":
+        """Warms a state up from a ticker's completed daily bars."""
+        state = cls()
+        for high, low, close, volume in df[['High', 'Low', 'Close', 'Volume']].itertuples(index=False):
+            state.push(high, low, close, volume)
+        return state
+
+    def push(self, high: float, low: float, close: float, volume: float):
+        """Appends one completed bar."""
+        i = self.count
+        self.range_low.push(i, low)
+        self.range_high.push(i, high)
+        if i > 0:
+            self.support.push(i - 1, self.pending_low)
+        self.pending_low = low
+
+        if len(self.volumes) == self.volumes.maxlen:
+            self.vol_sum -= np.nan_to_num(self.volumes[0])
+        self.volumes.append(volume)
+        self.vol_sum += np.nan_to_num(volume)
+        self.closes.append(np.float64(close))
+        self.count += 1
+
+    def evaluate(self, high: float, low: float, close: float, volume: float) -> dict:
+        """
+        Scores a candidate latest bar. Returns {'liquidity', 'wyckoff', 'velocity'}
+        (each None or the matching check's result), plus the combined 'signals' and 'score'.
+        """
+        bars = self.count + 1
+        liquidity = wyckoff = velocity = None
+
+        if bars >= self.min_liquidity_bars:
+            liquidity = _liquidity_result(high, low, close, self.range_high.value(), self.range_low.value())
+
+        if bars >= 60:
+            valid_vols = sum(1 for v in self.volumes if not np.isnan(v))
+            avg_vol = self.vol_sum / valid_vols if valid_vols else np.nan
+            wyckoff = _wyckoff_result(low, close, volume, self.support.value(), avg_vol)
+
+        if bars >= 10:
+            prev_1d, prev_3d, prev_5d = self.closes[-1], self.closes[-3], self.closes[-5]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                velocity = _velocity_result(
+                    (close - prev_1d) / prev_1d * 100,
+                    (close - prev_3d) / prev_3d * 100,
+                    (close - prev_5d) / prev_5d * 100,
+                )
+
+        found = [r for r in (liquidity, wyckoff, velocity) if r]
+        return {
+            "liquidity": liquidity,
+            "wyckoff": wyckoff,
+            "velocity": velocity,
+            "signals": [s for r in found for s in r["signals"]],
+            "score": sum(r["score"] for r in found),
+        }
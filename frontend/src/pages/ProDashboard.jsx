@@ -82,22 +82,25 @@ export default function ProDashboard() {
     setResults([]);
     setLogs((prev) => [...prev, ">> COMMAND RECEIVED: INITIATE SCAN SEQUENCE"]);
 
-    const BATCH_SIZE = 10;
-    let offset = 0;
     let totalFetched = 0;
-    let consecutiveEmptyBatches = 0;
 
     try {
-      while (totalFetched < scanLimit && consecutiveEmptyBatches < 3) {
-        setLogs((prev) => [
-          ...prev.slice(-4),
-          `>> Scanning sector block ${offset}...`,
-        ]);
+      // Start (or join) the shared server-side scan job, then long-poll its results
+      const started = await client.post("/api/penny/scan/jobs");
+      const jobId = started.data.job.id;
+      let cursor = 0;
+      let finished = false;
 
+      while (!finished && totalFetched < scanLimit) {
         const res = await client.get(
-          `/api/penny/scan_batch?limit=${BATCH_SIZE}&offset=${offset}`,
+          `/api/penny/scan/jobs/${jobId}?cursor=${cursor}&limit=100&wait=10`,
         );
-        const newData = res.data.data || [];
+        const { data: newData = [], job, nextCursor } = res.data;
+        cursor = nextCursor;
+        setLogs((prev) => [
+          ...prev.slice(-4),
+          `>> Scanning sector block ${job.done}/${job.total ?? "?"}...`,
+        ]);
 
         if (newData.length > 0) {
           setResults((prev) => {
@@ -109,12 +112,9 @@ export default function ProDashboard() {
             );
           });
           totalFetched += newData.length;
-          consecutiveEmptyBatches = 0;
-        } else {
-          consecutiveEmptyBatches++;
         }
-        offset += BATCH_SIZE;
-        await new Promise((r) => setTimeout(r, 200));
+        if (job.state === "failed") throw new Error(job.error || "scan failed");
+        finished = job.state === "done" && cursor >= job.count;
       }
       setLogs((prev) => [
         ...prev,
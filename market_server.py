@@ -10,6 +10,13 @@ import market_loader
 import penny_loader
 from dotenv import load_dotenv
 
+# Shared API services (local bar store) live under api/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+from services.bar_store import get_ticker_history
+from services.price_panel import load_panel, load_panel_until
+from services.indicators import add_indicators
+from services.screen import run_screen, price_band_screen
+
 # Fix for yfinance cache issue in containerized environments
 try:
     yf.set_tz_cache_location("/tmp/yfinance_cache")
@@ -17,7 +24,6 @@ except Exception:
     pass
 
 # Lazy load expensive libraries only when needed
-# import pandas_ta_classic as ta
 # import plotly.graph_objects as go
 # from textblob import TextBlob
 # from GoogleNews import GoogleNews
@@ -47,21 +53,13 @@ def optimize_dataframe(df):
 @st.cache_data(ttl=300) 
 def get_data(ticker, end_date=None):
     try:
-        # Download last 6 months of data
+        # Last 6 months of data from the local bar store (only new bars are downloaded)
         # If backtesting, we might need a bit more to show "What Happened Next"
         period = "6mo"
-        df = yf.download(ticker, period=period, interval="1d", progress=False, auto_adjust=False)
+        df = get_ticker_history(ticker, period=period)
         
         if df.empty:
             return None
-            
-        # Fix MultiIndex columns
-        if isinstance(df.columns, pd.MultiIndex):
-            try:
-                if df.columns.nlevels > 1:
-                     df.columns = df.columns.get_level_values(0)
-            except IndexError:
-                pass
 
         df = optimize_dataframe(df)
         
@@ -118,9 +116,6 @@ def get_sentiment(ticker):
 
 # --- 3. THE STRATEGY ENGINE (The "Brain") ---
 def analyze_stock(df, ticker):
-    # Lazy import
-    import pandas_ta_classic as ta
-
     # Ensure columns are flat (fix for some yfinance versions)
     if isinstance(df.columns, pd.MultiIndex):
         try:
@@ -128,24 +123,14 @@ def analyze_stock(df, ticker):
         except IndexError:
             pass
             
-    # Copy to avoid SettingWithCopy on cached data if it wasn't a deep copy
-    # But usually we want to modify a local version.
-    # Since we return a dict with 'latest', we might not need to copy full DF if we are careful,
-    # but pandas_ta appends to the DF.
-    # To be safe and avoid mutating cached dataframe:
-    df = df.copy()
-
-    # Calculate Indicators using pandas_ta
+    # add_indicators returns a copy, so the cached dataframe is never mutated.
+
+    # Calculate Indicators (RSI, SMA 50/200 trend, 20-day Volume SMA, MACD)
     try:
-        # Timeout/Memory protection: TA can be heavy on very large DFs, but 6mo is small.
-        df.ta.rsi(length=14, append=True)
-        df.ta.sma(length=50, append=True) # Trend
-        df.ta.sma(length=200, append=True) # Long Trend
-        # Calculate Volume SMA (often not standard in basic examples but useful)
-        # Using a 20-day SMA for volume
-        df['VOL_SMA_20'] = df['Volume'].rolling(window=20).mean()
-        
-        df.ta.macd(append=True)
+        df = add_indicators({ticker: df}, sma_lengths=(50, 200), bbands_length=0,
+                            macd_cols=True, vol_sma_col="VOL_SMA_20").get(ticker)
+        if df is None:
+            return None
     except Exception as e:
         return None # Not enough data for indicators
     
@@ -217,49 +202,15 @@ def quick_screen(tickers_batch, min_price=5.0, max_price=None, end_date=None):
     Screens based on price and volume.
     """
     try:
-        # If backtesting, we need to download specific range or download period that covers it
+        # Served from the local bar store; backtests get the panel as of end_date (5d lookback)
         if end_date:
-            end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
-            start_ts = end_ts - pd.Timedelta(days=15) # Fetch enough for 5d lookback
-            data = yf.download(tickers_batch, start=start_ts.strftime('%Y-%m-%d'), end=end_ts.strftime('%Y-%m-%d'), group_by='ticker', threads=True, progress=False)
+            panel = load_panel_until(tickers_batch, end_date, lookback_days=15)
         else:
-            data = yf.download(tickers_batch, period="5d", group_by='ticker', threads=True, progress=False)
+            panel = load_panel(tickers_batch, period="5d")
         
-        passed_tickers = []
+        passed_tickers = [s['ticker'] for s in run_screen(panel, price_band_screen(min_price, max_price))]
         
-        # Helper to check a single DF
-        def check_ticker(df, ticker):
-            if df.empty: return False
-            if end_date:
-                df = slice_df_to_date(df, end_date)
-            if df.empty: return False
-            
-            try:
-                latest = df.iloc[-1]
-                if pd.isna(latest['Close']): return False
-                
-                price = latest['Close']
-                volume = latest['Volume']
-                
-                if price < min_price: return False
-                if max_price and price > max_price: return False
-                
-                if volume > 500000:
-                    return True
-            except: pass
-            return False
-
-        if len(tickers_batch) == 1:
-            if check_ticker(data, tickers_batch[0]):
-                passed_tickers.append(tickers_batch[0])
-        else:
-            for ticker in tickers_batch:
-                try:
-                    if check_ticker(data[ticker], ticker):
-                        passed_tickers.append(ticker)
-                except: continue
-        
-        del data
+        del panel
         gc.collect()
         return passed_tickers
     except: return []
@@ -10,15 +10,10 @@ except Exception:
     pass
 import pandas as pd
 print("DEBUG: pandas imported")
-import pandas_ta_classic as ta
-print("DEBUG: pandas_ta imported")
 import plotly.graph_objects as go
 print("DEBUG: plotly imported")
 import numpy as np
 print("DEBUG: numpy imported")
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-print("DEBUG: sklearn imported")
 import penny_loader
 from penny_loader import get_penny_stocks, get_penny_sectors, get_random_tickers
 print("DEBUG: penny_loader imported")
@@ -31,8 +26,17 @@ print("DEBUG: All imports done")
 # --- MOCK DATA ---
 # Since fetching thousands of penny stocks live is slow, we use cache or live loader
 import os
+import sys
 from dotenv import load_dotenv
 
+# Shared API services (local bar store) live under api/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+from services.bar_store import get_history, get_ticker_history
+from services.price_panel import load_panel
+from services.indicators import add_indicators
+from services.predictor import predict_frames
+from services.screen import run_screen, PENNY_SCAN_SCREEN
+
 load_dotenv(dotenv_path='api/.env')
 
 import warnings
@@ -94,20 +98,21 @@ def load_universe():
 
 # Separate function for uncached live retrieval
 def get_stock_data_live(ticker):
-    return get_stock_data_impl(ticker)
+    # Always re-request the forming bar from the store
+    return get_stock_data_impl(ticker, refresh_minutes=0)
 
 # Cached function for historical analysis
 @st.cache_data(ttl=600)
 def get_stock_data_cached(ticker):
     return get_stock_data_impl(ticker)
 
-def get_stock_data_impl(ticker):
+def get_stock_data_impl(ticker, refresh_minutes=None):
     try:
         # Get data for 6 months for sufficient training data
         stock = yf.Ticker(ticker)
-        # Verify if we get data, handle potential yfinance errors
+        # Served from the local bar store; only missing bars hit yfinance
         try:
-            df = stock.history(period="6mo")
+            df = get_ticker_history(ticker, period="6mo", refresh_minutes=refresh_minutes)
         except Exception:
             return None, None
         
@@ -144,42 +149,8 @@ def rapid_screen_batch(tickers):
     Returns list of dicts: {'ticker': symbol, 'vol': volume}
     """
     try:
-        # Increased thread count for larger batches
-        data = yf.download(tickers, period="5d", group_by='ticker', threads=True, progress=False)
-        passed = []
-        
-        if len(tickers) == 1:
-             try:
-                latest = data.iloc[-1]
-                # Check for single-level columns if download returns series/dataframe differing structure
-                # But typically with group_by='ticker'... wait, for single ticker it might not group.
-                # data might be just a DF.
-                if len(data) > 0:
-                   p = float(latest['Close'])
-                   v = float(latest['Volume'])
-                   if p < 5.0 and v > 20000:
-                       passed.append({'ticker': tickers[0], 'vol': v})
-             except: pass
-             return passed
-             
-        for ticker in tickers:
-            try:
-                if ticker not in data.columns.levels[0]: continue
-                
-                df = data[ticker]
-                if df.empty: continue
-                
-                latest = df.iloc[-1]
-                if pd.isna(latest['Close']) or pd.isna(latest['Volume']): continue
-                
-                p = float(latest['Close'])
-                v = float(latest['Volume'])
-                
-                if p < 5.0 and v > 20000:
-                    passed.append({'ticker': ticker, 'vol': v})
-            except:
-                continue
-        return passed
+        panel = load_panel(tickers, period="5d")
+        return [{'ticker': s['ticker'], 'vol': s['Volume']} for s in run_screen(panel, PENNY_SCAN_SCREEN)]
     except:
         return []
 
@@ -192,14 +163,9 @@ def analyze_penny(ticker, df, profit_margin, market_progress=1.0):
         except: pass
 
     # 1. Technical Indicators
+    # RSI, SMA 20/50, Bollinger Bands and Volume SMA in one batched pass
     try:
-        df.ta.rsi(length=14, append=True)
-        df.ta.sma(length=20, append=True)
-        df.ta.sma(length=50, append=True)
-        df.ta.bbands(length=20, std=2, append=True) # Bollinger Bands
-        
-        # Volume SMA
-        df['Vol_SMA_20'] = df['Volume'].rolling(20).mean()
+        df = add_indicators({ticker: df})[ticker]
     except:
         return None
 
@@ -218,21 +184,9 @@ def analyze_penny(ticker, df, profit_margin, market_progress=1.0):
     
     # 2. Predictive Model (Linear Regression)
     try:
-        data = df.copy()
-        data['Target'] = data['Close'].shift(-1)
-        data = data.dropna()
-        
-        feature_cols = ['Open', 'High', 'Low', 'Volume']
-        if 'RSI_14' in data.columns: feature_cols.append('RSI_14')
-        
-        X = data[feature_cols]
-        y = data['Target']
-        
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        latest_features = latest[feature_cols].values.reshape(1, -1)
-        predicted_price = model.predict(latest_features)[0]
+        predicted_price = predict_frames({ticker: df})[ticker]['predicted']
+        if not np.isfinite(predicted_price):
+            predicted_price = 0
     except Exception:
         predicted_price = 0
         
@@ -592,13 +546,13 @@ with tab_backtest:
                 st.info(f"Analyzing Batch: {offset} to {offset + len(current_batch_tickers)} ({len(all_target_tickers)} total)")
                 
                 # OPTIMIZED: Batch Download History
-                with st.spinner(f"Phase 1/2: Downloading history for {len(current_batch_tickers)} tickers..."):
+                with st.spinner(f"Phase 1/2: Loading history for {len(current_batch_tickers)} tickers..."):
                     try:
-                        # Fetch 6 months of data for all
-                        batch_data = yf.download(current_batch_tickers, period="6mo", group_by='ticker', threads=True, progress=False)
+                        # 6 months of data for all, from the local bar store
+                        batch_history = get_history(current_batch_tickers, period="6mo")
                     except Exception as e:
-                        st.error(f"YFinance Batch Download Error: {e}")
-                        batch_data = None
+                        st.error(f"Bar Store Load Error: {e}")
+                        batch_history = {}
 
                 # Phase 2: Analyze
                 bt_results = st.session_state.get('bt_results', [])
@@ -610,15 +564,7 @@ with tab_backtest:
                 for i, ticker in enumerate(current_batch_tickers):
                     status_bt.text(f"Analyzing {ticker}...")
                     
-                    # Extract single DF from batch
-                    ticker_df = None
-                    if batch_data is not None:
-                        try:
-                            if len(current_batch_tickers) == 1:
-                                ticker_df = batch_data
-                            else:
-                                ticker_df = batch_data[ticker]
-                        except: pass
+                    ticker_df = batch_history.get(ticker)
                     
                     res = get_backtest_performance(ticker, bt_date, pre_fetched_df=ticker_df)
                     if res and res['score'] >= confidence_thresh:
@@ -8,7 +8,6 @@ from datetime import datetime, timedelta
 sys.path.append(os.path.join(os.getcwd(), 'api'))
 
 import yfinance as yf
-from services.penny_service import _deep_analyze
 
 def run_backtest(ticker, target_date, timeline=False):
     print(f"--- Historical Backtest: {ticker} ---")
@@ -41,33 +40,21 @@ def run_backtest(ticker, target_date, timeline=False):
         idx = df.index.get_loc(target_ts)
         start_idx = max(0, idx - 20)
         
+        # Every bar's signals in one vectorized pass (same logic as the live checks)
+        from services.signals import signal_timeline
+        timeline_signals = signal_timeline(df.iloc[:idx + 1])
+
         results = []
         for i in range(start_idx, idx + 1):
-            current_date = df.index[i]
-            sub_df = df.iloc[:i+1]
-            
-            # Use the existing _deep_analyze logic (we need to bypass some API calls for speed in tests)
-            # Actually, _deep_analyze takes a ticker and hits YF itself.
-            # To backtest correctly, we'd need to mock YF or modify _deep_analyze.
-            # For this tool, we will run the core signal logic directly.
-            
-            from services.signals import detect_momentum_velocity, check_structure_liquidity, check_wyckoff_spring
-            
-            signals_data = []
-            
-            vel = detect_momentum_velocity(sub_df)
-            if vel: signals_data.extend(vel['signals'])
-            
-            liq = check_structure_liquidity(sub_df)
-            if liq: signals_data.extend(liq['signals'])
-            
+            row = timeline_signals.iloc[i]
+            signals_data = row['velocity'] + row['liquidity']
             if signals_data:
                 results.append({
-                    "Date": current_date.date(),
-                    "Price": round(sub_df.iloc[-1]['Close'], 2),
+                    "Date": df.index[i].date(),
+                    "Price": round(df.iloc[i]['Close'], 2),
                     "Signals": ", ".join(signals_data)
                 })
-        
+
         if results:
             timeline_df = pd.DataFrame(results)
             print("\nSignal Evolution Timeline:")
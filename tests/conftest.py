@@ -0,0 +1,22 @@
+import sys
+import os
+import pytest
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    """Tests that don't install their own cache backends get a throwaway SQLite file."""
+    from services import cache_service
+    monkeypatch.setattr(cache_service, "CACHE_BACKENDS", "sqlite")
+    monkeypatch.setattr(cache_service, "CACHE_SQLITE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache_service, "_backends", None)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_headline_store(tmp_path, monkeypatch):
+    from services import headline_store
+    monkeypatch.setattr(headline_store, "NEWS_STORE_PATH", str(tmp_path / "news.sqlite3"))
+    monkeypatch.setattr(headline_store, "_store", None)
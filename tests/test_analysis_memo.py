@@ -0,0 +1,183 @@
+import sys
+import os
+import time
+import threading
+import pytest
+import numpy as np
+import pandas as pd
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import cache_service, penny_service, scan_jobs
+from services.cache_backends import MemoryBackend
+from services.cache_codec import encode
+from services.cache_service import _LocalCache
+
+
+def _history(n=60, start="2026-01-05"):
+    rng = np.random.default_rng(9)
+    closes = np.abs(np.cumsum(rng.normal(0, 0.05, n)) + 3)
+    return pd.DataFrame({
+        'Open': closes, 'High': closes + 0.1, 'Low': closes - 0.1, 'Close': closes,
+        'Volume': rng.uniform(1e4, 5e6, n),
+    }, index=pd.bdate_range(start, periods=n))
+
+
+class _FakeTicker:
+    calls = 0
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        _FakeTicker.calls += 1
+        return {"profitMargins": 0.1, "marketCap": 5e7}
+
+
+def test_callers_share_one_analysis_per_bar(monkeypatch):
+    import yfinance
+    monkeypatch.setattr(cache_service, "_backends", [MemoryBackend()])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    monkeypatch.setattr(yfinance, "Ticker", _FakeTicker)
+    monkeypatch.setattr(penny_service, "update_models", lambda frames, final_through: {t: {} for t in frames})
+
+    analyzed = []
+    real = penny_service._deep_analyze
+
+    def counting(ticker, *args, **kwargs):
+        analyzed.append(ticker)
+        return real(ticker, *args, **kwargs)
+
+    monkeypatch.setattr(penny_service, "_deep_analyze", counting)
+
+    histories = {"AAA": _history(), "BBB": _history(), "SHORT": _history(10)}
+    first = penny_service.analyze_many(histories, 1.0)
+    assert sorted(first) == ["AAA", "BBB"]
+    assert sorted(analyzed) == ["AAA", "BBB"] and _FakeTicker.calls == 2
+
+    # Another caller on the same bars: served from the memo, no .info or analysis
+    assert penny_service.analyze_many({"AAA": _history()}, 1.0) == {"AAA": first["AAA"]}
+    assert len(analyzed) == 2 and _FakeTicker.calls == 2
+
+    # A new bar is a different key
+    penny_service.analyze_many({"AAA": _history(61)}, 1.0)
+    assert analyzed == ["AAA", "BBB", "AAA"]
+    assert penny_service._analysis_key("AAA", _history(), True) != penny_service._analysis_key("AAA", _history(), False)
+
+
+def test_scan_job_streams_results_then_replays_snapshot(monkeypatch):
+    import yfinance
+    monkeypatch.setattr(cache_service, "_backends", [MemoryBackend()])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(4 * 1024 * 1024, 60))
+    monkeypatch.setattr(yfinance, "Ticker", _FakeTicker)
+    monkeypatch.setattr(penny_service, "update_models", lambda frames, final_through: {t: {} for t in frames})
+    tickers = [f"T{i}" for i in range(7)]
+    release = threading.Event()
+    monkeypatch.setattr(penny_service, "get_universe", lambda: release.wait(5) and tickers)
+    monkeypatch.setattr(penny_service, "load_panel", lambda universe, period: None)
+    monkeypatch.setattr(penny_service, "run_screen", lambda panel, spec: [{"ticker": t} for t in tickers])
+    monkeypatch.setattr(penny_service, "get_history", lambda ts, period: {t: _history() for t in ts})
+    monkeypatch.setattr(penny_service, "SCAN_CHUNK_SIZE", 3)
+
+    # Two clients starting the same scan share one job
+    job = scan_jobs.start_job("full")
+    assert scan_jobs.start_job("full")["id"] == job["id"]
+    release.set()
+
+    events = list(scan_jobs.iter_job_events(job["id"], top_n=2))
+    kinds = [e["type"] for e in events]
+    assert kinds[0] == "start" and events[0]["total"] == 7
+    assert kinds.count("result") == 7 and kinds.count("progress") == kinds.count("top") >= 1
+    assert len(events[-2]["data"]) == 2 and kinds[-1] == "done"
+    results = [e["data"] for e in events if e["type"] == "result"]
+    assert scan_jobs.get_job(job["id"], cursor=5)["data"] == results[5:]
+    assert scan_jobs.get_job(job["id"])["state"] == "done"
+
+    # The published record holds counters only; results went out once each, as append-only parts
+    record = cache_service.CacheService.get(f"scan_job_{job['id']}", bypass_l1=True)
+    assert "results" not in record and record["count"] == 7 and 1 <= record["parts"] <= 3
+    # Another worker follows the job from what was published (once the runner has wrapped up)
+    scan_jobs._job_pool.submit(lambda: None).result()
+    monkeypatch.delitem(scan_jobs._jobs, job["id"])
+    remote = scan_jobs.get_job(job["id"], cursor=5)
+    assert remote["data"] == results[5:] and remote["nextCursor"] == 7 and "parts" not in remote
+
+    # A fresh snapshot now exists: the next job is done at once, and the paged scan reads it too
+    analyzed = _FakeTicker.calls
+    replay = list(scan_jobs.iter_job_events(scan_jobs.start_job("full")["id"]))
+    assert [e["type"] for e in replay].count("result") == 7 and replay[-1]["version"] == events[-1]["version"]
+    assert len(penny_service.run_full_scan(limit=5)) == 5
+    assert _FakeTicker.calls == analyzed
+
+
+def test_start_job_reads_the_backend_outside_the_job_lock(monkeypatch):
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_remote(kind):
+        entered.set()
+        release.wait(5)
+        return {"id": "remote", "state": "analyzing"}
+
+    monkeypatch.setattr(scan_jobs, "_live_remote_job", slow_remote)
+    starter = threading.Thread(target=scan_jobs.start_job, args=("full",))
+    starter.start()
+    assert entered.wait(5)
+    # Other job calls aren't held up by the slow backend read
+    assert scan_jobs._lock.acquire(timeout=1)
+    scan_jobs._lock.release()
+    release.set()
+    starter.join()
+
+
+def test_pro_analysis_on_pending_news_is_not_memoized(monkeypatch):
+    import yfinance
+    from services.news_service import NewsService
+    monkeypatch.setattr(cache_service, "_backends", [MemoryBackend()])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    monkeypatch.setattr(yfinance, "Ticker", _FakeTicker)
+    monkeypatch.setattr(penny_service, "update_models", lambda frames, final_through: {t: {} for t in frames})
+
+    news = {"AAA": {**NewsService._pending("AAA")}}
+    fetches = []
+    monkeypatch.setattr(NewsService, "enrich_sentiment",
+                        staticmethod(lambda tickers: fetches.append(tickers) or {t: news[t] for t in tickers}))
+
+    first = penny_service.analyze_many({"AAA": _history()}, 1.0, is_pro=True)["AAA"]
+    assert first["newsSentiment"]["pending"] and "still being gathered" in first["reasoning"]
+
+    # The news lands; the next call analyzes again instead of replaying the pending result
+    news["AAA"] = {"ticker": "AAA", "sentiment": "Bullish", "sentimentScore": 3, "outlook": "Strong news flow."}
+    second = penny_service.analyze_many({"AAA": _history()}, 1.0, is_pro=True)["AAA"]
+    assert second["newsSentiment"]["sentiment"] == "Bullish" and "Strong news flow." in second["reasoning"]
+    # ... and that one is memoized
+    assert penny_service.analyze_many({"AAA": _history()}, 1.0, is_pro=True)["AAA"] == second
+    assert len(fetches) == 2
+
+
+def test_finished_jobs_purge_expired_job_rows(monkeypatch):
+    backend = MemoryBackend()
+    monkeypatch.setattr(cache_service, "_backends", [backend])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    expired = time.time() - (scan_jobs.SCAN_JOB_TTL_MINUTES + 1) * 60
+    backend.write_many({"scan_job_old": (encode({}), expired), "scan_job_old_part_0": (encode([]), expired)})
+
+    def tiny_scan():
+        yield {"type": "start", "total": 1}
+        yield {"type": "result", "data": {"ticker": "AAA", "isProfitable": True, "upside": 1.0}}
+        yield {"type": "progress", "done": 1, "total": 1}
+
+    # The job runs its kind's runner and publishes that kind's snapshot
+    monkeypatch.setattr(penny_service, "iter_full_scan", tiny_scan)
+    job = scan_jobs.start_job("full")
+    events = list(scan_jobs.iter_job_events(job["id"]))
+    assert events[-1]["type"] == "done" and events[-1]["count"] == 1
+    assert cache_service.CacheService.get("snapshot_full_scan")["items"][0]["ticker"] == "AAA"
+
+    scan_jobs._job_pool.submit(lambda: None).result()
+    assert "scan_job_old" not in backend.rows and "scan_job_old_part_0" not in backend.rows
+    assert f"scan_job_{job['id']}" in backend.rows
+
+    with pytest.raises(ValueError):
+        scan_jobs.start_job("nope")
@@ -0,0 +1,75 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import analysis_pool, penny_service
+from services.indicators import add_indicators
+
+
+def _history(n=80, seed=3):
+    rng = np.random.default_rng(seed)
+    closes = np.abs(np.cumsum(rng.normal(0, 0.05, n)) + 3)
+    df = pd.DataFrame({
+        'Open': closes, 'High': closes + 0.1, 'Low': closes - 0.1, 'Close': closes,
+        'Volume': rng.uniform(1e4, 5e6, n),
+    }, index=pd.bdate_range("2026-01-05", periods=n))
+    return add_indicators({'AAA': df})['AAA']
+
+
+INFO = {"profitMargins": 0.12, "marketCap": 4e7, "sector": "Tech", "longBusinessSummary": "x" * 5000}
+MODEL = {"predicted": 3.3, "r2": 0.4, "n_obs": 60}
+
+
+def test_payload_round_trip_is_compact():
+    df = _history()
+    payload = analysis_pool.make_payload("AAA", df, INFO, MODEL, 1.0)
+    pd.testing.assert_frame_equal(analysis_pool.unpack_history(payload["history"]), df, check_freq=False)
+    assert "longBusinessSummary" not in payload["info"]
+    assert payload["history"]["values"].dtype == np.float64
+
+
+def test_worker_process_matches_in_thread_analysis(monkeypatch):
+    fallbacks = []
+    monkeypatch.setattr(penny_service, "_analyze_miss", lambda *args: fallbacks.append(args))
+    df = _history()
+    expected = penny_service._deep_analyze("AAA", 1.0, pre_df=df.copy(), pre_info=INFO, pre_model=MODEL)
+
+    monkeypatch.setattr(analysis_pool, "ANALYSIS_PROCESSES", 1)
+    try:
+        batch = {"is_pro": False, "misses": {"AAA": df}, "infos": {"AAA": INFO}, "models": {"AAA": MODEL},
+                 "results": {}, "keys": {"AAA": "k"}}
+        out = dict(penny_service._iter_analyze_misses(batch, 1.0))
+    finally:
+        analysis_pool.shutdown()
+
+    assert not fallbacks
+    assert out["AAA"] == expected
+    assert batch["fresh"] == {"k": expected}
+
+
+def test_failed_info_prefetch_is_not_fetched_again(monkeypatch):
+    import yfinance
+    fetched = []
+
+    class CountingTicker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        @property
+        def info(self):
+            fetched.append(self.ticker)
+            return INFO
+
+    monkeypatch.setattr(yfinance, "Ticker", CountingTicker)
+    # fetch_infos maps a failed .info to {}: analysis runs without fundamentals
+    res = penny_service._deep_analyze("AAA", 1.0, pre_df=_history(), pre_info={}, pre_model=MODEL)
+    assert fetched == []
+    assert res["marketCap"] == 0 and res["sector"] == "Unknown"
+
+    # The pool payload keeps "fetched, empty" apart from "not prefetched"
+    assert analysis_pool.make_payload("AAA", _history(), {}, MODEL, 1.0)["info"] == {}
+    assert analysis_pool.make_payload("AAA", _history(), None, MODEL, 1.0)["info"] is None
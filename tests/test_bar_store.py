@@ -0,0 +1,52 @@
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import bar_store
+
+
+def _fake_download(calls, dates):
+    """Stands in for yf.download(group_by="ticker") over a fixed calendar."""
+    def download(tickers, timeout=20, period=None, start=None):
+        calls.append({"tickers": list(tickers), "period": period, "start": start})
+        idx = dates if start is None else dates[dates >= pd.Timestamp(start)]
+        frames = {}
+        for t in tickers:
+            base = float(len(t))
+            frames[t] = pd.DataFrame({
+                "Open": base, "High": base + 1, "Low": base - 1,
+                "Close": base + np.arange(len(idx)) / 100, "Volume": 1000.0,
+            }, index=idx)
+        return pd.concat(frames, axis=1)
+    return download
+
+
+def test_seed_then_incremental_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", str(tmp_path))
+    dates = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=120)
+    calls = []
+    monkeypatch.setattr(bar_store, "_download", _fake_download(calls, dates[:-2]))
+
+    first = bar_store.get_history(["AAA", "BB"], period="6mo")
+    assert set(first) == {"AAA", "BB"}
+    assert len(first["AAA"]) == 118
+    assert calls[0]["period"] == "6mo" and calls[0]["start"] is None
+
+    # Fresh tails are served without touching upstream
+    calls.clear()
+    bar_store.get_history(["AAA", "BB"], period="6mo")
+    assert calls == []
+
+    # Two new sessions land: only the tail since the last stored date is requested
+    monkeypatch.setattr(bar_store, "_download", _fake_download(calls, dates))
+    updated = bar_store.get_history(["AAA"], period="6mo", refresh_minutes=0)
+    assert len(calls) == 1
+    assert calls[0]["start"] == dates[-3].strftime("%Y-%m-%d")
+    assert len(updated["AAA"]) == 120
+    assert updated["AAA"].index.is_unique
+
+    assert len(bar_store.get_history(["AAA"], period="5d")["AAA"]) == 5
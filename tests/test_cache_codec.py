@@ -0,0 +1,53 @@
+import sys
+import os
+import json
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import cache_codec
+from services.cache_codec import decode, encode, from_envelope, to_envelope
+
+
+def _scan_payload(n=500):
+    """Shaped like a full_scan_* row: result dicts with a 60-point price history."""
+    return [{
+        "ticker": f"T{i:04d}", "price": 1.2345 + i / 1000, "predicted": 1.3, "upside": 5.3,
+        "isProfitable": i % 2 == 0, "signals": ["Above 20-SMA", "High Volume (1.8x)"],
+        "reasoning": "Moderate potential identified; monitoring for confirmation signals.",
+        "priceHistory": [{"date": f"2026-01-{d % 28 + 1:02d}", "close": round(1 + d / 100, 2)} for d in range(60)],
+    } for i in range(n)]
+
+
+def test_round_trip_both_codecs(monkeypatch):
+    value = _scan_payload(20)
+    blob = encode(value)
+    assert blob[:2] == b"MC" and blob[2] == cache_codec.FORMAT_VERSION
+    assert decode(blob) == value
+
+    # The JSON + zlib fallback writes blobs any reader can still decode
+    monkeypatch.setattr(cache_codec, "_HAS_MSGPACK_ZSTD", False)
+    fallback = encode(value)
+    assert fallback[3] == cache_codec.CODEC_JSON_ZLIB
+    assert decode(fallback) == value
+
+
+def test_envelope_and_size():
+    value = _scan_payload()
+    blob = encode(value)
+    envelope = to_envelope(blob)
+    assert from_envelope(json.loads(json.dumps(envelope))) == value
+    # Legacy plain-JSON rows pass through untouched
+    assert from_envelope(value) == value
+
+    raw = len(json.dumps(value))
+    assert len(json.dumps(envelope)) * 4 < raw
+
+
+def test_non_string_keys_round_trip_like_json(monkeypatch):
+    value = {1: "a", "nested": [{2.5: True, None: 0, True: [1]}], "plain": {"x": 1}}
+    as_json = json.loads(json.dumps(value))
+    assert decode(encode(value)) == as_json
+
+    monkeypatch.setattr(cache_codec, "_HAS_MSGPACK_ZSTD", False)
+    assert decode(encode(value)) == as_json
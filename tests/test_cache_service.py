@@ -0,0 +1,217 @@
+import sys
+import os
+import time
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import cache_service
+from services.cache_backends import MemoryBackend, SQLiteBackend, SupabaseBackend
+from services.cache_codec import encode
+from services.cache_service import CacheService, _LocalCache
+
+
+class _FakeTable:
+    """Minimal stand-in for supabase.table("cache") that counts round trips."""
+
+    def __init__(self):
+        self.rows = {}
+        self.selects = 0
+        self.upserts = 0
+        self._keys = None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, _column, key):
+        self._keys = [key]
+        return self
+
+    def in_(self, _column, keys):
+        self._keys = list(keys)
+        return self
+
+    def upsert(self, data):
+        self.upserts += 1
+        for row in data if isinstance(data, list) else [data]:
+            self.rows[row["key"]] = row
+        self._keys = None
+        return self
+
+    def execute(self):
+        if self._keys is None:
+            return type("R", (), {"data": []})()
+        self.selects += 1
+        rows = [self.rows[k] for k in self._keys if k in self.rows]
+        return type("R", (), {"data": rows})()
+
+
+class _FakeClient:
+    def __init__(self):
+        self.cache = _FakeTable()
+
+    def table(self, _name):
+        return self.cache
+
+
+def test_hot_keys_skip_supabase(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(cache_service, "_backends", [SupabaseBackend(client)])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+
+    CacheService.set("market_overview", {"indices": [1, 2, 3]})
+    for _ in range(5):
+        assert CacheService.get("market_overview", max_age_minutes=5) == {"indices": [1, 2, 3]}
+    assert client.cache.selects == 0
+
+    # Returned values are copies
+    CacheService.get("market_overview")["indices"].append(4)
+    assert CacheService.get("market_overview") == {"indices": [1, 2, 3]}
+
+    # Cold process: first read goes to L2, the rest are L1 hits
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    assert CacheService.get("market_overview") == {"indices": [1, 2, 3]}
+    assert CacheService.get("market_overview") == {"indices": [1, 2, 3]}
+    assert client.cache.selects == 1
+    stats = CacheService.stats()
+    assert stats["hits"] == 1 and stats["l2_hits"] == 1
+
+
+def test_ttl_uses_data_age_and_lru_bound():
+    l1 = _LocalCache(max_bytes=100, ttl_seconds=60)
+    l1.put("old", [1], written_at=time.time() - 600)
+    assert l1.get("old", max_age_seconds=300) == (False, None)
+    assert l1.get("old") == (True, [1])  # get_stale ignores data age
+
+    for i in range(10):
+        l1.put(f"k{i}", "x" * 20)
+        l1.get("k0")  # keep k0 hot
+    assert l1.stats()["bytes"] <= 100
+    assert l1.get("k0")[0] and l1.get("k9")[0]
+    assert not l1.get("k1")[0]
+    assert l1.stats()["evictions"] > 0
+
+
+def test_get_or_compute_single_flight_and_stale(monkeypatch):
+    import threading
+    monkeypatch.setattr(cache_service, "_backends", [MemoryBackend()])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 3600))
+
+    calls = []
+    release = threading.Event()
+
+    def slow_scan():
+        calls.append(1)
+        release.wait(5)
+        return [{"ticker": "AAA", "run": len(calls)}]
+
+    # Cold key: concurrent callers share one computation
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        CacheService.get_or_compute("full_scan_10", slow_scan, ttl_minutes=60))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert results == [[{"ticker": "AAA", "run": 1}]] * 8
+
+    # Expired but within stale window: old value now, one background refresh
+    cache_service._l1.put("full_scan_10", [{"ticker": "AAA", "run": 1}], written_at=time.time() - 2 * 3600)
+    release.clear()
+    for _ in range(5):
+        assert CacheService.get_or_compute("full_scan_10", slow_scan, ttl_minutes=60, stale_minutes=360) == [{"ticker": "AAA", "run": 1}]
+    release.set()
+    for _ in range(50):
+        if not cache_service._inflight:
+            break
+        time.sleep(0.05)
+    assert len(calls) == 2
+    assert CacheService.get_or_compute("full_scan_10", slow_scan, ttl_minutes=60) == [{"ticker": "AAA", "run": 2}]
+
+
+def test_local_tier_in_front_of_shared_tier(tmp_path, monkeypatch):
+    client = _FakeClient()
+    local = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache_service, "_backends", [local, SupabaseBackend(client)])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+
+    # Another node wrote the shared tier; first read back-fills the local file
+    SupabaseBackend(client).write("news_intelligence", encode([{"ticker": "AAA"}]), time.time())
+    assert CacheService.get("news_intelligence", max_age_minutes=60) == [{"ticker": "AAA"}]
+    assert local.read("news_intelligence")[0] == [{"ticker": "AAA"}]
+
+    # Fresh process on the same node: served from SQLite without touching Supabase
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    selects = client.cache.selects
+    assert CacheService.get("news_intelligence", max_age_minutes=60) == [{"ticker": "AAA"}]
+    assert client.cache.selects == selects
+
+    # An expired local row falls through to a newer shared row
+    local.write("news_intelligence", encode([{"ticker": "OLD"}]), time.time() - 7200)
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    assert CacheService.get("news_intelligence", max_age_minutes=60) == [{"ticker": "AAA"}]
+    assert local.read("news_intelligence")[0] == [{"ticker": "AAA"}]
+    assert CacheService.stats()["backends"] == ["sqlite", "supabase"]
+
+
+def test_get_many_and_set_many_batch_round_trips(tmp_path, monkeypatch):
+    client = _FakeClient()
+    local = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache_service, "_backends", [local, SupabaseBackend(client)])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+
+    values = {f"news_T{i}": {"ticker": f"T{i}", "score": i} for i in range(250)}
+    CacheService.set_many(values)
+    assert client.cache.upserts == 3  # 100-key chunks
+
+    # Cold process, local tier lost: one chunked in-filter per 100 keys
+    monkeypatch.setattr(cache_service, "_backends", [SQLiteBackend(str(tmp_path / "fresh.sqlite3")), SupabaseBackend(client)])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    keys = list(values) + ["news_missing"]
+    got = CacheService.get_many(keys, max_age_minutes=30)
+    assert got == values
+    assert client.cache.selects == 3
+
+    # Hits now come from L1 / the back-filled local tier; only the missing key goes remote
+    assert CacheService.get_many(keys, max_age_minutes=30) == values
+    assert client.cache.selects == 4
+    assert len(cache_service._backends[0].read_many(keys)) == 250
+
+
+def test_backends_open_lazily(tmp_path, monkeypatch):
+    path = tmp_path / "lazy" / "cache.sqlite3"
+    monkeypatch.setattr(cache_service, "CACHE_SQLITE_PATH", str(path))
+
+    # Nothing is created until the cache is first used
+    assert cache_service._backends is None and not path.exists()
+    CacheService.set("lazy_key", {"v": 1})
+    assert path.exists()
+    assert [b.name for b in cache_service._backends] == ["sqlite"]
+
+
+def test_data_paths_anchor_to_api_root(monkeypatch):
+    from core.paths import API_ROOT, data_path
+    monkeypatch.delenv("CACHE_SQLITE_PATH", raising=False)
+    assert data_path("CACHE_SQLITE_PATH", "cache.sqlite3") == os.path.join(API_ROOT, "data", "cache.sqlite3")
+    monkeypatch.setenv("CACHE_SQLITE_PATH", "elsewhere/c.sqlite3")
+    assert data_path("CACHE_SQLITE_PATH", "cache.sqlite3") == os.path.join(API_ROOT, "elsewhere", "c.sqlite3")
+    monkeypatch.setenv("CACHE_SQLITE_PATH", "/tmp/c.sqlite3")
+    assert data_path("CACHE_SQLITE_PATH", "cache.sqlite3") == "/tmp/c.sqlite3"
+
+
+def test_purge_deletes_old_rows_under_an_exact_prefix(tmp_path, monkeypatch):
+    sqlite = SQLiteBackend(str(tmp_path / "purge.sqlite3"))
+    monkeypatch.setattr(cache_service, "_backends", [sqlite])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+
+    old = time.time() - 3600
+    # "_" is a LIKE wildcard: snapshotXa@1 must survive a purge of snapshot_a@
+    sqlite.write_many({k: (encode(1), old) for k in ["snapshot_a@1", "snapshotXa@1", "snapshot_b@1"]})
+    CacheService.set("snapshot_a@2", 2)
+
+    CacheService.purge("snapshot_a@", max_age_minutes=30)
+    assert sorted(sqlite.read_many(["snapshot_a@1", "snapshotXa@1", "snapshot_b@1", "snapshot_a@2"])) == [
+        "snapshotXa@1", "snapshot_a@2", "snapshot_b@1"]
@@ -0,0 +1,98 @@
+import sys
+import os
+import asyncio
+import threading
+import pytest
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from core.executors import BoundedExecutor, ExecutorOverloaded
+
+
+def test_overload_is_refused_with_retry_after():
+    gate = threading.Event()
+    pool = BoundedExecutor("t", workers=1, queue=1, retry_after=7)
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(gate.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorOverloaded) as err:
+            await pool.run(lambda: None)
+        assert err.value.status_code == 429 and err.value.headers["Retry-After"] == "7"
+        gate.set()
+        await asyncio.gather(*running)
+        # Capacity is returned once the calls finish
+        assert await pool.run(lambda x: x * 2, 21) == 42
+
+    asyncio.run(scenario())
+    assert pool.stats()["rejected"] == 1 and pool.stats()["inFlight"] == 0
+
+
+def test_bulk_yields_to_waiting_interactive_work():
+    gate = threading.Event()
+    interactive = BoundedExecutor("interactive", workers=1, queue=4, retry_after=1)
+    bulk = BoundedExecutor("bulk", workers=2, queue=2, retry_after=30, yields_to=[interactive])
+
+    async def scenario():
+        # One lookup running, one waiting for a thread
+        held = [asyncio.ensure_future(interactive.run(gate.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert interactive.waiting() == 1
+        with pytest.raises(ExecutorOverloaded):
+            bulk.reserve()
+        with pytest.raises(ExecutorOverloaded):
+            await bulk.run(lambda: None)
+        gate.set()
+        await asyncio.gather(*held)
+        assert await bulk.run(lambda: "scan") == "scan"
+
+    asyncio.run(scenario())
+
+
+def test_reserved_slot_is_kept_for_run_or_released():
+    pool = BoundedExecutor("t", workers=1, queue=0, retry_after=3)
+    spent = []
+
+    async def scenario():
+        async with pool.reserve() as slot:
+            # While held, the slot can't be taken by anyone else
+            with pytest.raises(ExecutorOverloaded):
+                pool.reserve()
+            spent.append("trial")
+            assert await slot.run(lambda: "scan") == "scan"
+            with pytest.raises(RuntimeError):
+                await slot.run(lambda: None)
+
+        # A block that fails before running gives the slot back
+        with pytest.raises(ValueError):
+            async with pool.reserve():
+                raise ValueError("trial refused")
+        assert pool.stats()["inFlight"] == 0
+
+    asyncio.run(scenario())
+    assert spent == ["trial"] and pool.stats()["rejected"] == 1
+
+
+def test_iterate_steps_on_the_executor_and_waits_out_overload():
+    gate = threading.Event()
+    pool = BoundedExecutor("t", workers=1, queue=0, retry_after=0.05)
+    threads = []
+
+    def events():
+        for i in range(3):
+            threads.append(threading.current_thread().name)
+            yield i
+
+    async def scenario():
+        # The executor is full when the stream starts: its first step waits for the slot
+        blocker = asyncio.ensure_future(pool.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+        asyncio.get_running_loop().call_later(0.1, gate.set)
+        items = [i async for i in pool.iterate(events())]
+        await blocker
+        return items
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+    assert all(name.startswith("exec-t") for name in threads)
+    assert pool.stats()["rejected"] >= 1 and pool.stats()["inFlight"] == 0
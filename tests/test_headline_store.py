@@ -0,0 +1,76 @@
+import sys
+import os
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.headline_store import HeadlineStore, parse_article
+
+
+def _item(article_id, title, published):
+    # yfinance's nested layout
+    return {"id": article_id, "content": {"title": title, "pubDate": published,
+                                          "canonicalUrl": {"url": f"https://news.example/{article_id}"}}}
+
+
+class _Lexicon:
+    """Scores a title by its length; records what it was asked to score."""
+
+    def __init__(self, version="v1"):
+        self.version = version
+        self.scored = []
+
+    def score_many(self, titles):
+        self.scored.extend(titles)
+        return [len(t) for t in titles]
+
+
+def test_parse_article_layouts():
+    nested = parse_article(_item("a1", "Shares surge", "2026-10-16T14:00:00Z"))
+    assert nested["id"] == "a1" and nested["url"] == "https://news.example/a1"
+    assert nested["published_at"] == 1792159200.0
+
+    flat = parse_article({"uuid": "u1", "title": "Shares drop", "link": "https://x", "providerPublishTime": 5})
+    assert flat == {"id": "u1", "title": "Shares drop", "url": "https://x", "published_at": 5}
+
+    # No ID: keyed by a hash of the URL, so the same article dedupes across feeds
+    assert parse_article({"title": "T", "link": "https://y"})["id"] == parse_article({"title": "T2", "link": "https://y"})["id"]
+    assert parse_article({"content": {"title": ""}}) is None
+
+
+def test_only_new_articles_are_scored(tmp_path):
+    store = HeadlineStore(str(tmp_path / "news.sqlite3"))
+    lexicon = _Lexicon()
+
+    feed = [_item("a1", "First", "2026-10-16T14:00:00Z"), _item("a2", "Second!", "2026-10-16T15:00:00Z")]
+    assert store.add("AAA", feed, lexicon, now=1e9) == 2
+    # Same feed again, plus the same article seen for another ticker
+    assert store.add("AAA", feed + [_item("a3", "Third", "2026-10-16T16:00:00Z")], lexicon, now=1e9) == 1
+    assert store.add("BBB", feed[:1], lexicon, now=1e9) == 0
+    assert lexicon.scored == ["First", "Second!", "Third"]
+
+    recent = store.recent("AAA", limit=2)
+    assert [a["id"] for a in recent] == ["a3", "a2"] and [a["score"] for a in recent] == [5, 7]
+    assert [a["title"] for a in store.recent("BBB")] == ["First"]
+    assert store.recent("AAA", since=1792165000) == recent[:1]
+
+
+def test_prune_drops_old_articles(tmp_path):
+    store = HeadlineStore(str(tmp_path / "news.sqlite3"))
+    store.add("AAA", [{"id": "old", "title": "Old"}], _Lexicon(), now=100)
+    store.add("AAA", [{"id": "new", "title": "New"}], _Lexicon(), now=200)
+    store.prune(before=150)
+    assert [a["id"] for a in store.recent("AAA")] == ["new"]
+
+
+def test_scores_from_another_lexicon_version_are_recomputed(tmp_path):
+    store = HeadlineStore(str(tmp_path / "news.sqlite3"))
+    store.add("AAA", [{"id": "a1", "title": "Shares surge"}], _Lexicon("v1"), now=1e9)
+
+    updated = _Lexicon("v2")
+    updated.score_many = lambda titles: [7 for _ in titles]
+    assert [a["score"] for a in store.recent("AAA", lexicon=updated)] == [7]
+    # Rewritten: the current lexicon doesn't rescore it again
+    current = _Lexicon("v2")
+    assert [(a["score"], a["lexicon"]) for a in store.recent("AAA", lexicon=current)] == [(7, "v2")]
+    assert current.scored == []
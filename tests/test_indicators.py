@@ -0,0 +1,51 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pandas_ta_classic as ta
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.indicators import add_indicators
+
+
+def _frames():
+    rng = np.random.default_rng(3)
+    frames = {}
+    # Uneven histories exercise the right-aligned padding
+    for i, n in enumerate([125, 90, 40]):
+        closes = np.abs(np.cumsum(rng.normal(0, 0.1, n)) + 3)
+        frames[f"T{i}"] = pd.DataFrame({
+            'Open': closes, 'High': closes + 0.1, 'Low': closes - 0.1,
+            'Close': closes, 'Volume': rng.uniform(1e4, 1e6, n),
+        }, index=pd.bdate_range("2026-01-05", periods=n))
+    return frames
+
+
+def test_matches_pandas_ta():
+    frames = _frames()
+    batched = add_indicators(frames, sma_lengths=(20, 50), macd_cols=True)
+
+    for ticker, df in frames.items():
+        expected = df.copy()
+        expected.ta.rsi(length=14, append=True)
+        expected.ta.sma(length=20, append=True)
+        expected.ta.sma(length=50, append=True)
+        expected.ta.bbands(length=20, std=2, append=True)
+        expected.ta.macd(append=True)
+        expected['Vol_SMA_20'] = expected['Volume'].rolling(20).mean()
+
+        got = batched[ticker]
+        assert set(got.columns) == set(expected.columns)
+        for col in expected.columns:
+            np.testing.assert_allclose(got[col], expected[col], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=col)
+
+    # Too short for SMA_50: column left out, as pandas_ta does
+    assert 'SMA_50' not in batched['T2'].columns
+
+
+def test_inputs_untouched():
+    frames = _frames()
+    add_indicators(frames)
+    assert list(frames['T0'].columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
@@ -0,0 +1,87 @@
+import sys
+import time
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import bar_store, model_store
+from services.indicators import add_indicators
+from services.predictor import FEATURES, predict_frames
+
+
+def _history(n=140):
+    rng = np.random.default_rng(5)
+    closes = np.abs(np.cumsum(rng.normal(0, 0.05, n)) + 3)
+    opens = closes + rng.normal(0, 0.02, n)
+    df = pd.DataFrame({
+        'Open': opens,
+        'High': np.maximum(opens, closes) + rng.uniform(0, 0.05, n),
+        'Low': np.minimum(opens, closes) - rng.uniform(0, 0.05, n),
+        'Close': closes,
+        'Volume': rng.uniform(1e4, 5e6, n),
+    }, index=pd.bdate_range("2026-01-05", periods=n))
+    # Indicators on the full history so every prefix shares the same feature rows
+    return add_indicators({'AAA': df})['AAA']
+
+
+def test_incremental_matches_refit(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", str(tmp_path))
+    full = _history()
+
+    first = model_store.update_model('AAA', full.iloc[:120])
+    expected = predict_frames({'AAA': full.iloc[:120]})['AAA']
+    assert first['n_obs'] == expected['n_obs']
+    np.testing.assert_allclose(first['predicted'], expected['predicted'], rtol=1e-8)
+    np.testing.assert_allclose(first['r2'], expected['r2'], rtol=1e-6)
+
+    # Reloaded from disk, two more sessions folded in
+    assert os.path.exists(model_store._path('AAA'))
+    second = model_store.update_model('AAA', full.iloc[:122])
+    expected = predict_frames({'AAA': full.iloc[:122]})['AAA']
+    assert second['n_obs'] == first['n_obs'] + 2
+    np.testing.assert_allclose(second['predicted'], expected['predicted'], rtol=1e-8)
+
+
+def test_window_slides_and_partial_bar_held_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(model_store, "MODEL_WINDOW", 30)
+    full = _history()
+
+    model_store.update_model('AAA', full.iloc[:100])
+    # Today's close is still forming: the pair targeting it must wait
+    held = model_store.update_model('AAA', full.iloc[:110], final_through=full.index[108])
+    result = model_store.update_model('AAA', full.iloc[:110])
+    assert held['n_obs'] == result['n_obs'] == 30
+
+    # Same as a fresh lstsq over the last 30 pairs
+    window = full.iloc[:110].copy()
+    window['Target'] = window['Close'].shift(-1)
+    window = window.dropna().iloc[-30:]
+    X = np.c_[window[FEATURES].values, np.ones(len(window))]
+    theta = np.linalg.lstsq(X, window['Target'].values, rcond=None)[0]
+    expected = np.r_[full.iloc[109][FEATURES].values, 1.0] @ theta
+    np.testing.assert_allclose(result['predicted'], expected, rtol=1e-8)
+
+
+def test_concurrent_updates_fold_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", str(tmp_path))
+    full = _history()
+    model_store.update_model('AAA', full.iloc[:100])
+
+    # Concurrent scans of the same history: one folds the new bars, the rest
+    # find them already stored instead of racing on load → fold → save
+    saves = []
+    save = model_store.save_model
+    monkeypatch.setattr(model_store, "save_model", lambda t, m: (saves.append(t), time.sleep(0.01), save(t, m)))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: model_store.update_model('AAA', full.iloc[:130]), range(8)))
+
+    assert len(saves) == 1
+    expected = predict_frames({'AAA': full.iloc[:130]})['AAA']
+    for result in results:
+        np.testing.assert_allclose(result['predicted'], expected['predicted'], rtol=1e-8)
+    assert model_store.load_model('AAA').last_date == full.index.values[128]
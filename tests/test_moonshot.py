@@ -0,0 +1,56 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.moonshot_service import MoonshotService
+from services.price_panel import PricePanel
+
+
+def _frame(n, last_volume=1e5, last_jump=1.0, price=2.0):
+    close = np.full(n, price)
+    close[-1] *= last_jump
+    volume = np.full(n, 1e5)
+    volume[-1] = last_volume
+    return pd.DataFrame({
+        'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': volume,
+    }, index=pd.bdate_range("2026-03-02", periods=n))
+
+
+def test_prescreen_ranks_whole_universe_by_thrust():
+    panel = PricePanel.from_frames({
+        "FLAT": _frame(60),
+        "SURGE": _frame(60, last_volume=8e5, last_jump=1.3),
+        "VOLUME": _frame(60, last_volume=5e5),
+        "SHORT": _frame(20, last_volume=9e5, last_jump=1.5),
+        "PRICEY": _frame(60, last_volume=9e5, last_jump=1.5, price=40.0),
+    })
+    assert MoonshotService._prescreen(panel, 10) == ["SURGE", "VOLUME", "FLAT"]
+    assert MoonshotService._prescreen(panel, 1) == ["SURGE"]
+
+
+def test_scoring_rules():
+    records = [
+        {"ticker": "A", "marketCap": 5e7, "isProfitable": True, "score": 6, "price": 1.0, "yearHigh": 1.05,
+         "signals": ["Massive Volume (3.0x)", "Vertical Move", "High Velocity"]},
+        {"ticker": "B", "marketCap": 2e8, "isProfitable": False, "score": 2, "price": 1.0, "yearHigh": 3.0,
+         "signals": ["High Velocity"]},
+        {"ticker": "BIG", "marketCap": 9e8, "isProfitable": True, "score": 9, "price": 1.0, "yearHigh": 1.0,
+         "signals": []},
+    ]
+    infos = {"A": {"revenueGrowth": 0.8}, "B": {"revenueGrowth": 0.3}}
+
+    scored = {r["ticker"]: r for r in MoonshotService._score(records, infos)}
+    assert set(scored) == {"A", "B"}
+    # Growth 15 + 25 capped at 40; tech 15 + 15 + 15 + 10 capped at 30
+    assert scored["A"]["moonScore"] == 70
+    assert scored["A"]["moonReasoning"] == [
+        "Profitable micro-cap foundation", "Explosive Revenue Growth (80.0%)",
+        "Abnormal Institutional Accumulation", "Explosive Vertical Momentum Detected",
+        "Breaking 52-Week High Resistance",
+    ]
+    assert scored["B"]["moonScore"] == 15 + 10
+    assert scored["B"]["moonReasoning"] == ["Strong Revenue Growth (30.0%)", "Strong Velocity Breakout"]
@@ -0,0 +1,167 @@
+import sys
+import os
+import time
+import threading
+import pandas as pd
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import cache_service, headline_store, news_service
+from services.cache_backends import MemoryBackend
+from services.cache_service import _LocalCache
+from services.news_service import NewsService
+
+
+class _SlowTicker:
+    delays = {}
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    @property
+    def news(self):
+        with _SlowTicker.lock:
+            _SlowTicker.running += 1
+            _SlowTicker.peak = max(_SlowTicker.peak, _SlowTicker.running)
+        time.sleep(_SlowTicker.delays.get(self.ticker, 0.2))
+        with _SlowTicker.lock:
+            _SlowTicker.running -= 1
+        return [{"title": f"{self.ticker} shares surge on record growth"}]
+
+    def history(self, period="1d"):
+        return pd.DataFrame({"Open": [1.0], "Close": [1.1]})
+
+
+def _setup(monkeypatch, tmp_path, delays):
+    monkeypatch.setattr(headline_store, "_store", headline_store.HeadlineStore(str(tmp_path / "news.sqlite3")))
+    monkeypatch.setattr(cache_service, "_backends", [MemoryBackend()])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+    monkeypatch.setattr(news_service.yf, "Ticker", _SlowTicker)
+    _SlowTicker.delays = delays
+    _SlowTicker.running = _SlowTicker.peak = 0
+
+
+def test_fetches_run_concurrently_within_the_bound(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, {})
+    tickers = [f"T{i}" for i in range(10)]
+
+    started = time.time()
+    results = NewsService.enrich_sentiment(tickers, concurrency=5)
+    elapsed = time.time() - started
+
+    assert list(results) == tickers
+    assert all(r["sentiment"] == "Bullish" and r["price"] == 1.1 for r in results.values())
+    # Two waves of 0.2s rather than ten sequential fetches
+    assert elapsed < 1.0
+    assert _SlowTicker.peak == 5
+
+
+def test_deadline_marks_late_tickers_pending_and_caches_them_later(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, {"SLOW": 0.8})
+
+    started = time.time()
+    results = NewsService.enrich_sentiment(["FAST", "SLOW"], deadline=0.3)
+    assert time.time() - started < 0.7
+    assert results["FAST"]["sentiment"] == "Bullish" and "pending" not in results["FAST"]
+    assert results["SLOW"]["pending"] and results["SLOW"]["sentiment"] == "Pending"
+
+    # The late fetch finishes in the background; the next caller is served from the cache
+    time.sleep(0.8)
+    assert NewsService.enrich_sentiment(["SLOW"], deadline=0.05)["SLOW"]["sentiment"] == "Bullish"
+
+
+def test_per_ticker_timeout(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, {"HUNG": 0.6, "OK": 0.01})
+    results = NewsService.enrich_sentiment(["HUNG", "OK"], timeout=0.2, deadline=5)
+    assert results["HUNG"]["pending"] and results["OK"]["sentiment"] == "Bullish"
+    # Let the straggler land in this test's store and cache
+    time.sleep(0.6)
+
+
+def test_intelligence_fans_out_reuses_prices_and_backfills(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, {"SLOW": 0.8})
+
+    def overview():
+        time.sleep(0.3)
+        return {"topMovers": [{"ticker": "BIG", "price": 120.5, "changePct": 3.1}]}
+
+    def penny_list(limit):
+        time.sleep(0.3)
+        return [{"ticker": "SLOW", "price": 1.2, "changePct": -4.0}, {"ticker": "BIG", "price": 0, "changePct": 0}]
+
+    def no_history(self, period="1d"):
+        raise AssertionError("price should come from the sources")
+
+    monkeypatch.setattr(news_service, "get_market_overview", overview)
+    monkeypatch.setattr(news_service, "get_basic_penny_list", penny_list)
+    monkeypatch.setattr(_SlowTicker, "history", no_history)
+
+    started = time.time()
+    partial = NewsService.get_ai_intelligence(budget=0.6)
+    # Sources ran side by side, then the budget cut the slow fetch short
+    assert time.time() - started < 1.0
+    assert [(r["ticker"], r["price"], r.get("pending", False)) for r in partial] == [
+        ("BIG", 120.5, False), ("SLOW", 0.0, True)]
+    assert cache_service.CacheService.get("news_intelligence", max_age_minutes=60) is None
+
+    # The backfill joins the running fetch and caches the complete list
+    time.sleep(1.0)
+    full = cache_service.CacheService.get("news_intelligence", max_age_minutes=60)
+    assert {r["ticker"]: r["price"] for r in full} == {"BIG": 120.5, "SLOW": 1.2}
+    assert not any(r.get("pending") for r in full)
+
+
+def test_unavailable_store_scores_the_live_feed(monkeypatch, tmp_path):
+    import sqlite3
+    _setup(monkeypatch, tmp_path, {"AAA": 0.01})
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(news_service, "get_store", locked)
+    result = NewsService.enrich_sentiment(["AAA"])["AAA"]
+    assert result["sentiment"] == "Bullish" and result["newsCount"] == 1
+    assert result["headline"] == "AAA shares surge on record growth"
+
+
+def test_missing_source_is_a_partial_answer_and_backfilled(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, {"BIG": 0.01, "PEN": 0.01})
+    attempts = []
+
+    def overview():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("overview down")
+        return {"topMovers": [{"ticker": "BIG", "price": 120.5, "changePct": 3.1}]}
+
+    monkeypatch.setattr(news_service, "get_market_overview", overview)
+    monkeypatch.setattr(news_service, "get_basic_penny_list", lambda limit: [
+        {"ticker": "PEN", "price": 1.2, "changePct": -4.0}])
+
+    partial = NewsService.get_ai_intelligence(budget=2)
+    assert [r["ticker"] for r in partial] == ["PEN"]
+
+    # Never cached as complete; the backfill re-runs the failed source and caches the full list
+    deadline = time.time() + 3
+    full = None
+    while full is None and time.time() < deadline:
+        time.sleep(0.05)
+        full = cache_service.CacheService.get("news_intelligence", max_age_minutes=60)
+    assert sorted(r["ticker"] for r in full) == ["BIG", "PEN"] and len(attempts) == 2
+
+
+def test_joined_fetch_uses_the_joiners_price(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, {"AAA": 0.3})
+    downloads = []
+    monkeypatch.setattr(_SlowTicker, "history", lambda self, period="1d": downloads.append(self.ticker))
+
+    # A fetch started without a price, then joined by a caller that has one
+    first = news_service._fetch_pool.submit(NewsService.enrich_sentiment, ["AAA"])
+    time.sleep(0.1)
+    joined = NewsService.enrich_sentiment(["AAA"], prices={"AAA": (2.5, 1.0)})
+    assert joined["AAA"]["price"] == first.result()["AAA"]["price"] == 2.5
+    assert downloads == []
@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import threading
+import pytest
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.pipeline import run_pipeline
+
+
+def test_stages_overlap_and_every_item_comes_out():
+    active, overlap, lock = set(), [], threading.Lock()
+
+    def stage(name):
+        def fn(item):
+            with lock:
+                active.add(name)
+                if len(active) > 1:
+                    overlap.append(tuple(sorted(active)))
+            time.sleep(0.02)
+            with lock:
+                active.discard(name)
+            return item + [name]
+        return fn
+
+    out = list(run_pipeline(([i] for i in range(8)), [(stage("fetch"), 1), (stage("enrich"), 2), (stage("analyze"), 1)]))
+    assert sorted(o[0] for o in out) == list(range(8))
+    assert all(o[1:] == ["fetch", "enrich", "analyze"] for o in out)
+    # Downstream stages worked while upstream ones were busy with later items
+    assert overlap
+
+
+def test_queues_bound_how_far_upstream_runs_ahead():
+    fed = []
+
+    def source():
+        for i in range(20):
+            fed.append(i)
+            yield i
+
+    gen = run_pipeline(source(), [(lambda x: x, 1)], queue_size=1)
+    next(gen)
+    time.sleep(0.2)
+    # One item consumed, the rest held back by two size-1 queues plus one in hand per thread
+    assert len(fed) <= 6
+    gen.close()
+
+
+def test_stage_errors_reach_the_consumer():
+    def boom(item):
+        if item == 3:
+            raise RuntimeError("bad chunk")
+        return item
+
+    with pytest.raises(RuntimeError, match="bad chunk"):
+        list(run_pipeline(range(10), [(boom, 2), (lambda x: x, 1)]))
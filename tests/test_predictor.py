@@ -0,0 +1,65 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.indicators import add_indicators
+from services.predictor import FEATURES, predict_frames
+
+
+def _frames(count=20):
+    rng = np.random.default_rng(11)
+    frames = {}
+    for i in range(count):
+        n = int(rng.integers(60, 126))
+        closes = np.abs(np.cumsum(rng.normal(0, 0.05, n)) + 3)
+        opens = closes + rng.normal(0, 0.02, n)
+        frames[f"T{i}"] = pd.DataFrame({
+            'Open': opens,
+            'High': np.maximum(opens, closes) + rng.uniform(0, 0.05, n),
+            'Low': np.minimum(opens, closes) - rng.uniform(0, 0.05, n),
+            'Close': closes,
+            'Volume': rng.uniform(1e4, 5e6, n),
+        }, index=pd.bdate_range("2026-01-05", periods=n))
+    return add_indicators(frames)
+
+
+def _lstsq(df):
+    """The old per-ticker fit: shift, dropna, lstsq with a bias column."""
+    data = df.copy()
+    data['Target'] = data['Close'].shift(-1)
+    data = data.dropna()
+    X = np.c_[data[FEATURES].values, np.ones(len(data))]
+    theta = np.linalg.lstsq(X, data['Target'].values, rcond=None)[0]
+    pred = np.r_[df.iloc[-1][FEATURES].values, 1.0] @ theta
+    r2 = 1 - ((data['Target'].values - X @ theta) ** 2).sum() / ((data['Target'] - data['Target'].mean()) ** 2).sum()
+    return pred, r2, len(data)
+
+
+def test_matches_per_ticker_lstsq():
+    frames = _frames()
+    fits = predict_frames(frames)
+
+    assert set(fits) == set(frames)
+    for ticker, df in frames.items():
+        pred, r2, n_obs = _lstsq(df)
+        assert fits[ticker]['n_obs'] == n_obs
+        np.testing.assert_allclose(fits[ticker]['predicted'], pred, rtol=1e-8)
+        np.testing.assert_allclose(fits[ticker]['r2'], r2, rtol=1e-6)
+
+
+def test_degenerate_inputs():
+    frames = _frames(2)
+    # Constant feature column -> singular system, still solved
+    frames['T0'] = frames['T0'].assign(Volume=1e5)
+    # Missing feature -> no fit
+    frames['T1'] = frames['T1'].drop(columns=['RSI_14'])
+    fits = predict_frames(frames)
+
+    pred, _, _ = _lstsq(frames['T0'])
+    np.testing.assert_allclose(fits['T0']['predicted'], pred, rtol=1e-6)
+    assert np.isnan(fits['T1']['predicted'])
+    assert fits['T1']['n_obs'] == 0
@@ -0,0 +1,84 @@
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import price_panel
+from services.price_panel import PricePanel, load_panel_until
+
+
+def _frame(dates, closes):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        'Open': closes, 'High': closes + 1, 'Low': closes - 1,
+        'Close': closes, 'Volume': closes * 1000,
+    }, index=pd.DatetimeIndex(dates))
+
+
+def test_alignment_and_latest_bar():
+    days = pd.bdate_range("2026-01-05", periods=5)
+    panel = PricePanel.from_frames({
+        'AAA': _frame(days, [1, 2, 3, 4, 5]),
+        # Missing the middle and last session
+        'BBB': _frame(days[[0, 1, 3]], [10, 11, 12]),
+    })
+
+    assert panel.values.shape == (2, 5, 5)
+    assert panel.values.dtype == np.float32
+    assert panel.index['BBB'] == 1
+
+    np.testing.assert_array_equal(panel.latest('Close'), [5, 12])
+    # Lags walk each ticker's own bars, skipping holes
+    np.testing.assert_array_equal(panel.latest('Close', lag=1), [4, 11])
+    assert np.isnan(panel.latest('Close', lag=3)[1])
+    np.testing.assert_array_equal(panel.bar_counts(), [5, 3])
+
+
+def test_bars_frame_and_until():
+    days = pd.bdate_range("2026-01-05", periods=5)
+    panel = PricePanel.from_frames({
+        'AAA': _frame(days, [1, 2, 3, 4, 5]),
+        'BBB': _frame(days[[0, 1, 3]], [10, 11, 12]),
+    })
+
+    closes = panel.bars(4, 'Close')
+    np.testing.assert_array_equal(closes[0], [2, 3, 4, 5])
+    assert np.isnan(closes[1, 0])
+    np.testing.assert_array_equal(closes[1, 1:], [10, 11, 12])
+
+    assert list(panel.frame('BBB')['Close']) == [10, 11, 12]
+    np.testing.assert_array_equal(panel.until(days[2]).latest('Close'), [3, 11])
+
+
+def test_old_backtest_dates_download_their_own_range(monkeypatch):
+    import yfinance
+    days = pd.bdate_range("2024-03-01", periods=15)
+    calls = []
+
+    def fake_download(tickers, start, end, **kwargs):
+        calls.append((start, end))
+        return pd.concat({"AAA": _frame(days, np.arange(1, 16))}, axis=1)
+
+    def no_store(*args, **kwargs):
+        raise AssertionError("end_date is outside the bar store's window")
+
+    monkeypatch.setattr(yfinance, "download", fake_download)
+    monkeypatch.setattr(price_panel, "load_panel", no_store)
+
+    panel = load_panel_until(["AAA"], "2024-03-14", lookback_days=15)
+    assert calls == [("2024-02-29", "2024-03-15")]
+    assert panel.dates[-1] == pd.Timestamp("2024-03-14")
+    assert panel.latest("Close")[0] == 10
+
+
+def test_recent_backtest_dates_use_the_store(monkeypatch):
+    end = pd.Timestamp.now().normalize() - pd.Timedelta(days=30)
+    days = pd.bdate_range(end - pd.Timedelta(days=40), end + pd.Timedelta(days=10))
+    monkeypatch.setattr(price_panel, "load_panel",
+                        lambda tickers, period: PricePanel.from_frames({"AAA": _frame(days, np.arange(len(days)) + 1.0)}))
+
+    panel = load_panel_until(["AAA"], end)
+    assert panel.dates[-1] <= end and len(panel.dates) > 0
@@ -0,0 +1,94 @@
+import sys
+import os
+import pytest
+from types import SimpleNamespace
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services import cache_service
+from services.cache_backends import MemoryBackend
+from services.cache_service import _LocalCache
+from services.scan_snapshot import CursorExpired, paginate, save_snapshot, sort_items
+
+
+@pytest.fixture(autouse=True)
+def _memory_cache(monkeypatch):
+    monkeypatch.setattr(cache_service, "_backends", [MemoryBackend()])
+    monkeypatch.setattr(cache_service, "_l1", _LocalCache(1024 * 1024, 60))
+
+
+def test_any_limit_is_a_slice_of_one_scan():
+    runs = []
+
+    def scan():
+        runs.append(1)
+        return [{"ticker": f"T{i}", "score": i % 7, "upside": None if i == 3 else i} for i in range(25)]
+
+    first = paginate("test_scan", scan, limit=10)
+    assert [r["ticker"] for r in first["items"]] == [f"T{i}" for i in range(10)]
+    assert first["total"] == 25
+
+    assert len(paginate("test_scan", scan, limit=20)["items"]) == 20
+    assert paginate("test_scan", scan, limit=5, offset=22)["nextCursor"] is None
+    by_upside = paginate("test_scan", scan, limit=25, sort="-upside")["items"]
+    assert by_upside[0]["ticker"] == "T24" and by_upside[-1]["ticker"] == "T3"
+    assert len(runs) == 1
+
+    # Following cursors walks the whole snapshot exactly once
+    seen, cursor = [], None
+    while True:
+        page = paginate("test_scan", scan, limit=10, cursor=cursor)
+        seen += [r["ticker"] for r in page["items"]]
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+    assert seen == [f"T{i}" for i in range(25)]
+
+    with pytest.raises(ValueError):
+        paginate("test_scan", scan, limit=10, sort="nope")
+    with pytest.raises(ValueError):
+        paginate("test_scan", scan, limit=10, cursor="garbage")
+
+
+def test_cursor_stays_on_its_version_after_a_rescan():
+    items = [{"ticker": t} for t in "ABCDEF"]
+    first = paginate("pinned", lambda: items, limit=2)
+
+    # A rescan replaces the current snapshot with a different ranking
+    cache_service.CacheService.set("snapshot_pinned", {"version": "new", "createdAt": 0, "items": items[::-1]})
+    assert paginate("pinned", lambda: items, limit=2)["items"][0]["ticker"] == "F"
+
+    follow = paginate("pinned", lambda: items, limit=2, cursor=first["nextCursor"])
+    assert [r["ticker"] for r in follow["items"]] == ["C", "D"]
+    assert follow["version"] == first["version"]
+
+
+def test_sort_handles_mixed_field_types():
+    items = [{"t": "A", "cap": 5.0}, {"t": "B", "cap": "Unknown"}, {"t": "C", "cap": 9},
+             {"t": "D", "cap": float("nan")}, {"t": "E"}]
+    assert [i["t"] for i in sort_items(items, "-cap")] == ["C", "A", "B", "D", "E"]
+    assert [i["t"] for i in sort_items(items, "t")] == ["A", "B", "C", "D", "E"]
+
+    with pytest.raises(ValueError):
+        sort_items([{"cap": 1}, {"cap": [2]}], "cap")
+    with pytest.raises(ValueError):
+        sort_items([{"cap": {"a": 1}}, {"cap": "x"}], "cap")
+
+
+def test_pinned_versions_are_purged_and_their_cursors_expire(monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(cache_service, "time", SimpleNamespace(time=lambda: clock[0]))
+    backend = cache_service._get_backends()[0]
+
+    first = save_snapshot("purged", [{"ticker": t} for t in "ABCD"], retain_minutes=10)
+    page = paginate("purged", lambda: [], limit=2, ttl_minutes=5, stale_minutes=10)
+    assert page["version"] == first["version"]
+
+    # Eleven minutes and a rescan later, the first version's pin is gone
+    clock[0] += 11 * 60
+    second = save_snapshot("purged", [{"ticker": t} for t in "WXYZ"], retain_minutes=10)
+    assert sorted(k for k in backend.rows if k.startswith("snapshot_purged@")) == [f"snapshot_purged@{second['version']}"]
+
+    with pytest.raises(CursorExpired):
+        paginate("purged", lambda: [], limit=2, cursor=page["nextCursor"], ttl_minutes=5, stale_minutes=10)
@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.price_panel import PricePanel
+from services.screen import run_screen, PENNY_SCAN_SCREEN, price_band_screen
+
+
+def _panel(closes, volumes):
+    """Single-session panel: one bar of (close, volume) per ticker, plus a flat prior bar."""
+    n = len(closes)
+    values = np.ones((n, 2, 5), dtype=np.float32)
+    values[:, 1, 3] = closes
+    values[:, 1, 4] = volumes
+    return PricePanel([f"T{i}" for i in range(n)], pd.bdate_range("2026-01-05", periods=2), values)
+
+
+def test_penny_scan_screen_filters_and_ranks():
+    panel = _panel([1.0, 4.0, 6.0, 2.0, np.nan], [30000, 90000, 1e6, 10000, 1e6])
+    survivors = run_screen(panel, PENNY_SCAN_SCREEN)
+
+    assert [s['ticker'] for s in survivors] == ['T1', 'T0']
+    assert survivors[0]['Volume'] == 90000
+    assert survivors[0]['ChangePct'] == 300.0
+
+
+def test_price_band_and_limit():
+    panel = _panel([1.0, 4.0, 6.0, 9.0], [1e6, 1e6, 1e6, 1e3])
+    assert [s['ticker'] for s in run_screen(panel, price_band_screen(2.0, 8.0))] == ['T1', 'T2']
+    assert len(run_screen(panel, {"filters": [], "rank_by": "Close", "limit": 2})) == 2
+
+
+def test_universe_scale():
+    rng = np.random.default_rng(7)
+    n = 6000
+    panel = _panel(rng.uniform(0.1, 20, n), rng.uniform(0, 1e6, n))
+
+    start = time.time()
+    survivors = run_screen(panel, {**PENNY_SCAN_SCREEN, "limit": 300})
+    elapsed = time.time() - start
+
+    # Vectorized over the panel: thousands of tickers screen well inside a second
+    assert elapsed < 1.0
+
+    assert len(survivors) == 300
+    vols = [s['Volume'] for s in survivors]
+    assert vols == sorted(vols, reverse=True)
+    assert all(s['Close'] < 5.0 and s['Volume'] > 20000 for s in survivors)
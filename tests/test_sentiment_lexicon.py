@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.sentiment_lexicon import Lexicon
+
+
+LEXICON = Lexicon.from_words(
+    {"high", "surge", "beat", "growth"}, {"low", "drop", "cut"},
+    {"all time high": 2, "going concern": -3},
+)
+
+
+def test_matches_whole_words_and_inflections():
+    # No substring hits: "low" in "follow", "high" in "highlights"
+    assert LEXICON.matches("Analysts follow the highlights") == []
+    assert LEXICON.score("Shares surged, then dropped on rate cuts") == 1 - 1 - 1
+    assert LEXICON.score("Dividend cutting continues as growth slows") == -1 + 1
+
+
+def test_longest_phrase_wins_and_weights_apply():
+    assert LEXICON.matches("Stock hits an all-time high") == [("all time high", 2)]
+    assert LEXICON.score("Auditor flags going concern; shares at record low") == -3 - 1
+
+
+def test_negation_flips_nearby_terms_only():
+    assert LEXICON.score("Company did not beat estimates") == -1
+    assert LEXICON.score("Earnings didn't show growth") == -1
+    # Outside the window the negator no longer applies
+    assert LEXICON.score("No change to guidance after the quarter, growth ahead") == 1
+
+
+def test_negation_stops_at_clause_punctuation():
+    assert LEXICON.matches("No worries: stock surges") == [("surges", 1)]
+    assert LEXICON.matches("No delay - shares surge") == [("surge", 1)]
+    # A hyphen inside a word isn't a boundary
+    assert LEXICON.matches("Not an all-time high") == [("all time high", -2)]
+
+
+def test_negator_flips_only_the_first_term():
+    assert LEXICON.matches("Shares did not surge then drop") == [("surge", -1), ("drop", -1)]
+
+
+def test_score_many():
+    assert LEXICON.score_many(["Shares surge", "", "Stock drops"]) == [1, 0, -1]
+
+
+def test_weighted_phrases_match_real_headlines():
+    from services.news_service import LEXICON as NEWS_LEXICON
+
+    assert NEWS_LEXICON.matches("Acme beats estimates as revenue climbs") == [("beats estimates", 2)]
+    assert NEWS_LEXICON.matches("Acme misses estimates; losses widen") == [("misses estimates", -2), ("losses", -1)]
+    assert NEWS_LEXICON.matches("Biotech announces 1-for-10 reverse stock split") == [("reverse stock split", -2)]
+    assert NEWS_LEXICON.matches("Analyst raises price target on Acme") == [("raises price target", 2)]
+    assert NEWS_LEXICON.matches("Acme beat Q3 expectations") == [("beat", 1)]
+
+
+def test_version_tracks_terms_and_weights():
+    same = Lexicon.from_words({"high", "surge", "beat", "growth"}, {"low", "drop", "cut"},
+                              {"all time high": 2, "going concern": -3})
+    reweighted = Lexicon.from_words({"high", "surge", "beat", "growth"}, {"low", "drop", "cut"},
+                                    {"all time high": 3, "going concern": -3})
+    assert same.version == LEXICON.version != reweighted.version
+
+
+def _nodes(node):
+    return sum(1 + _nodes(child) for key, child in node.items() if isinstance(key, str))
+
+
+def test_long_phrases_compile_to_one_trie_path():
+    start = time.time()
+    lexicon = Lexicon({"company files for chapter eleven bankruptcy protection": -3, "beat estimates": 2})
+    assert time.time() - start < 0.5
+    # One node per word: inflections are resolved at match time, not stored
+    assert _nodes(lexicon.root) == 7 + 2
+    assert lexicon.score("Company files for Chapter Eleven bankruptcy protection") == -3
+    assert lexicon.matches("Acme beats estimates") == [("beats estimates", 2)]
+
+
+def test_only_real_inflections_match():
+    from services.news_service import LEXICON as NEWS_LEXICON
+
+    assert NEWS_LEXICON.matches("Local wines win awards") == [("win", 1)]
+    assert NEWS_LEXICON.matches("Cuter packaging") == []
+    assert NEWS_LEXICON.matches("Lowes opens a store") == []
+    assert NEWS_LEXICON.score("Acme wins, then cutting costs as shares hit lows") == 1 - 1 - 1
+    # A term as written beats another term's inflection
+    assert Lexicon({"low": -1, "lower": 2}).matches("Rates lower") == [("lower", 2)]
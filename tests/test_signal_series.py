@@ -0,0 +1,87 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add api to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../api')))
+
+from services.signals import (
+    check_structure_liquidity, check_wyckoff_spring, detect_momentum_velocity,
+    SignalState, momentum_velocity_series, signal_timeline, structure_liquidity_series,
+)
+
+
+def _choppy_df(n=150, seed=1):
+    """Noisy prices with occasional spikes and wicks so every setup fires somewhere."""
+    rng = np.random.default_rng(seed)
+    close = np.abs(3 + np.cumsum(rng.normal(0, 0.15, n))) + 0.5
+    jumps = rng.random(n) < 0.05
+    close[jumps] *= rng.uniform(1.3, 2.5, jumps.sum())
+    low = close - rng.uniform(0, 0.6, n)
+    high = close + rng.uniform(0, 0.6, n)
+    return pd.DataFrame({
+        'Open': close, 'High': high, 'Low': low, 'Close': close,
+        'Volume': rng.uniform(1e4, 1e5, n),
+    }, index=pd.bdate_range("2025-06-02", periods=n))
+
+
+def test_timeline_matches_last_row_checks():
+    df = _choppy_df()
+    timeline = signal_timeline(df)
+    fired = {'liquidity': 0, 'wyckoff': 0, 'velocity': 0}
+
+    for i in range(len(df)):
+        sub = df.iloc[:i + 1]
+        liq = check_structure_liquidity(sub)
+        wyc = check_wyckoff_spring(sub)
+        vel = detect_momentum_velocity(sub)
+        row = timeline.iloc[i]
+
+        assert row['liquidity'] == (liq['signals'] if liq else [])
+        assert row['wyckoff'] == (wyc['signals'] if wyc else [])
+        assert row['velocity'] == (vel['signals'] if vel else [])
+        expected = sum(r['score'] for r in (liq, wyc, vel) if r)
+        assert row['score'] == expected
+        fired['liquidity'] += bool(liq)
+        fired['wyckoff'] += bool(wyc)
+        fired['velocity'] += bool(vel)
+
+    assert all(fired.values()), fired
+
+
+def test_many_tickers_at_once():
+    a, b = _choppy_df(150, seed=2), _choppy_df(90, seed=3)
+    # Right-aligned panel, shorter history padded with NaN
+    close = np.full((2, 150), np.nan)
+    close[0], close[1, 60:] = a['Close'], b['Close']
+    high = np.full((2, 150), np.nan)
+    high[0], high[1, 60:] = a['High'], b['High']
+    low = np.full((2, 150), np.nan)
+    low[0], low[1, 60:] = a['Low'], b['Low']
+
+    vel = momentum_velocity_series(close)
+    liq = structure_liquidity_series(high, low, close)
+    np.testing.assert_array_equal(vel['score'][1, 60:], momentum_velocity_series(b['Close'].to_numpy())['score'])
+    np.testing.assert_array_equal(liq['score'][0], structure_liquidity_series(a['High'], a['Low'], a['Close'])['score'])
+    assert not vel['score'][1, :60].any() and not liq['score'][1, :60].any()
+
+
+def test_streaming_state_matches_last_row_checks():
+    df = _choppy_df(seed=4)
+    state = SignalState()
+
+    for i, (high, low, close, volume) in enumerate(df[['High', 'Low', 'Close', 'Volume']].itertuples(index=False)):
+        sub = df.iloc[:i + 1]
+        # Intraday ticks: the forming bar is evaluated repeatedly without mutating state
+        state.evaluate(high * 1.1, low * 0.9, close, volume * 3)
+        result = state.evaluate(high, low, close, volume)
+
+        assert result['liquidity'] == check_structure_liquidity(sub)
+        assert result['wyckoff'] == check_wyckoff_spring(sub)
+        assert result['velocity'] == detect_momentum_velocity(sub)
+        state.push(high, low, close, volume)
+
+    warm = SignalState.from_frame(df.iloc[:-1])
+    last = df.iloc[-1]
+    assert warm.evaluate(last['High'], last['Low'], last['Close'], last['Volume'])['score'] == signal_timeline(df)['score'].iloc[-1]